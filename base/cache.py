@@ -0,0 +1,344 @@
+import functools
+import hashlib
+import math
+import random
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+
+def get_generation(resource):
+    """
+    Return the current generation of `resource` (or of a fragment tag), which is part of the key
+    or of the entry of everything cached from it, so bumping it invalidates all of them at once.
+    """
+    # Starting from the current time keeps an evicted counter from reusing old generations
+    return cache.get_or_set(
+        f"generation_{resource}", lambda: time.time_ns() // 1000, timeout=None
+    )
+
+
+async def aget_generation(resource):
+    return await cache.aget_or_set(
+        f"generation_{resource}", lambda: time.time_ns() // 1000, timeout=None
+    )
+
+
+def bump_generation(resource):
+    try:
+        cache.incr(f"generation_{resource}")
+    except ValueError:
+        get_generation(resource)
+
+
+def get_versions(tags):
+    """
+    Return the current generation of each of `tags`, starting the missing ones, in one round-trip
+    (two when some are missing).
+    """
+    keys = {f"generation_{tag}": tag for tag in tags}
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() // 1000 for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+async def aget_versions(tags):
+    keys = {f"generation_{tag}": tag for tag in tags}
+    versions = await cache.aget_many(keys)
+    missing = {key: time.time_ns() // 1000 for key in keys if key not in versions}
+    if missing:
+        await cache.aset_many(missing, timeout=None)
+        versions.update(missing)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def invalidate(*tags):
+    """
+    Invalidate every fragment depending on any of `tags`.
+    """
+    for tag in tags:
+        bump_generation(tag)
+
+
+def get_fragment(key):
+    return get_fragments([key]).get(key)
+
+
+def get_fragments(keys):
+    """
+    Return the cached fragments of `keys` that are still valid, i.e. none of the tags they were
+    stored with has been invalidated since.
+    """
+    entries = cache.get_many(keys)
+    versions = get_versions(
+        {tag for entry in entries.values() for tag in entry["versions"]}
+    )
+    return {
+        key: entry["value"]
+        for key, entry in entries.items()
+        if is_up_to_date(entry, versions)
+    }
+
+
+async def aget_fragments(keys):
+    entries = await cache.aget_many(keys)
+    versions = await aget_versions(
+        {tag for entry in entries.values() for tag in entry["versions"]}
+    )
+    return {
+        key: entry["value"]
+        for key, entry in entries.items()
+        if is_up_to_date(entry, versions)
+    }
+
+
+def is_up_to_date(entry, versions):
+    return all(versions[tag] == version for tag, version in entry["versions"].items())
+
+
+def set_fragment(key, value, tags, versions=None, timeout=DEFAULT_TIMEOUT):
+    set_fragments({key: (value, tags)}, versions, timeout)
+
+
+def set_fragments(fragments, versions=None, timeout=DEFAULT_TIMEOUT):
+    """
+    Cache each `{key: (value, tags)}` of `fragments` along with the current generation of its tags.
+
+    Args:
+        versions: Generations read before the values were computed, so a concurrent invalidation
+            cannot be missed. Tags without one are read now.
+    """
+    versions = dict(versions or {})
+    tags = {tag for _, fragment_tags in fragments.values() for tag in fragment_tags}
+    versions.update(get_versions(tags - versions.keys()))
+    entries = {
+        key: {"value": value, "versions": {tag: versions[tag] for tag in fragment_tags}}
+        for key, (value, fragment_tags) in fragments.items()
+    }
+    cache.set_many(entries, timeout)
+
+
+def get_list_cache_key(resource, request):
+    """
+    Build the cache key of a list response of `resource`, from its generation, the role of the
+    caller, the format it is rendered in and the normalized (sorted) query parameters.
+    """
+    return build_list_cache_key(resource, request, get_generation(resource))
+
+
+async def aget_list_cache_key(resource, request):
+    return build_list_cache_key(resource, request, await aget_generation(resource))
+
+
+def build_list_cache_key(resource, request, generation):
+    params = sorted(
+        (key, value)
+        for key in request.query_params
+        for value in request.query_params.getlist(key)
+    )
+    digest = hashlib.md5(urlencode(params).encode()).hexdigest()
+    role = getattr(request.user, "role", "Anonymous")
+    renderer_format = request.accepted_renderer.format
+    return f"list_{resource}_{generation}_{role}_{renderer_format}_{digest}"
+
+
+def get_or_build(
+    key,
+    build,
+    tags=(),
+    timeout=DEFAULT_TIMEOUT,
+    stale_timeout=60,
+    lock_timeout=10,
+    beta=1.0,
+):
+    """
+    Return the fragment cached under `key`, rebuilding it with `build` when it is missing, was
+    invalidated or expired, while protecting the rebuild against stampedes:
+
+    - Only the caller holding a short-lived lock key rebuilds it (single flight). The others are
+      served the stale value, which is kept `stale_timeout` seconds past `timeout`, or wait for
+      the rebuilt one when there is none.
+    - Before expiring, the fragment is refreshed early with a probability growing as the expiry
+      gets closer and as its rebuild is slower (XFetch), so hot keys rarely expire at all.
+
+    Args:
+        build: Callable returning the value and the tags it depends on, on top of `tags`.
+        tags: Tags known beforehand, their generations are read before building.
+    """
+    if timeout is DEFAULT_TIMEOUT:
+        timeout = cache.default_timeout
+    versions = get_versions(tags)
+    entry = cache.get(key)
+    if entry is not None:
+        entry_versions = get_versions(entry["versions"].keys() - versions.keys())
+        if is_up_to_date(entry, {**versions, **entry_versions}) and not is_expiring(
+            entry, beta
+        ):
+            return entry["value"]
+
+    lock_key = f"lock_{key}"
+    locked = cache.add(lock_key, True, lock_timeout)
+    if not locked:
+        if entry is not None:
+            return entry["value"]
+        rebuilt_entry = wait_for_entry(key, lock_key, lock_timeout)
+        if rebuilt_entry is not None:
+            return rebuilt_entry["value"]
+        # The holder gave up without rebuilding, the first waiter takes its place and the others
+        # rebuild without the lock, which they must not release
+        locked = cache.add(lock_key, True, lock_timeout)
+
+    try:
+        started_at = time.monotonic()
+        value, build_tags = build()
+        delta = time.monotonic() - started_at
+        entry_tags = {*tags, *build_tags}
+        versions.update(get_versions(entry_tags - versions.keys()))
+        entry = {
+            "value": value,
+            "versions": {tag: versions[tag] for tag in entry_tags},
+            "expires_at": time.time() + timeout if timeout is not None else None,
+            "delta": delta,
+        }
+        cache.set(key, entry, timeout + stale_timeout if timeout is not None else None)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return value
+
+
+async def aget_current(key, tags=(), beta=1.0):
+    """
+    Async counterpart of the read of `get_or_build`.
+
+    Returns:
+        The fragment cached under `key` if it is up to date and not due for an early refresh,
+        None when it must go through `get_or_build`.
+    """
+    entry = await cache.aget(key)
+    if entry is None:
+        return None
+    versions = await aget_versions({*tags, *entry["versions"]})
+    if not is_up_to_date(entry, versions) or is_expiring(entry, beta):
+        return None
+    return entry["value"]
+
+
+def is_expiring(entry, beta):
+    expires_at = entry.get("expires_at")
+    if expires_at is None:
+        return False
+    # 1 - random() is in (0, 1], so the logarithm is defined and the gap is positive
+    gap = -entry.get("delta", 0) * beta * math.log(1 - random.random())
+    return time.time() + gap >= expires_at
+
+
+def wait_for_entry(key, lock_key, lock_timeout, interval=0.05):
+    """
+    Wait for the holder of `lock_key` to rebuild `key`, for at most `lock_timeout` seconds.
+
+    Returns:
+        dict: The rebuilt entry, or None if the lock was released or expired without it.
+    """
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(interval)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        if cache.get(lock_key) is None:
+            return None
+    return None
+
+
+def single_flight(key_func, **options):
+    """
+    Decorator caching the result of the decorated function with `get_or_build`, under the key
+    returned by `key_func` called with the same arguments.
+
+    Example:
+        @single_flight(lambda category_id: f"category_{category_id}_summary", timeout=60)
+        def get_category_summary(category_id):
+            ...
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_or_build(
+                key_func(*args, **kwargs),
+                lambda: (func(*args, **kwargs), ()),
+                **options,
+            )
+
+        return wrapper
+
+    return decorator
+
+
+# Claimed by `read_log` in place of a slot allocated but not written yet
+LOG_SLOT_SKIPPED = "skipped"
+
+
+def get_log_slot_key(name, number):
+    return f"{name}_{number}"
+
+
+def append_to_log(name, item, timeout=DEFAULT_TIMEOUT):
+    """
+    Append `item` to the log `name`, kept in numbered slots of the cache so that appending costs
+    two round-trips from any process, without locking.
+    """
+    # A slot claimed by a reader which did not wait for it is skipped, the item takes the next
+    while not cache.add(get_log_slot_key(name, next_log_number(name)), item, timeout):
+        pass
+
+
+def next_log_number(name):
+    try:
+        return cache.incr(f"{name}_last")
+    except ValueError:
+        cache.add(f"{name}_last", 0, timeout=None)
+        return cache.incr(f"{name}_last")
+
+
+def read_log(name, max_items, timeout=DEFAULT_TIMEOUT):
+    """
+    Read the items appended to the log `name` since it was last trimmed, at most `max_items` of
+    them. Readers must not run concurrently.
+
+    Returns:
+        tuple: The items in order, and the position to pass to `trim_log` once they are processed.
+    """
+    first = cache.get(f"{name}_flushed", 0) + 1
+    last = cache.get(f"{name}_last", 0)
+    if last < first - 1:
+        # The counter of the log was evicted and started over
+        first = 1
+    last = min(last, first + max_items - 1)
+
+    keys = [get_log_slot_key(name, number) for number in range(first, last + 1)]
+    slots = cache.get_many(keys)
+    for key in keys:
+        # Allocated but not written yet, the item is appended to another slot
+        if key not in slots and not cache.add(key, LOG_SLOT_SKIPPED, timeout):
+            slots[key] = cache.get(key)
+    items = [slots.get(key) for key in keys]
+    items = [item for item in items if item not in [None, LOG_SLOT_SKIPPED]]
+    return items, (first, last)
+
+
+def trim_log(name, position):
+    """
+    Drop the items of the log `name` read by `read_log` at `position`.
+    """
+    first, last = position
+    cache.set(f"{name}_flushed", last, timeout=None)
+    cache.delete_many(
+        [get_log_slot_key(name, number) for number in range(first, last + 1)]
+    )
@@ -0,0 +1,693 @@
+import functools
+import hashlib
+import json
+import re
+import uuid
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models.functions import Length
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from django.utils.text import compress_sequence
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .cache import (
+    aget_list_cache_key,
+    get_fragments,
+    get_list_cache_key,
+    get_versions,
+    set_fragments,
+)
+from .export import NDJSON_CONTENT_TYPE, aiter_chunks, iter_ndjson, resume_queryset
+from .serializers import select_fields
+from .tree import PATH_STEP, get_depth, get_subtree_filter, nest
+
+# Rendered in place of the results of a list, then replaced by the spliced fragments
+RESULTS_PLACEHOLDER = json.dumps(f"results-{uuid.uuid4().hex}").encode()
+
+# As matched by `django.middleware.gzip.GZipMiddleware`
+ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+
+class AsyncReadMixin:
+    """
+    Serve the actions having an async counterpart (`alist` for `list`, `aretrieve` for
+    `retrieve`) from the event loop when `settings.ASYNC_VIEWS` is set, as under ASGI, rather than
+    from a thread per request. Authentication, permissions and throttling, which may query the
+    database, and the actions without a counterpart run in a thread like in the sync view.
+    """
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        view = super().as_view(*args, **kwargs)
+        if not settings.ASYNC_VIEWS:
+            return view
+
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        # Keeps `cls`, `actions` and `csrf_exempt`, read by the router and the middlewares
+        return functools.update_wrapper(async_view, view)
+
+    def dispatch(self, request, *args, **kwargs):
+        if settings.ASYNC_VIEWS:
+            return self.adispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        """
+        Counterpart of `APIView.dispatch` awaiting the async handler of the action if any.
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            method = request.method.lower()
+            if method in self.http_method_names:
+                handler = getattr(self, method, self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            action = getattr(self, "action", None)
+            async_handler = getattr(self, f"a{action}", None) if action else None
+            if handler != self.http_method_not_allowed and async_handler is not None:
+                response = await async_handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = await sync_to_async(self.handle_exception)(exc)
+
+        self.response = await self.afinalize_response(
+            request, response, *args, **kwargs
+        )
+        return self.response
+
+    async def afinalize_response(self, request, response, *args, **kwargs):
+        """
+        Counterpart of `finalize_response`, for the views querying the database to finalize
+        their responses to do so outside of the event loop.
+        """
+        return self.finalize_response(request, response, *args, **kwargs)
+
+
+class PersonalFieldsMixin:
+    """
+    Add the fields depending on the requesting user to the responses of `personal_fields_actions`
+    once they are out of the shared caches, which keep a single representation for every user.
+    The ETags of those responses are built per user.
+
+    Views implement `add_personal_fields(request, data)`, returning the data of a response with
+    the fields of the user, computed for all its items at once. The data may be shared with the
+    caches, so it is copied rather than changed in place. `personal_fields` lists the top-level
+    fields added, which sparse fieldsets may name.
+
+    Comes before `AsyncReadMixin` in the bases of a view.
+    """
+
+    personal_fields_actions = ["list", "retrieve"]
+    personal_fields = []
+
+    def get_etag(self, request, *parts):
+        if self.action in self.personal_fields_actions:
+            parts = [*parts, f"user:{request.user.pk}"]
+        return super().get_etag(request, *parts)
+
+    def needs_personal_fields(self, response):
+        return (
+            self.action in self.personal_fields_actions
+            and isinstance(response, Response)
+            and response.status_code == status.HTTP_200_OK
+            and not getattr(response, "has_personal_fields", False)
+        )
+
+    def set_personal_fields(self, request, response):
+        response.data = self.add_personal_fields(request, response.data)
+        response.has_personal_fields = True
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self.needs_personal_fields(response):
+            self.set_personal_fields(request, response)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    async def afinalize_response(self, request, response, *args, **kwargs):
+        if self.needs_personal_fields(response):
+            await sync_to_async(self.set_personal_fields)(request, response)
+        return await super().afinalize_response(request, response, *args, **kwargs)
+
+
+class ConditionalGetMixin:
+    """
+    Answer `If-None-Match` / `If-Modified-Since` with a 304 computed from cheap validators, before
+    anything is serialized.
+    """
+
+    def get_etag(self, request, *parts):
+        """
+        Build a strong ETag from `parts`, which must change whenever the representation does, and
+        the format it is rendered in.
+        """
+        parts = [
+            # The same instant gives the same ETag whatever its time zone
+            part.timestamp() if isinstance(part, datetime) else part
+            for part in [*parts, request.accepted_renderer.format]
+        ]
+        digest = hashlib.md5(":".join(map(str, parts)).encode()).hexdigest()
+        return quote_etag(digest)
+
+    def is_conditional(self, request):
+        return (
+            "If-None-Match" in request.headers or "If-Modified-Since" in request.headers
+        )
+
+    def get_not_modified_response(self, request, etag, last_modified=None):
+        """
+        Returns:
+            Response: An empty 304 response if the copy of the client is still current according
+            to `If-None-Match`, or to `If-Modified-Since` when it is not given, None otherwise.
+        """
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if if_none_match:
+            # Weak comparison, as mandated for `If-None-Match`
+            not_modified = "*" in if_none_match or etag.removeprefix("W/") in [
+                tag.removeprefix("W/") for tag in if_none_match
+            ]
+        else:
+            if_modified_since = parse_http_date_safe(
+                request.headers.get("If-Modified-Since", "")
+            )
+            not_modified = bool(
+                last_modified
+                and if_modified_since
+                and int(last_modified.timestamp()) <= if_modified_since
+            )
+        if not not_modified:
+            return None
+        return self.set_validators(
+            Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified
+        )
+
+    def set_validators(self, response, etag, last_modified=None):
+        response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+        return response
+
+
+class CachedListMixin(ConditionalGetMixin):
+    """
+    Cache the serialized (paginated) payload of `list` for every variant of its query parameters.
+
+    Entries are keyed on the generation of `list_cache_resource`, so `bump_generation` on that
+    resource invalidates every cached variant in O(1). The key is also the ETag of the response,
+    and the time the entry was built its Last-Modified. Responses already rendered (see
+    `RowFragmentListMixin`) are cached as bytes.
+    """
+
+    list_cache_resource = None
+    list_cache_timeout = 300
+
+    def list(self, request, *args, **kwargs):
+        cache_key = get_list_cache_key(self.list_cache_resource, request)
+        etag = self.get_etag(request, cache_key)
+        if "If-None-Match" in request.headers:
+            not_modified = self.get_not_modified_response(request, etag)
+            if not_modified is not None:
+                return not_modified
+
+        entry = cache.get(cache_key)
+        if entry is not None:
+            return self.get_cached_list_response(request, etag, entry)
+        return self.build_list(request, cache_key, etag, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        cache_key = await aget_list_cache_key(self.list_cache_resource, request)
+        etag = self.get_etag(request, cache_key)
+        if "If-None-Match" in request.headers:
+            not_modified = self.get_not_modified_response(request, etag)
+            if not_modified is not None:
+                return not_modified
+
+        entry = await cache.aget(cache_key)
+        if entry is not None:
+            return self.get_cached_list_response(request, etag, entry)
+        return await sync_to_async(self.build_list)(
+            request, cache_key, etag, *args, **kwargs
+        )
+
+    def get_cached_list_response(self, request, etag, entry):
+        not_modified = self.get_not_modified_response(
+            request, etag, entry["last_modified"]
+        )
+        if not_modified is not None:
+            return not_modified
+        if "content" in entry:
+            response = HttpResponse(
+                entry["content"], content_type=entry["content_type"]
+            )
+        else:
+            response = Response(entry["data"])
+        return self.set_validators(response, etag, entry["last_modified"])
+
+    def build_list(self, request, cache_key, etag, *args, **kwargs):
+        last_modified = timezone.now()
+        response = super().list(request, *args, **kwargs)
+        entry = {"last_modified": last_modified}
+        if isinstance(response, Response):
+            entry["data"] = response.data
+        else:
+            entry["content"] = response.content
+            entry["content_type"] = response["Content-Type"]
+        cache.set(cache_key, entry, self.list_cache_timeout)
+        return self.set_validators(response, etag, last_modified)
+
+
+class RowFragmentListMixin:
+    """
+    Render the JSON of `list` by splicing the JSON of every row, cached as bytes, into the envelope
+    of the paginator. Only the rows missing from the cache are fetched and serialized, so a page
+    costs about its size in bytes rather than its number of fields.
+
+    Views set `row_fragment_prefix` and implement `get_row_dependencies(data)`, the tags of the
+    fragment of a serialized row, and either `get_row_queryset(ids)`, the queryset planned for the
+    serializer, or `serialize_rows(ids)`.
+    """
+
+    row_fragment_prefix = None
+    row_fragment_timeout = 60 * 60
+
+    def use_row_fragments(self, request):
+        return isinstance(request.accepted_renderer, JSONRenderer)
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_row_fragments(request):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.get_page_queryset(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            page = queryset
+        rows = self.get_row_fragments([instance.pk for instance in page])
+
+        head, tail = b"", b""
+        if self.paginator is not None:
+            data = self.get_paginated_response(rows).data
+            data["results"] = json.loads(RESULTS_PLACEHOLDER)
+            envelope = request.accepted_renderer.render(
+                data, request.accepted_media_type, self.get_renderer_context()
+            )
+            head, tail = envelope.split(RESULTS_PLACEHOLDER, 1)
+        content = b"".join([head, b"[", b",".join(rows), b"]", tail])
+        return HttpResponse(content, content_type=request.accepted_renderer.media_type)
+
+    def get_page_queryset(self, queryset):
+        """
+        Strip `queryset` down to what paginating it needs: the primary keys and the fields the
+        cursor positions are read from.
+        """
+        cursor_fields = [
+            name.lstrip("-") for name in getattr(self, "cursor_ordering", ())
+        ]
+        return (
+            queryset.select_related(None)
+            .prefetch_related(None)
+            .only("pk", *cursor_fields)
+        )
+
+    def get_row_fragments(self, ids):
+        """
+        Return the JSON of the rows of `ids` in that order, from their cached fragments when valid,
+        serializing and caching the others with one planned query.
+        """
+        keys = {pk: self.get_row_fragment_key(pk) for pk in ids}
+        versions = get_versions(
+            [tag for pk in ids for tag in self.get_row_known_dependencies(pk)]
+        )
+        rows = get_fragments(list(keys.values()))
+
+        missing_ids = [pk for pk, key in keys.items() if key not in rows]
+        if missing_ids:
+            renderer = self.request.accepted_renderer
+            fragments = {
+                keys[data["id"]]: (
+                    renderer.render(data),
+                    self.get_row_dependencies(data),
+                )
+                for data in self.serialize_rows(missing_ids)
+            }
+            set_fragments(fragments, versions, self.row_fragment_timeout)
+            rows.update({key: row for key, (row, _) in fragments.items()})
+
+        # Rows deleted since the page was fetched are skipped
+        return [rows[key] for key in keys.values() if key in rows]
+
+    def get_row_fragment_key(self, pk):
+        return f"{self.row_fragment_prefix}_{pk}"
+
+    def serialize_rows(self, ids):
+        return self.get_serializer(self.get_row_queryset(ids), many=True).data
+
+    def get_row_known_dependencies(self, pk):
+        """
+        Tags of the fragment of row `pk` known before fetching it, their generations are read
+        before the row so that a concurrent invalidation cannot be missed.
+        """
+        return []
+
+
+class ValuesSerializerMixin:
+    """
+    Serve `list` with the `base.serializers.ValuesSerializer` returned by
+    `get_values_serializer_class`, from `.values()` rows, falling back to the serializer when it
+    returns None.
+    """
+
+    values_serializer_class = None
+
+    def get_values_serializer_class(self):
+        return self.values_serializer_class
+
+    def get_values_serializer(self):
+        return self.get_values_serializer_class()(context=self.get_serializer_context())
+
+    def list(self, request, *args, **kwargs):
+        if self.get_values_serializer_class() is None:
+            return super().list(request, *args, **kwargs)
+
+        values_serializer = self.get_values_serializer()
+        queryset = values_serializer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(values_serializer.build(page))
+        return Response(values_serializer.build(queryset))
+
+    def get_object_data(self, values_serializer=None):
+        """
+        Counterpart of `get_object` returning the representation of the object, built by
+        `values_serializer` or the one of the view. Object permissions are not checked, since
+        there is no instance to check them on.
+
+        Raises:
+            Http404: If the object does not exist.
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            queryset = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+            values_serializer = values_serializer or self.get_values_serializer()
+            data = values_serializer.serialize(queryset[:1])
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        if not data:
+            raise Http404
+        return data[0]
+
+
+class SparseFieldsetMixin:
+    """
+    Trim the representation of `list` and `retrieve` to the fields named by `?fields=`, or to all
+    but those named by `?omit=`, both comma separated. The `sparse_fieldset_required_fields` are
+    always kept, and nested serializers are kept whole.
+
+    Serializers and values serializers are trimmed here, so the values serializers neither select,
+    join nor fetch what was left out. Views plan the queryset of the regular serializers from
+    `get_sparse_fields`, and key what they cache on `get_sparse_fields_key`.
+    """
+
+    sparse_fieldset_actions = ["list", "retrieve"]
+    sparse_fieldset_required_fields = ["id"]
+
+    def get_sparse_fields(self):
+        """
+        Returns:
+            set: The names of the fields to render, or None to render all of them.
+
+        Raises:
+            ParseError: If both parameters are given, or one of them names an unknown field.
+        """
+        if not hasattr(self, "_sparse_fields"):
+            self._sparse_fields = self.parse_sparse_fields()
+        return self._sparse_fields
+
+    def parse_sparse_fields(self):
+        if self.action not in self.sparse_fieldset_actions:
+            return None
+        fields_param = self.request.query_params.get("fields")
+        omit_param = self.request.query_params.get("omit")
+        if fields_param is None and omit_param is None:
+            return None
+        if fields_param is not None and omit_param is not None:
+            raise ParseError({"error": "Use either fields or omit, not both."})
+
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        available = {
+            name for name, field in serializer.fields.items() if not field.write_only
+        }
+        # Added to the representation by `PersonalFieldsMixin`
+        available.update(getattr(self, "personal_fields", []))
+        names = {
+            name.strip()
+            for name in (
+                fields_param if fields_param is not None else omit_param
+            ).split(",")
+            if name.strip()
+        }
+        unknown = names - available
+        if unknown:
+            raise ParseError(
+                {"error": f"Unknown field(s): {', '.join(sorted(unknown))}."}
+            )
+        if fields_param is None:
+            names = available - names
+        return names | set(self.sparse_fieldset_required_fields)
+
+    def get_sparse_fields_key(self):
+        """
+        Returns:
+            str: A suffix identifying the sparse fieldset in cache keys, empty for all fields.
+        """
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return ""
+        return "_" + hashlib.md5(",".join(sorted(fields)).encode()).hexdigest()
+
+    def trim_sparse_fields(self, data):
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return data
+        return {name: value for name, value in data.items() if name in fields}
+
+    def get_etag(self, request, *parts):
+        return super().get_etag(request, *parts, self.get_sparse_fields_key())
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            select_fields(serializer, fields)
+        return serializer
+
+    def get_values_serializer(self):
+        return self.get_values_serializer_class()(
+            context=self.get_serializer_context(), fields=self.get_sparse_fields()
+        )
+
+
+class BulkMixin:
+    """
+    Helpers of the bulk actions, which take a JSON array of items, validate every item before
+    writing the valid ones in bulk, and report the outcome of each item in its own result.
+    """
+
+    bulk_max_items = 1000
+
+    def get_bulk_items(self, request):
+        """
+        Raises:
+            ParseError: If the body is not an array, or has more than `bulk_max_items` items.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            raise ParseError({"error": "Expected a list of items."})
+        if len(items) > self.bulk_max_items:
+            raise ParseError(
+                {"error": f"At most {self.bulk_max_items} items can be sent at once."}
+            )
+        return items
+
+    def get_bulk_error(self, index, errors):
+        return {"index": index, "status": "error", "errors": errors}
+
+    def get_bulk_response(self, results, success_status=status.HTTP_200_OK):
+        """
+        Returns:
+            Response: The results in the order of the items with the number of items per
+            status, a 207 if any item failed.
+        """
+        results = sorted(results, key=lambda result: result["index"])
+        counts = {}
+        for result in results:
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+        failed = counts.get("error", 0)
+        return Response(
+            {"counts": counts, "results": results},
+            status=status.HTTP_207_MULTI_STATUS if failed else success_status,
+        )
+
+
+class ExportMixin:
+    """
+    Helpers of the export actions, which stream the rows of the filtered queryset of the view as
+    NDJSON (see `base.export`), gzipped when the client accepts it.
+
+    The resume position is given by `?updated_since=` (ISO 8601, the `+` of an offset percent
+    encoded) and `?after_id=`.
+    """
+
+    export_chunk_size = 1000
+
+    def get_export_position(self, request):
+        """
+        Returns:
+            tuple: The `updated_since` instant and the `after_id` primary key, either being None
+            when not given.
+
+        Raises:
+            ParseError: If either is invalid.
+        """
+        updated_since = request.query_params.get("updated_since")
+        if updated_since is not None:
+            try:
+                updated_since = parse_datetime(updated_since)
+            except ValueError:
+                updated_since = None
+            if updated_since is None:
+                raise ParseError(
+                    {"error": "Invalid updated_since, expected an ISO 8601 datetime."}
+                )
+            if timezone.is_naive(updated_since):
+                updated_since = timezone.make_aware(updated_since)
+
+        after_id = request.query_params.get("after_id")
+        if after_id is not None:
+            try:
+                after_id = int(after_id)
+            except ValueError:
+                raise ParseError({"error": "Invalid after_id, expected an integer."})
+        return updated_since, after_id
+
+    def get_export_response(self, request, values_serializer):
+        updated_since, after_id = self.get_export_position(request)
+        queryset = resume_queryset(
+            self.filter_queryset(self.get_queryset()), updated_since, after_id
+        )
+        chunks = iter_ndjson(queryset, values_serializer, self.export_chunk_size)
+
+        response = StreamingHttpResponse(content_type=NDJSON_CONTENT_TYPE)
+        patch_vary_headers(response, ["Accept-Encoding"])
+        if ACCEPTS_GZIP.search(request.headers.get("Accept-Encoding", "")):
+            chunks = compress_sequence(chunks)
+            response["Content-Encoding"] = "gzip"
+        if isinstance(request._request, ASGIRequest):
+            chunks = aiter_chunks(chunks)
+        response.streaming_content = chunks
+        return response
+
+
+class TreeListMixin:
+    """
+    Serve `list` with `?tree=1` as the nested threads of a tree stored as materialized paths (see
+    `base.tree`), read with a single range scan of the paths, depth first.
+
+    Threads are limited to `?depth=` levels below their root and paginated with the cursors of
+    `base.paginator.BasePagination` over the paths. The nodes whose children were cut by the
+    depth link them at `<children_key>_url`, a thread rooted at that node. The first nodes of
+    a following page may continue the threads of the previous one, they carry their `depth`.
+
+    Views implement `get_tree_queryset(request)`, returning the queryset of the tree and the path
+    of the node whose descendants are listed ("" for the whole tree), and set `tree_count_field`,
+    the number of children of a node.
+    """
+
+    tree_query_param = "tree"
+    tree_depth_query_param = "depth"
+    tree_root_query_param = "parent"
+    tree_default_depth = 3
+    tree_max_depth = 10
+    tree_path_field = "path"
+    tree_count_field = None
+    tree_children_key = "replies"
+
+    def is_tree_request(self, request):
+        return request.query_params.get(self.tree_query_param) in ["1", "true"]
+
+    def get_tree_depth(self, request):
+        depth = request.query_params.get(self.tree_depth_query_param)
+        if depth is None:
+            return self.tree_default_depth
+        try:
+            depth = int(depth)
+        except ValueError:
+            depth = 0
+        if not 1 <= depth <= self.tree_max_depth:
+            raise ParseError(
+                {
+                    "error": f"Invalid depth, expected an integer from 1 to {self.tree_max_depth}."
+                }
+            )
+        return depth
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_tree_request(request):
+            return super().list(request, *args, **kwargs)
+
+        depth = self.get_tree_depth(request)
+        queryset, root_path = self.get_tree_queryset(request)
+        max_depth = get_depth(root_path) + depth
+        queryset = (
+            queryset.filter(get_subtree_filter(root_path, self.tree_path_field))
+            .alias(tree_path_length=Length(self.tree_path_field))
+            .filter(tree_path_length__lte=max_depth * PATH_STEP)
+        )
+
+        values_serializer = self.get_values_serializer()
+        rows = values_serializer.values(
+            queryset, self.tree_path_field, self.tree_count_field
+        )
+        # Depth first, the cursors seek on the path
+        self.cursor_ordering = (self.tree_path_field,)
+        self.paginator.cursor_mode = True
+        rows = self.paginator.paginate_queryset_by_cursor(rows, request, self)
+
+        items = values_serializer.build(rows)
+        paths = [row[self.tree_path_field] for row in rows]
+        for item, row, path in zip(items, rows, paths):
+            item["depth"] = get_depth(path)
+            cut = item["depth"] == max_depth and row[self.tree_count_field]
+            item[f"{self.tree_children_key}_url"] = (
+                self.get_tree_root_url(request, int(path[-PATH_STEP:])) if cut else None
+            )
+        return self.paginator.get_paginated_response(
+            nest(items, paths, self.tree_children_key)
+        )
+
+    def get_tree_root_url(self, request, pk):
+        url = request.build_absolute_uri()
+        url = remove_query_param(url, self.paginator.cursor_query_param)
+        return replace_query_param(url, self.tree_root_query_param, pk)
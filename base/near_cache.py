@@ -0,0 +1,371 @@
+"""
+Two-tier cache backend: a bounded per-process LRU of hot keys in front of another cache.
+
+Reads of the keys starting with one of `KEY_PREFIXES` are served from the process memory once
+fetched, without the network round-trip and the unpickling of the remote cache. Every write goes
+to the remote cache first, then the key is dropped from the LRU of the other processes through
+an invalidation bus (a Redis pub/sub channel, or an in-memory one for tests). Local copies also
+expire after `NEAR_TIMEOUT` seconds, which bounds how stale a lost invalidation can leave them.
+
+Values returned from the LRU are shared by the whole process and must not be mutated.
+
+Example:
+    CACHES = {
+        "default": {
+            "BACKEND": "base.near_cache.NearCache",
+            "LOCATION": "redis",
+            "OPTIONS": {
+                "MAX_ENTRIES": 1000,
+                "NEAR_TIMEOUT": 30,
+                "KEY_PREFIXES": ["blog_", "comment_", "generation_"],
+                "BUS": "base.near_cache.RedisInvalidationBus",
+                "BUS_OPTIONS": {"url": "redis://127.0.0.1:6379/1"},
+            },
+        },
+        "redis": {"BACKEND": "django_redis.cache.RedisCache", ...},
+    }
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.module_loading import import_string
+
+# One store per process and cache name, shared by the per-thread backend instances
+_stores = {}
+_stores_lock = threading.Lock()
+
+# Subscribers of the in-memory bus, per channel
+_local_subscribers = defaultdict(list)
+
+# Published in place of the keys when the whole cache is cleared
+ALL_KEYS = "*"
+
+
+class LocalInvalidationBus:
+    """
+    In-memory invalidation bus delivering messages synchronously to the other stores of the
+    process, which stand in for the other workers in tests.
+    """
+
+    def __init__(self, channel="near_cache_invalidation"):
+        self.channel = channel
+
+    def subscribe(self, node, callback):
+        _local_subscribers[self.channel].append((node, callback))
+
+    def publish(self, node, keys):
+        for subscriber, callback in list(_local_subscribers[self.channel]):
+            if subscriber != node:
+                callback(keys)
+
+
+class RedisInvalidationBus:
+    """
+    Invalidation bus over a Redis pub/sub channel, listened to by a daemon thread per process.
+
+    Messages published while a process is disconnected are lost, its local copies then stay
+    until they expire.
+    """
+
+    def __init__(self, url, channel="near_cache_invalidation"):
+        import redis
+
+        self.channel = channel
+        self.client = redis.Redis.from_url(url)
+
+    def subscribe(self, node, callback):
+        def handle(message):
+            payload = json.loads(message["data"])
+            if payload["node"] != node:
+                callback(payload["keys"])
+
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{self.channel: handle})
+        pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def publish(self, node, keys):
+        self.client.publish(self.channel, json.dumps({"node": node, "keys": keys}))
+
+
+class NearStore:
+    """
+    LRU of `(expires_at, value)` entries with its hit, miss, eviction and invalidation counters.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        # Number of invalidations so far, a fetch overlapping one must not be stored
+        self.invalidation_count = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self.entries.pop(key, None)
+                self.stats["misses"] += 1
+                return None, False
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1], True
+
+    def set(self, key, value, timeout, invalidation_count=None):
+        with self.lock:
+            if (
+                invalidation_count is not None
+                and invalidation_count != self.invalidation_count
+            ):
+                return
+            self.entries[key] = (time.monotonic() + timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def delete(self, keys):
+        with self.lock:
+            if ALL_KEYS in keys:
+                self.entries.clear()
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def invalidate(self, keys):
+        with self.lock:
+            self.invalidation_count += 1
+            self.stats["invalidations"] += 1
+        self.delete(keys)
+
+
+class NearCache(BaseCache):
+    """
+    Cache backend serving the hot keys of the cache named by `LOCATION` from a per-process LRU.
+
+    Options:
+        MAX_ENTRIES: Maximum number of keys kept in the LRU of each process.
+        NEAR_TIMEOUT: Maximum number of seconds a key is served from the LRU.
+        KEY_PREFIXES: Prefixes of the keys kept in the LRU, all of them if empty.
+        BUS: Dotted path of the invalidation bus class, `BUS_OPTIONS` are passed to it.
+        NAME: Name of the store, processes (or, in tests, caches) with different ones do not share
+            their LRU.
+    """
+
+    def __init__(self, location, params):
+        options = params.get("OPTIONS", {})
+        super().__init__({**params, "OPTIONS": {}})
+        self.remote_alias = location
+        self.max_entries = options.get("MAX_ENTRIES", 1000)
+        self.near_timeout = options.get("NEAR_TIMEOUT", 30)
+        self.key_prefixes = tuple(options.get("KEY_PREFIXES", ()))
+        self.bus_class = import_string(
+            options.get("BUS", "base.near_cache.LocalInvalidationBus")
+        )
+        self.bus_options = options.get("BUS_OPTIONS", {})
+        self.name = options.get("NAME", location)
+
+    @property
+    def remote(self):
+        return caches[self.remote_alias]
+
+    @property
+    def store(self):
+        # Keyed on the pid, so that forked workers subscribe on their own
+        store_key = (self.name, os.getpid())
+        store = _stores.get(store_key)
+        if store is None:
+            with _stores_lock:
+                store = _stores.get(store_key)
+                if store is None:
+                    store = NearStore(self.max_entries)
+                    store.node = uuid.uuid4().hex
+                    store.bus = self.bus_class(**self.bus_options)
+                    store.bus.subscribe(store.node, store.invalidate)
+                    _stores[store_key] = store
+        return store
+
+    def is_near(self, key):
+        return not self.key_prefixes or key.startswith(self.key_prefixes)
+
+    def get_near_key(self, key, version):
+        return f"{version or self.version}:{key}"
+
+    def get_near_timeout(self, timeout=DEFAULT_TIMEOUT):
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is None:
+            return self.near_timeout
+        return min(timeout - time.time(), self.near_timeout)
+
+    def invalidate_near(self, keys, version=None):
+        near_keys = [
+            self.get_near_key(key, version) for key in keys if self.is_near(key)
+        ]
+        if near_keys:
+            store = self.store
+            store.invalidate(near_keys)
+            store.bus.publish(store.node, near_keys)
+
+    def get(self, key, default=None, version=None):
+        if not self.is_near(key):
+            return self.remote.get(key, default, version=version)
+
+        store = self.store
+        near_key = self.get_near_key(key, version)
+        value, found = store.get(near_key)
+        if found:
+            return value
+        invalidation_count = store.invalidation_count
+        value = self.remote.get(key, self, version=version)
+        if value is self:
+            return default
+        store.set(near_key, value, self.near_timeout, invalidation_count)
+        return value
+
+    def get_many(self, keys, version=None):
+        store = self.store
+        values = {}
+        remote_keys = []
+        for key in keys:
+            if not self.is_near(key):
+                remote_keys.append(key)
+                continue
+            value, found = store.get(self.get_near_key(key, version))
+            if found:
+                values[key] = value
+            else:
+                remote_keys.append(key)
+        if remote_keys:
+            invalidation_count = store.invalidation_count
+            remote_values = self.remote.get_many(remote_keys, version=version)
+            for key, value in remote_values.items():
+                if self.is_near(key):
+                    store.set(
+                        self.get_near_key(key, version),
+                        value,
+                        self.near_timeout,
+                        invalidation_count,
+                    )
+            values.update(remote_values)
+        return values
+
+    async def aget(self, key, default=None, version=None):
+        # Served from the LRU without leaving the event loop, from the async remote otherwise
+        if not self.is_near(key):
+            return await self.remote.aget(key, default, version=version)
+
+        store = self.store
+        near_key = self.get_near_key(key, version)
+        value, found = store.get(near_key)
+        if found:
+            return value
+        invalidation_count = store.invalidation_count
+        value = await self.remote.aget(key, self, version=version)
+        if value is self:
+            return default
+        store.set(near_key, value, self.near_timeout, invalidation_count)
+        return value
+
+    async def aget_many(self, keys, version=None):
+        store = self.store
+        values = {}
+        remote_keys = []
+        for key in keys:
+            value, found = (
+                store.get(self.get_near_key(key, version))
+                if self.is_near(key)
+                else (None, False)
+            )
+            if found:
+                values[key] = value
+            else:
+                remote_keys.append(key)
+        if remote_keys:
+            invalidation_count = store.invalidation_count
+            remote_values = await self.remote.aget_many(remote_keys, version=version)
+            for key, value in remote_values.items():
+                if self.is_near(key):
+                    store.set(
+                        self.get_near_key(key, version),
+                        value,
+                        self.near_timeout,
+                        invalidation_count,
+                    )
+            values.update(remote_values)
+        return values
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.remote.set(key, value, timeout, version=version)
+        self.invalidate_near([key], version)
+        if self.is_near(key) and timeout != 0:
+            self.store.set(
+                self.get_near_key(key, version), value, self.get_near_timeout(timeout)
+            )
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed_keys = self.remote.set_many(data, timeout, version=version)
+        self.invalidate_near(list(data), version)
+        if timeout != 0:
+            near_timeout = self.get_near_timeout(timeout)
+            for key, value in data.items():
+                if self.is_near(key) and key not in failed_keys:
+                    self.store.set(self.get_near_key(key, version), value, near_timeout)
+        return failed_keys
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.remote.add(key, value, timeout, version=version)
+        if added:
+            self.invalidate_near([key], version)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        touched = self.remote.touch(key, timeout, version=version)
+        self.invalidate_near([key], version)
+        return touched
+
+    def delete(self, key, version=None):
+        deleted = self.remote.delete(key, version=version)
+        self.invalidate_near([key], version)
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        self.remote.delete_many(keys, version=version)
+        self.invalidate_near(list(keys), version)
+
+    def has_key(self, key, version=None):
+        return self.remote.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        value = self.remote.incr(key, delta, version=version)
+        self.invalidate_near([key], version)
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        value = self.remote.decr(key, delta, version=version)
+        self.invalidate_near([key], version)
+        return value
+
+    def clear(self):
+        self.remote.clear()
+        store = self.store
+        store.invalidate([ALL_KEYS])
+        store.bus.publish(store.node, [ALL_KEYS])
+
+    def close(self, **kwargs):
+        self.remote.close(**kwargs)
+
+    def stats(self):
+        """
+        Returns:
+            dict: The hit, miss, eviction and invalidation counters of the LRU of this process,
+            along with its current size.
+        """
+        store = self.store
+        with store.lock:
+            return {**store.stats, "size": len(store.entries)}
@@ -1,19 +1,294 @@
+import base64
+import binascii
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import F, Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import ParseError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 
 
+class EstimatedCountPaginator(Paginator):
+    """
+    Django paginator that avoids an exact `COUNT(*)` over large tables.
+
+    Querysets are counted from the planner estimate on Postgres, or, when unfiltered, from an exact
+    count cached for `count_cache_timeout` seconds on other databases. Small results (at most
+    `exact_count_threshold` rows) are counted exactly, or served from that cached count, which is
+    only an estimate as rows may have been created or deleted since. `is_exact` tells which one
+    `count` returned.
+    """
+
+    exact_count_threshold = 10000
+    count_cache_timeout = 300
+
+    @cached_property
+    def count(self):
+        self.is_exact = True
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+
+        queryset = queryset.order_by()
+        filtered = bool(queryset.query.where)
+        estimate = self.get_estimated_count(queryset, filtered)
+        if estimate is None:
+            return super().count
+        if estimate <= self.exact_count_threshold:
+            # Planner estimates are checked, the cached counts are not counted again
+            if connections[queryset.db].vendor == "postgresql":
+                return super().count
+            self.is_exact = False
+            return estimate
+        if filtered:
+            # Planner estimates of filtered querysets can be far off, check they are really large
+            capped_count = queryset[: self.exact_count_threshold + 1].count()
+            if capped_count <= self.exact_count_threshold:
+                return capped_count
+        self.is_exact = False
+        return estimate
+
+    def get_estimated_count(self, queryset, filtered):
+        """
+        Returns:
+            int: The estimated number of rows of `queryset`, or None if it cannot be estimated.
+        """
+        if connections[queryset.db].vendor == "postgresql":
+            plan = json.loads(queryset.explain(format="json"))
+            return int(plan[0]["Plan"]["Plan Rows"])
+        if not filtered:
+            cache_key = f"paginator_count_{queryset.model._meta.db_table}"
+            return cache.get_or_set(cache_key, queryset.count, self.count_cache_timeout)
+        return None
+
+    def validate_number(self, number):
+        if self.is_estimated:
+            # The last page is not known, so only the lower bound is enforced
+            try:
+                number = int(number)
+            except (TypeError, ValueError):
+                raise PageNotAnInteger(self.error_messages["invalid_page"])
+            if number < 1:
+                raise EmptyPage(self.error_messages["min_page"])
+            return number
+        return super().validate_number(number)
+
+    def page(self, number):
+        if self.is_estimated:
+            number = self.validate_number(number)
+            bottom = (number - 1) * self.per_page
+            top = bottom + self.per_page
+            return self._get_page(self.object_list[bottom:top], number, self)
+        return super().page(number)
+
+    @property
+    def is_estimated(self):
+        # Evaluating `count` is what sets `is_exact`
+        self.count
+        return not self.is_exact
+
+
 class BasePagination(PageNumberPagination):
+    """
+    Page number pagination with an opt-in keyset (cursor) mode.
+
+    Passing `?cursor=` (empty for the first page) switches to the cursor mode, which seeks on the
+    view's `cursor_ordering` (default: `("id",)`) instead of using an `OFFSET`, and skips the
+    `COUNT(*)` of the page number mode. Fetching a page costs the same at any depth.
+    """
+
     page_query_param = "page"
     page_size_query_param = "page_size"
     max_page_size = 50
+    cursor_query_param = "cursor"
+    cursor_ordering = ("id",)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if self.cursor_mode:
+            return self.paginate_queryset_by_cursor(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_mode:
+            return Response(
+                {
+                    "page_size": len(data),
+                    "next_cursor": self.next_cursor,
+                    "previous_cursor": self.previous_cursor,
+                    "results": data,
+                }
+            )
+        return Response(
+            {
+                "page": self.page.number,
+                "page_size": len(self.page.object_list),
+                "total_page_count": self.page.paginator.num_pages,
+                "total_results_count": self.page.paginator.count,
+                "results": data,
+            }
+        )
+
+    def paginate_queryset_by_cursor(self, queryset, request, view=None):
+        """
+        Return the page following (or, for a reversed cursor, preceding) the cursor position.
+
+        Null values are ordered as the largest ones, which matches how a plain ascending btree
+        index sorts them on Postgres, so both directions can be served by a single index scan.
+        """
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(
+            request.query_params.get(self.cursor_query_param, "")
+        )
+
+        # (field name, descending, nullable) in the order of the requested direction
+        ordering = getattr(view, "cursor_ordering", self.cursor_ordering)
+        fields = [
+            (
+                name.lstrip("-"),
+                name.startswith("-") != reverse,
+                queryset.model._meta.get_field(name.lstrip("-")).null,
+            )
+            for name in ordering
+        ]
+        if position is not None:
+            position = self.parse_position(queryset.model, fields, position)
+
+        queryset = queryset.order_by(
+            *[
+                (
+                    F(name).desc(nulls_first=True)
+                    if descending
+                    else F(name).asc(nulls_last=True)
+                )
+                for name, descending, _ in fields
+            ]
+        )
+        if position is not None:
+            queryset = queryset.filter(self.get_seek_filter(fields, position))
+
+        # One extra row tells whether there is anything beyond this page
+        results = list(queryset[: page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+
+        has_next = has_more if not reverse else position is not None
+        has_previous = has_more if reverse else position is not None
+        self.next_cursor = (
+            self.encode_cursor(self.get_position(results[-1], fields), reverse=False)
+            if results and has_next
+            else None
+        )
+        self.previous_cursor = (
+            self.encode_cursor(self.get_position(results[0], fields), reverse=True)
+            if results and has_previous
+            else None
+        )
+        return results
+
+    def parse_position(self, model, fields, position):
+        """
+        Convert the values of a decoded `position` with the model fields of `fields`, like the
+        `CursorPagination` of DRF does.
+
+        Raises:
+            ParseError: If the position does not match the fields, as for a tampered cursor.
+        """
+        if len(position) != len(fields):
+            raise ParseError({"error": "Invalid cursor."})
+        values = []
+        for (name, _, nullable), value in zip(fields, position):
+            if value is None:
+                if not nullable:
+                    raise ParseError({"error": "Invalid cursor."})
+                values.append(None)
+                continue
+            # Positions only hold scalars, `to_python` would stringify the others
+            if isinstance(value, (list, dict)):
+                raise ParseError({"error": "Invalid cursor."})
+            try:
+                values.append(model._meta.get_field(name).to_python(value))
+            except (ValidationError, ValueError, TypeError):
+                raise ParseError({"error": "Invalid cursor."})
+        return values
+
+    def get_seek_filter(self, fields, position):
+        """
+        Build the filter of rows strictly after `position` in the (lexicographic) ordering of
+        `fields`: `a > x OR (a = x AND b > y) ...`, with nulls ordered as the largest values.
+        """
+        seek = Q(pk__in=[])
+        equal = Q()
+        for (name, descending, nullable), value in zip(fields, position):
+            if value is None:
+                after = Q(**{f"{name}__isnull": False}) if descending else None
+                same = Q(**{f"{name}__isnull": True})
+            else:
+                after = Q(**{f"{name}__lt" if descending else f"{name}__gt": value})
+                if nullable and not descending:
+                    after |= Q(**{f"{name}__isnull": True})
+                same = Q(**{name: value})
+            if after is not None:
+                seek |= equal & after
+            equal &= same
+        return seek
+
+    def get_position(self, instance, fields):
+        if isinstance(instance, dict):
+            # Rows of a `.values()` queryset
+            return [instance[name] for name, _, _ in fields]
+        return [getattr(instance, name) for name, _, _ in fields]
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({"p": position, "r": reverse}, cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """
+        Returns:
+            tuple: The decoded position (None for the first page) and whether to walk backwards.
+
+        Raises:
+            ParseError: If the cursor was not issued by this paginator.
+        """
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            position, reverse = payload["p"], bool(payload["r"])
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise ParseError({"error": "Invalid cursor."})
+        if not isinstance(position, list):
+            raise ParseError({"error": "Invalid cursor."})
+        return position, reverse
+
+
+class EstimatedCountPagination(BasePagination):
+    """
+    `BasePagination` backed by `EstimatedCountPaginator`, reporting in `total_results_exact`
+    whether `total_results_count` is an exact count or an estimate.
+    """
+
+    django_paginator_class = EstimatedCountPaginator
 
     def get_paginated_response(self, data):
+        if self.cursor_mode:
+            return super().get_paginated_response(data)
         return Response(
             {
                 "page": self.page.number,
                 "page_size": len(self.page.object_list),
                 "total_page_count": self.page.paginator.num_pages,
                 "total_results_count": self.page.paginator.count,
+                "total_results_exact": self.page.paginator.is_exact,
                 "results": data,
             }
         )
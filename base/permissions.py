@@ -62,6 +62,19 @@ class IsRoleReaderOrAdmin(BasePermission):
         return request.user.role == "Reader"
 
 
+class IsRoleAdmin(BasePermission):
+    """
+    Custom permission to only allow access to Admins only.
+    """
+
+    message = {"error": "Only Admins are allowed to perform this action."}
+
+    def has_permission(self, request, view):
+        if request.user.is_staff:
+            return True
+        return request.user.role == "Admin"
+
+
 class IsOwnerOrAdmin(BasePermission):
     """
     Custom permission to only allow access to objects created by the requesting user.
@@ -0,0 +1,89 @@
+"""
+`django_redis` backend whose reads from async code go through a `redis.asyncio` client, instead
+of the sync client in a thread like the default async methods of Django cache backends.
+
+Keys and values are encoded by the sync client, so both clients read the same entries. Writes
+from async code still go through the sync client in a thread. The async client connects to the
+first server of `LOCATION` with the connection options of `OPTIONS` that `django_redis` applies
+to its own connections.
+
+Example:
+    CACHES = {
+        "redis": {
+            "BACKEND": "base.redis_cache.AsyncRedisCache",
+            "LOCATION": "redis://127.0.0.1:6379/1",
+            "OPTIONS": {
+                "SOCKET_TIMEOUT": 5,
+                "CONNECTION_POOL_KWARGS": {"max_connections": 100},
+            },
+        },
+    }
+"""
+
+import asyncio
+import weakref
+
+from django_redis.cache import RedisCache
+
+# Async clients per event loop and server, their connections cannot be shared between loops
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_connection_kwargs(options):
+    """
+    Returns:
+        dict: The keyword arguments of `redis.asyncio.Redis.from_url` matching the connection
+        options of `django_redis` among `options`.
+    """
+    kwargs = dict(options.get("CONNECTION_POOL_KWARGS", {}))
+    for option, kwarg in [
+        ("PASSWORD", "password"),
+        ("SOCKET_TIMEOUT", "socket_timeout"),
+        ("SOCKET_CONNECT_TIMEOUT", "socket_connect_timeout"),
+    ]:
+        if options.get(option):
+            kwargs[kwarg] = options[option]
+    return kwargs
+
+
+class AsyncRedisCache(RedisCache):
+    def __init__(self, server, params):
+        super().__init__(server, params)
+        # Reads go to the primary, the first server
+        servers = server.split(",") if isinstance(server, str) else server
+        self.async_url = servers[0]
+        self.async_connection_kwargs = get_async_connection_kwargs(
+            params.get("OPTIONS", {})
+        )
+
+    def get_async_client(self):
+        import redis.asyncio
+
+        clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+        client = clients.get(self.async_url)
+        if client is None:
+            client = clients[self.async_url] = redis.asyncio.Redis.from_url(
+                self.async_url, **self.async_connection_kwargs
+            )
+        return client
+
+    async def aget(self, key, default=None, version=None):
+        value = await self.get_async_client().get(
+            self.client.make_key(key, version=version)
+        )
+        if value is None:
+            return default
+        return self.client.decode(value)
+
+    async def aget_many(self, keys, version=None):
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = await self.get_async_client().mget(
+            [self.client.make_key(key, version=version) for key in keys]
+        )
+        return {
+            key: self.client.decode(value)
+            for key, value in zip(keys, values)
+            if value is not None
+        }
@@ -0,0 +1,130 @@
+"""
+JSON renderer and parser backed by `orjson` when it is installed, and by the standard library
+`json` (through the stock DRF classes) otherwise, and renderers of pre-rendered feeds.
+
+Both encoders share `JSONEncoder.default`, so they render the same types the same way: dates as
+ECMA 262 strings, Decimals as floats, lazy strings, phone numbers in the configured format and
+files as their URL.
+"""
+
+import codecs
+
+from django.conf import settings
+from django.db.models.fields.files import FieldFile
+from phonenumber_field.phonenumber import PhoneNumber
+from rest_framework.exceptions import NotAcceptable, ParseError
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Escaped by the stock renderer, so that the output is a strict subset of JavaScript
+LINE_SEPARATORS = [
+    ("\u2028".encode(), b"\\u2028"),
+    ("\u2029".encode(), b"\\u2029"),
+]
+
+
+class JSONEncoder(encoders.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, PhoneNumber):
+            return str(obj)
+        if isinstance(obj, FieldFile):
+            return obj.url if obj else None
+        return super().default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    `JSONRenderer` encoding with `orjson`. Indented output, which `orjson` only supports with two
+    spaces, and integers beyond 64 bits are rendered by the stock renderer.
+    """
+
+    encoder_class = JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in ret:
+                ret = ret.replace(separator, escaped)
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """
+    `JSONParser` decoding with `orjson`, which rejects `NaN` and `Infinity` like the strict mode.
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            data = stream.read()
+            if codecs.lookup(encoding).name != "utf-8":
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except (ValueError, orjson.JSONDecodeError) as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
+
+
+class PrerenderedRenderer(BaseRenderer):
+    """
+    Renderer of responses whose data is the rendered document already, as bytes.
+    """
+
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b"" if data is None else data
+
+
+class RSSRenderer(PrerenderedRenderer):
+    media_type = "application/rss+xml"
+    format = "rss"
+
+
+class AtomRenderer(PrerenderedRenderer):
+    media_type = "application/atom+xml"
+    format = "atom"
+
+
+class JSONFeedRenderer(PrerenderedRenderer):
+    media_type = "application/feed+json"
+    format = "json"
+
+
+class FallbackContentNegotiation(DefaultContentNegotiation):
+    """
+    Content negotiation falling back to the first renderer when none matches the `Accept` header
+    rather than failing with a 406, for clients asking for a media type the view does not name
+    (such as `text/xml` for a feed).
+    """
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        try:
+            return super().select_renderer(request, renderers, format_suffix)
+        except NotAcceptable:
+            return renderers[0], renderers[0].media_type
@@ -0,0 +1,44 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from base.cache import get_or_build, invalidate
+
+
+class GetOrBuildTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.build = mock.Mock(return_value=("value", ["dependency"]))
+
+    def test_builds_once(self):
+        for _ in range(2):
+            self.assertEqual(get_or_build("key", self.build, tags=["tag"]), "value")
+        self.assertEqual(self.build.call_count, 1)
+        self.assertIsNone(cache.get("lock_key"))
+
+    def test_rebuilds_invalidated(self):
+        get_or_build("key", self.build, tags=["tag"])
+        invalidate("dependency")
+        get_or_build("key", self.build, tags=["tag"])
+        self.assertEqual(self.build.call_count, 2)
+
+    def test_keeps_the_lock_of_another_builder(self):
+        cache.add("lock_key", "other", 10)
+        self.assertEqual(get_or_build("key", self.build, lock_timeout=0.2), "value")
+        self.assertEqual(cache.get("lock_key"), "other")
+
+    def test_takes_over_a_released_lock(self):
+        cache.add("lock_key", "other", 10)
+
+        def wait_for_entry(key, lock_key, lock_timeout):
+            # The holder released the lock without rebuilding
+            cache.delete(lock_key)
+            return None
+
+        with mock.patch("base.cache.wait_for_entry", wait_for_entry), mock.patch(
+            "base.cache.cache.add", wraps=cache.add
+        ) as add:
+            self.assertEqual(get_or_build("key", self.build), "value")
+        self.assertEqual(add.call_count, 2)
+        self.assertIsNone(cache.get("lock_key"))
@@ -0,0 +1,123 @@
+import os
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from base import near_cache
+from base.near_cache import NearCache
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "remote": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "near-cache-tests",
+        },
+    }
+)
+class NearCacheTests(SimpleTestCase):
+    def setUp(self):
+        caches["remote"].clear()
+        self.channel = self.id()
+        self.addCleanup(near_cache._local_subscribers.pop, self.channel, None)
+
+    def create_cache(self, name, **options):
+        """
+        Return a near cache standing in for a worker, sharing the remote cache and the bus of
+        the test with the others.
+        """
+        name = f"{self.channel}.{name}"
+        self.addCleanup(near_cache._stores.pop, (name, os.getpid()), None)
+        return NearCache(
+            "remote",
+            {
+                "OPTIONS": {
+                    "KEY_PREFIXES": ["blog_"],
+                    "NAME": name,
+                    "BUS_OPTIONS": {"channel": self.channel},
+                    **options,
+                }
+            },
+        )
+
+    def test_writes_invalidate_the_other_caches(self):
+        first, second = self.create_cache("first"), self.create_cache("second")
+        first.set("blog_1", "old")
+        self.assertEqual(second.get("blog_1"), "old")
+
+        first.set("blog_1", "new")
+        self.assertEqual(second.get("blog_1"), "new")
+        first.delete("blog_1")
+        self.assertIsNone(second.get("blog_1"))
+
+        first.set_many({"blog_1": "many", "blog_2": "many"})
+        self.assertEqual(second.get_many(["blog_1", "blog_2"])["blog_2"], "many")
+        first.clear()
+        self.assertEqual(second.get_many(["blog_1", "blog_2"]), {})
+        self.assertEqual(second.stats()["invalidations"], 4)
+
+    def test_least_recently_used_keys_are_evicted(self):
+        cache = self.create_cache("cache", MAX_ENTRIES=2)
+        cache.set("blog_1", 1)
+        cache.set("blog_2", 2)
+        cache.get("blog_1")
+        cache.set("blog_3", 3)
+
+        stats = cache.stats()
+        self.assertEqual((stats["size"], stats["evictions"]), (2, 1))
+        self.assertEqual(cache.store.get("2:blog_2"), (None, False))
+        self.assertEqual(cache.store.get("1:blog_1"), (1, True))
+        # Still served from the remote cache
+        self.assertEqual(cache.get("blog_2"), 2)
+
+    def test_fetches_overlapping_an_invalidation_are_not_kept(self):
+        first, second = self.create_cache("first"), self.create_cache("second")
+        first.set("blog_1", "old")
+        remote = caches["remote"]
+        remote_get = remote.get
+
+        def get_then_overwrite(*args, **kwargs):
+            value = remote_get(*args, **kwargs)
+            first.set("blog_1", "new")
+            return value
+
+        with mock.patch.object(remote, "get", side_effect=get_then_overwrite):
+            self.assertEqual(second.get("blog_1"), "old")
+        self.assertEqual(second.stats()["size"], 0)
+        self.assertEqual(second.get("blog_1"), "new")
+
+    def test_hits_and_misses_are_counted(self):
+        cache = self.create_cache("cache")
+        caches["remote"].set("blog_1", 1)
+        caches["remote"].set("comment_1", 1)
+        for _ in range(3):
+            self.assertEqual(cache.get("blog_1"), 1)
+        self.assertIsNone(cache.get("blog_2"))
+        # Keys without a near prefix only go to the remote cache
+        self.assertEqual(cache.get("comment_1"), 1)
+
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 2))
+        self.assertEqual(stats["size"], 1)
+
+
+class RedisInvalidationBusTests(SimpleTestCase):
+    def test_messages_of_other_nodes_are_delivered(self):
+        with mock.patch("redis.Redis.from_url") as from_url:
+            bus = near_cache.RedisInvalidationBus("redis://127.0.0.1:6379/1")
+        client = from_url.return_value
+        callback = mock.Mock()
+        bus.subscribe("node", callback)
+        [handle] = client.pubsub.return_value.subscribe.call_args.kwargs.values()
+
+        bus.publish("node", ["1:blog_1"])
+        channel, data = client.publish.call_args.args
+        self.assertEqual(channel, "near_cache_invalidation")
+        handle({"data": data})
+        callback.assert_not_called()
+
+        bus.publish("other", ["1:blog_1"])
+        handle({"data": client.publish.call_args.args[1]})
+        callback.assert_called_once_with(["1:blog_1"])
@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from base.paginator import EstimatedCountPaginator
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        for index in range(3):
+            User.objects.create_user(
+                f"user{index}@example.com", "password", phone_number="+919999999999"
+            )
+        self.queryset = User.objects.order_by("id")
+
+    def test_unfiltered_count_is_cached(self):
+        with self.assertNumQueries(1):
+            paginator = EstimatedCountPaginator(self.queryset, 2)
+            self.assertEqual(paginator.count, 3)
+        self.assertFalse(paginator.is_exact)
+
+        with self.assertNumQueries(0):
+            paginator = EstimatedCountPaginator(self.queryset, 2)
+            self.assertEqual(paginator.count, 3)
+            self.assertEqual(paginator.num_pages, 2)
+
+    def test_rows_created_after_the_count_is_cached_are_paginated(self):
+        EstimatedCountPaginator(self.queryset, 2).count
+        User = get_user_model()
+        for index in range(3, 6):
+            User.objects.create_user(
+                f"user{index}@example.com", "password", phone_number="+919999999999"
+            )
+
+        paginator = EstimatedCountPaginator(self.queryset, 2)
+        self.assertEqual(paginator.count, 3)
+        self.assertFalse(paginator.is_exact)
+        self.assertEqual(
+            [user.email for user in paginator.page(3).object_list],
+            ["user4@example.com", "user5@example.com"],
+        )
+
+    def test_filtered_count_is_exact(self):
+        queryset = self.queryset.filter(email__startswith="user1")
+        with self.assertNumQueries(1):
+            paginator = EstimatedCountPaginator(queryset, 2)
+            self.assertEqual(paginator.count, 1)
+        self.assertTrue(paginator.is_exact)
+
+    def test_large_count_is_estimated(self):
+        paginator = EstimatedCountPaginator(self.queryset, 2)
+        paginator.exact_count_threshold = 2
+        self.assertEqual(paginator.count, 3)
+        self.assertFalse(paginator.is_exact)
+        self.assertEqual(len(paginator.page(2).object_list), 1)
@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from base.redis_cache import AsyncRedisCache
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for the sync client of `django_redis` and for its `redis.asyncio`
+    counterpart, sharing the same entries.
+    """
+
+    def __init__(self):
+        self.entries = {}
+
+    def set(self, name, value, nx=False, px=None, xx=False):
+        if (nx and name in self.entries) or (xx and name not in self.entries):
+            return False
+        self.entries[name] = value
+        return True
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        return []
+
+    def get(self, name):
+        return self.entries.get(name)
+
+    def mget(self, names):
+        return [self.entries.get(name) for name in names]
+
+
+class FakeAsyncRedis:
+    def __init__(self, redis):
+        self.redis = redis
+
+    async def get(self, name):
+        return self.redis.get(name)
+
+    async def mget(self, names):
+        return self.redis.mget(names)
+
+
+class AsyncRedisCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = AsyncRedisCache(
+            "redis://primary:6379/1,redis://replica:6379/1",
+            {
+                "OPTIONS": {
+                    "PASSWORD": "secret",
+                    "SOCKET_TIMEOUT": 5,
+                    "CONNECTION_POOL_KWARGS": {"max_connections": 10},
+                }
+            },
+        )
+        self.redis = FakeRedis()
+        patcher = mock.patch("redis.asyncio.Redis.from_url")
+        self.from_url = patcher.start()
+        self.from_url.return_value = FakeAsyncRedis(self.redis)
+        self.addCleanup(patcher.stop)
+        # The sync client of `django_redis` writes to the fake as well
+        self.cache.client.get_client = lambda *args, **kwargs: self.redis
+        self.cache.client.get_client_with_index = lambda *args, **kwargs: (
+            self.redis,
+            0,
+        )
+
+    async def test_async_client_uses_the_options(self):
+        self.cache.get_async_client()
+        self.cache.get_async_client()
+        self.from_url.assert_called_once_with(
+            "redis://primary:6379/1",
+            max_connections=10,
+            password="secret",
+            socket_timeout=5,
+        )
+
+    async def test_reads_the_writes_of_the_sync_client(self):
+        await self.cache.aset_many({"a": 1, "b": {"c": [2]}}, 60)
+        self.assertEqual(await self.cache.aget("a"), 1)
+        self.assertEqual(await self.cache.aget("missing", "default"), "default")
+        self.assertEqual(
+            await self.cache.aget_many(["a", "b", "missing"]),
+            {"a": 1, "b": {"c": [2]}},
+        )
+
+    async def test_get_or_set(self):
+        self.assertEqual(await self.cache.aget_or_set("key", lambda: "value"), "value")
+        self.assertEqual(await self.cache.aget_or_set("key", "other"), "value")
+        self.assertEqual(self.cache.get("key"), "value")
@@ -0,0 +1,72 @@
+"""
+Trees stored as materialized paths.
+
+The path of a node is the path of its parent followed by its own primary key, zero-padded to
+`PATH_STEP` digits, so that ordering by path walks the tree depth first, siblings by primary key,
+and a subtree is the range of paths between its root and the following sibling of its root:
+
+    1              0000000001
+    ├── 4          00000000010000000004
+    │   └── 9      000000000100000000040000000009
+    └── 7          00000000010000000007
+    2              0000000002
+
+Paths are only made of digits, so every collation orders them the same and both ranges and
+ordering are served by a plain btree index.
+"""
+
+from django.db.models import Q
+
+PATH_STEP = 10
+
+
+def build_path(parent_path, pk):
+    return f"{parent_path or ''}{pk:0{PATH_STEP}d}"
+
+
+def get_depth(path):
+    """
+    Returns:
+        int: The depth of the node of `path`, 1 for roots, 0 for the empty path above them.
+    """
+    return len(path) // PATH_STEP
+
+
+def get_parent_pk(path):
+    """
+    Returns:
+        int: The primary key of the parent of the node of `path`, None for roots.
+    """
+    if get_depth(path) < 2:
+        return None
+    return int(path[:-PATH_STEP][-PATH_STEP:])
+
+
+def get_subtree_filter(path, field="path"):
+    """
+    Build the filter of the nodes strictly below the node of `path`, as a range of paths.
+    """
+    if not path:
+        return Q()
+    following = f"{path[:-PATH_STEP]}{int(path[-PATH_STEP:]) + 1:0{PATH_STEP}d}"
+    return Q(**{f"{field}__gt": path, f"{field}__lt": following})
+
+
+def nest(items, paths, children_key):
+    """
+    Nest `items`, ordered by their `paths`, under the closest of their ancestors among them.
+
+    Returns:
+        list: The items whose ancestors are not among `items`, each with its children listed
+        under `children_key`.
+    """
+    roots, ancestors = [], []
+    for item, path in zip(items, paths):
+        item[children_key] = []
+        # Paths are made of whole steps, so a prefix is an ancestor
+        while ancestors and not path.startswith(ancestors[-1][0]):
+            ancestors.pop()
+        siblings = ancestors[-1][1][children_key] if ancestors else roots
+        siblings.append(item)
+        ancestors.append((path, item))
+    return roots
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.development")
+# Async views only pay off when served by an event loop
+os.environ.setdefault("ASYNC_VIEWS", "true")
 
 application = get_asgi_application()
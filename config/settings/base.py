@@ -166,8 +166,14 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
         "base.permissions.IsAPIKeyAuthenticated"
     ],
+    # Encoded with orjson when installed, with the standard library otherwise
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "base.renderers.FastJSONRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "base.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ],
     "DEFAULT_PAGINATION_CLASS": "base.paginator.BasePagination",
     "PAGE_SIZE": 10,
@@ -201,11 +207,18 @@ SIMPLE_JWT = {
 
 API_KEY = env("API_KEY")
 
+# Serve the reads of the blog and comment endpoints from the event loop, set by config/asgi.py
+ASYNC_VIEWS = env.bool("ASYNC_VIEWS", default=False)
+
+# Buffer comment votes in the cache, written by `python manage.py flush_votes`, see core/blog/votes.py
+BUFFERED_VOTES = env.bool("BUFFERED_VOTES", default=False)
+
 PHONENUMBER_DEFAULT_REGION="IN"
 
 CACHES = {
     "default": {
-        "BACKEND": "django_redis.cache.RedisCache",
+        # Read with a redis.asyncio client by the async views
+        "BACKEND": "base.redis_cache.AsyncRedisCache",
         "LOCATION": "redis://127.0.0.1:6379/1",
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
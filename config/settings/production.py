@@ -20,9 +20,23 @@ DATABASES = {
 }
 
 # Caching
+# Hot keys are served from a per-process LRU in front of Redis, see base.near_cache
 CACHES = {
     "default": {
-        "BACKEND": "django_redis.cache.RedisCache",
+        "BACKEND": "base.near_cache.NearCache",
+        "LOCATION": "redis",
+        "TIMEOUT": 300, # Cache timeout in seconds (5 minutes)
+        "OPTIONS": {
+            "MAX_ENTRIES": 2000,
+            "NEAR_TIMEOUT": 30,
+            "KEY_PREFIXES": ["blog_", "comment_", "feed_", "generation_"],
+            "BUS": "base.near_cache.RedisInvalidationBus",
+            "BUS_OPTIONS": {"url": "redis://127.0.0.1:6379/1"},
+        },
+    },
+    "redis": {
+        # Read with a redis.asyncio client by the async views
+        "BACKEND": "base.redis_cache.AsyncRedisCache",
         "LOCATION": "redis://127.0.0.1:6379/1",
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
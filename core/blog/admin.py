@@ -1,8 +1,31 @@
 from django.contrib import admin
 
+from base.paginator import EstimatedCountPaginator
+
+from .excerpts import get_reading_stats
 from .models import Blog, Category, Tag
 
+
 # Register your models here.
-admin.site.register(Category)
-admin.site.register(Tag)
-admin.site.register(Blog)
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(Blog)
+class BlogAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def save_model(self, request, obj, form, change):
+        if "content" in form.changed_data:
+            for field, value in get_reading_stats(obj.content).items():
+                setattr(obj, field, value)
+        super().save_model(request, obj, form, change)
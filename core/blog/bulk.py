@@ -0,0 +1,254 @@
+"""
+Bulk writes of blogs, comments and tags, issuing a constant number of queries per batch.
+
+`bulk_create` and `bulk_update` neither call `save` nor send signals, so the search index, the
+feeds, the comment counters and paths and the `updated_at` they maintain are kept up to date here.
+Invalidating the caches is left to the views, once per batch.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from base.tree import get_parent_pk
+
+from .feeds import get_blog_feeds, update_feeds
+from .models import Blog, Category, Comment, Tag
+from .search import get_search_backend
+
+
+def to_pk(value):
+    """
+    Returns:
+        int: `value` as a primary key, None if it is not one.
+    """
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_values(items, field):
+    return [item.get(field) for item in items if isinstance(item, dict)]
+
+
+def get_or_create_tags(names):
+    """
+    Returns:
+        dict: The tag of each of the valid `names`, the missing ones being created, with at most
+        three queries.
+    """
+    max_length = Tag._meta.get_field("name").max_length
+    names = {name.strip() for name in names} - {""}
+    names = {name for name in names if len(name) <= max_length}
+    tags = {tag.name: tag for tag in Tag.objects.filter(name__in=names)}
+    missing = names - set(tags)
+    if missing:
+        # Tags created concurrently are skipped, and fetched with the others
+        Tag.objects.bulk_create(
+            [Tag(name=name) for name in sorted(missing)], ignore_conflicts=True
+        )
+        tags.update({tag.name: tag for tag in Tag.objects.filter(name__in=missing)})
+    return tags
+
+
+def preload_blog_relations(items):
+    """
+    Fetch the categories and tags the blog `items` refer to with one query per model, for
+    `BlogBulkSerializer` to validate them without queries. Tags may be referred to by name, the
+    missing ones are created.
+
+    Returns:
+        dict: The instances per model, keyed by primary key, and also by name for tags.
+    """
+    category_ids = {to_pk(value) for value in get_values(items, "category")}
+    tag_ids, tag_names = set(), set()
+    for tags in get_values(items, "tags"):
+        for tag in tags if isinstance(tags, list) else []:
+            if isinstance(tag, str):
+                tag_names.add(tag)
+            else:
+                tag_ids.add(to_pk(tag))
+
+    tags = {tag.id: tag for tag in Tag.objects.filter(pk__in=tag_ids - {None})}
+    tags.update(get_or_create_tags(tag_names))
+    categories = Category.objects.filter(pk__in=category_ids - {None})
+    return {
+        Category: {category.id: category for category in categories},
+        Tag: tags,
+    }
+
+
+def preload_comment_relations(items):
+    """
+    Fetch the blogs and parent comments the comment `items` refer to with one query per model,
+    for `CommentBulkSerializer` to validate them without queries.
+    """
+    blog_ids = {to_pk(value) for value in get_values(items, "blog")}
+    parent_ids = {to_pk(value) for value in get_values(items, "parent")}
+    blogs = Blog.objects.filter(pk__in=blog_ids - {None}).only("id")
+    parents = Comment.objects.filter(pk__in=parent_ids - {None}).only(
+        "id", "blog_id", "path"
+    )
+    return {
+        Blog: {blog.id: blog for blog in blogs},
+        Comment: {comment.id: comment for comment in parents},
+    }
+
+
+def set_blog_tags(blog_tags, replace=False):
+    """
+    Set the tags of each of the `(blog, tags)` pairs of `blog_tags` with one bulk insert into the
+    through table, after deleting their current tags with one query when `replace` is set.
+    """
+    through = Blog.tags.through
+    if replace:
+        through.objects.filter(blog_id__in=[blog.id for blog, _ in blog_tags]).delete()
+    through.objects.bulk_create(
+        [
+            through(blog_id=blog.id, tag_id=tag.id)
+            for blog, tags in blog_tags
+            for tag in dict.fromkeys(tags)
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def create_blogs(blogs_data):
+    """
+    Create a blog from each of the validated `blogs_data`, along with its tags.
+
+    Returns:
+        list: The blogs created, in the same order.
+    """
+    blogs, blog_tags = [], []
+    for data in blogs_data:
+        data = dict(data)
+        tags = data.pop("tags", [])
+        blog = Blog(**data)
+        blogs.append(blog)
+        blog_tags.append((blog, tags))
+
+    with transaction.atomic():
+        Blog.objects.bulk_create(blogs)
+        set_blog_tags(blog_tags)
+    get_search_backend().update([blog.id for blog in blogs])
+    update_feeds(
+        [blog.id for blog in blogs],
+        {feed for blog in blogs for feed in get_blog_feeds(blog)},
+    )
+    return blogs
+
+
+def update_blogs(updates):
+    """
+    Apply the validated data of each of the `(blog, data)` pairs of `updates`, replacing the tags
+    of the blogs it names tags for.
+    """
+    now = timezone.now()
+    fields = {"updated_at"}
+    blog_tags = []
+    for blog, data in updates:
+        data = dict(data)
+        if "tags" in data:
+            blog_tags.append((blog, data.pop("tags")))
+        for field, value in data.items():
+            setattr(blog, field, value)
+        fields.update(data)
+        blog.updated_at = now
+
+    blogs = [blog for blog, _ in updates]
+    with transaction.atomic():
+        Blog.objects.bulk_update(blogs, sorted(fields))
+        if blog_tags:
+            set_blog_tags(blog_tags, replace=True)
+    get_search_backend().update([blog.id for blog in blogs])
+    update_feeds(
+        [blog.id for blog in blogs],
+        {feed for blog in blogs for feed in get_blog_feeds(blog)},
+    )
+
+
+def create_comments(comments_data):
+    """
+    Create a comment from each of the validated `comments_data`, and count them on their blogs
+    and parents with one update per distinct number of new comments.
+
+    Returns:
+        list: The comments created, in the same order.
+    """
+    comments = [Comment(**data) for data in comments_data]
+    blog_ids_per_count = defaultdict(list)
+    for blog_id, count in Counter(comment.blog_id for comment in comments).items():
+        blog_ids_per_count[count].append(blog_id)
+
+    with transaction.atomic():
+        Comment.objects.bulk_create(comments)
+        # The paths end with the primary keys, only known once inserted
+        for comment in comments:
+            comment.path = comment.get_path()
+        Comment.objects.bulk_update(comments, ["path"])
+        for count, blog_ids in blog_ids_per_count.items():
+            Blog.objects.filter(pk__in=blog_ids).update(
+                comments_count=F("comments_count") + count, updated_at=timezone.now()
+            )
+        Comment.shift_reply_counts(Counter(comment.parent_id for comment in comments))
+    return comments
+
+
+def update_comments(updates):
+    """
+    Apply the validated data of each of the `(comment, data)` pairs of `updates`, moving the
+    replies of the comments replying to another one along with them.
+
+    The subtrees moved must be disjoint, and the new parents outside of them.
+    """
+    now = timezone.now()
+    fields = {"updated_at"}
+    moves, reply_counts = [], Counter()
+    for comment, data in updates:
+        for field, value in data.items():
+            setattr(comment, field, value)
+        fields.update(data)
+        comment.updated_at = now
+        if comment.parent_id != get_parent_pk(comment.path):
+            moves.append((comment, comment.path))
+            reply_counts[get_parent_pk(comment.path)] -= 1
+            reply_counts[comment.parent_id] += 1
+            comment.path = comment.get_path()
+            fields.add("path")
+
+    with transaction.atomic():
+        Comment.objects.bulk_update([comment for comment, _ in updates], sorted(fields))
+        for comment, previous_path in moves:
+            Comment.move_replies(comment.blog_id, previous_path, comment.path)
+        Comment.shift_reply_counts(reply_counts)
+
+
+def rename_tags(renames):
+    """
+    Rename each tag of the `(tag, name)` pairs of `renames`, and mark the blogs embedding them
+    as changed.
+
+    Returns:
+        list: The ids of the blogs of the renamed tags.
+    """
+    tags = []
+    for tag, name in renames:
+        tag.name = name
+        tags.append(tag)
+
+    with transaction.atomic():
+        Tag.objects.bulk_update(tags, ["name"])
+        blog_ids = list(
+            Blog.tags.through.objects.filter(tag__in=tags)
+            .values_list("blog_id", flat=True)
+            .distinct()
+        )
+        Blog.objects.filter(pk__in=blog_ids).update(updated_at=timezone.now())
+    get_search_backend().update(blog_ids)
+    return blog_ids
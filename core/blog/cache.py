@@ -0,0 +1,21 @@
+"""
+Dependency tags of the cached blog and comment fragments, see `base.cache.set_fragments`.
+"""
+
+
+def blog_dependencies(data):
+    """
+    Return the tags of a fragment built from the serialized `data` of a blog, which embeds its
+    author, category and tags unless a sparse fieldset left them out.
+    """
+    tags = [f"blog:{data['id']}", f"blog:{data['id']}:comments"]
+    if data.get("author") is not None:
+        tags.append(f"author:{data['author']['id']}")
+    tags.extend(f"tag:{tag['id']}" for tag in data.get("tags", []))
+    if data.get("category") is not None:
+        tags.append(f"category:{data['category']['id']}")
+    return tags
+
+
+def comment_dependencies(data):
+    return [f"comment:{data['id']}"]
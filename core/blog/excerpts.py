@@ -0,0 +1,37 @@
+"""
+Excerpt, word count and reading time of blogs, stored on `Blog` so that lists never read the
+content.
+"""
+
+import html
+import math
+
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 50
+EXCERPT_MAX_LENGTH = 500
+WORDS_PER_MINUTE = 200
+
+
+def get_plain_text(content):
+    """
+    Return `content` without its markup and entities, its whitespace collapsed.
+    """
+    return " ".join(html.unescape(strip_tags(content or "")).split())
+
+
+def get_reading_stats(content):
+    """
+    Returns:
+        dict: The `excerpt`, `word_count` and `reading_time` (in minutes, rounded up) of
+        `content`, as stored on `Blog`.
+    """
+    text = get_plain_text(content)
+    word_count = len(text.split())
+    excerpt = Truncator(Truncator(text).words(EXCERPT_WORDS)).chars(EXCERPT_MAX_LENGTH)
+    return {
+        "excerpt": excerpt,
+        "word_count": word_count,
+        "reading_time": math.ceil(word_count / WORDS_PER_MINUTE),
+    }
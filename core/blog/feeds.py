@@ -0,0 +1,391 @@
+"""
+RSS, Atom and JSON feeds of the latest published blogs, of the whole site, of a category and of an
+author, served as documents rendered ahead of the requests.
+
+Each feed keeps its latest entries in a fragment (see `base.cache`), with a few spare ones beyond
+those rendered. When blogs are written, `update_feeds` patches their entries into the feeds they
+are in, or were in, and renders the documents again, without querying the other entries. Feeds are
+only rebuilt from the database when missing, when their dependencies (the authors, categories and
+tags they embed) are renamed, or when deletions used up their spare entries.
+"""
+
+import hashlib
+from collections import defaultdict
+from datetime import date, datetime, time
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.http import quote_etag
+
+from base.cache import (
+    get_or_build,
+    get_versions,
+    invalidate,
+    is_up_to_date,
+    set_fragments,
+)
+from base.renderers import FastJSONRenderer
+from core.custom_auth.models import User
+
+from .models import Blog, Category
+
+FEED_TITLE = "Blogs"
+FEED_ENTRIES = 50
+# Kept beyond the rendered entries, so that deleting or unpublishing blogs does not rebuild feeds
+FEED_SPARE_ENTRIES = 10
+FEED_TIMEOUT = 60 * 60 * 24
+FEED_FORMATS = ["rss", "atom", "json"]
+
+
+class Feed(NamedTuple):
+    """
+    A feed of the published blogs, of the whole site (`kind` "site") or of the category or
+    author (`kind` "category" or "author") whose primary key is `pk`.
+    """
+
+    kind: str
+    pk: int = None
+
+    @property
+    def name(self):
+        return self.kind if self.pk is None else f"{self.kind}_{self.pk}"
+
+    @property
+    def tag(self):
+        return f"feed:{self.name}"
+
+    def get_key(self, feed_format=None):
+        if feed_format is None:
+            return f"feed_{self.name}"
+        return f"feed_{self.name}_{feed_format}"
+
+    def get_queryset(self):
+        queryset = Blog.objects.filter(is_published=True)
+        if self.kind == "category":
+            return queryset.filter(category_id=self.pk)
+        if self.kind == "author":
+            return queryset.filter(author_id=self.pk)
+        return queryset
+
+    def get_path(self):
+        if self.kind == "site":
+            return reverse("feed")
+        return reverse(f"{self.kind}-feed", args=[self.pk])
+
+    def get_header(self):
+        """
+        Returns:
+            dict: The title and the description of the feed, and the tags they depend on.
+
+        Raises:
+            ObjectDoesNotExist: If the category or the author does not exist.
+        """
+        if self.kind == "category":
+            category = Category.objects.get(pk=self.pk)
+            return {
+                "title": f"{FEED_TITLE}: {category.name}",
+                "description": f"Latest blogs in {category.name}.",
+                "dependencies": [f"category:{self.pk}"],
+            }
+        if self.kind == "author":
+            author = User.objects.get(pk=self.pk)
+            name = f"{author.first_name} {author.last_name}".strip()
+            return {
+                "title": f"{FEED_TITLE} by {name}",
+                "description": f"Latest blogs by {name}.",
+                "dependencies": [f"author:{self.pk}"],
+            }
+        return {
+            "title": FEED_TITLE,
+            "description": "Latest blogs.",
+            "dependencies": [],
+        }
+
+
+def get_blog_feeds(blog):
+    """
+    Returns:
+        set: The feeds `blog` belongs to, or belonged to when it was loaded from the database.
+    """
+    feeds = {Feed("site")}
+    loaded_values = getattr(blog, "_loaded_values", {})
+    for values in [
+        loaded_values,
+        {"category_id": blog.category_id, "author_id": blog.author_id},
+    ]:
+        if values.get("category_id") is not None:
+            feeds.add(Feed("category", values["category_id"]))
+        if values.get("author_id") is not None:
+            feeds.add(Feed("author", values["author_id"]))
+    return feeds
+
+
+def get_entries(queryset, limit=None):
+    """
+    Returns:
+        list: The feed entries of the (`limit` first) blogs of `queryset`, latest first, read
+        with two queries.
+    """
+    queryset = queryset.order_by(F("publication_date").desc(nulls_last=True), "-id")
+    rows = list(
+        queryset[:limit].values(
+            "id",
+            "title",
+            "excerpt",
+            "publication_date",
+            "updated_at",
+            "category_id",
+            "category__name",
+            "author_id",
+            "author__first_name",
+            "author__last_name",
+        )
+    )
+    tags = defaultdict(list)
+    for blog_id, tag_id, tag_name in (
+        Blog.tags.through.objects.filter(blog_id__in=[row["id"] for row in rows])
+        .order_by("tag_id")
+        .values_list("blog_id", "tag_id", "tag__name")
+    ):
+        tags[blog_id].append((tag_id, tag_name))
+
+    return [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "summary": row["excerpt"],
+            "published": row["publication_date"],
+            "updated": row["updated_at"],
+            "author": (
+                row["author_id"],
+                f"{row['author__first_name']} {row['author__last_name']}".strip(),
+            ),
+            "category": (
+                (row["category_id"], row["category__name"])
+                if row["category_id"] is not None
+                else None
+            ),
+            "tags": tags[row["id"]],
+        }
+        for row in rows
+    ]
+
+
+def get_entry_key(entry):
+    # Same order as `get_entries`, blogs without a publication date last
+    return (entry["published"] or date.min, entry["id"])
+
+
+def get_dependencies(feed, state):
+    tags = {feed.tag, *state["dependencies"]}
+    for entry in state["entries"]:
+        tags.add(f"author:{entry['author'][0]}")
+        if entry["category"] is not None:
+            tags.add(f"category:{entry['category'][0]}")
+        tags.update(f"tag:{tag_id}" for tag_id, _ in entry["tags"])
+    return sorted(tags)
+
+
+def build_state(feed):
+    """
+    Read the header and the latest entries of `feed` from the database.
+
+    Returns:
+        tuple: The state of the feed and the tags it depends on.
+    """
+    limit = FEED_ENTRIES + FEED_SPARE_ENTRIES
+    entries = get_entries(feed.get_queryset(), limit + 1)
+    state = {
+        **feed.get_header(),
+        "entries": entries[:limit],
+        # Whether older entries were left out, which a patch cannot bring back
+        "truncated": len(entries) > limit,
+    }
+    return state, get_dependencies(feed, state)
+
+
+def patch_state(state, blog_ids, entries):
+    """
+    Replace the entries of the blogs `blog_ids` in `state` with `entries`, their current entries
+    among those of the feed.
+
+    Returns:
+        dict: The patched state, or None when the feed has to be rebuilt from the database.
+    """
+    blog_ids = set(blog_ids)
+    kept = [entry for entry in state["entries"] if entry["id"] not in blog_ids]
+    oldest = get_entry_key(state["entries"][-1]) if state["entries"] else None
+    for entry in entries:
+        # Older than the entries kept, the ones in between are not known
+        if state["truncated"] and oldest is not None and get_entry_key(entry) < oldest:
+            continue
+        kept.append(entry)
+    kept.sort(key=get_entry_key, reverse=True)
+
+    limit = FEED_ENTRIES + FEED_SPARE_ENTRIES
+    truncated = state["truncated"] or len(kept) > limit
+    if truncated and len(kept) < FEED_ENTRIES:
+        return None
+    return {**state, "entries": kept[:limit], "truncated": truncated}
+
+
+def get_state(feed):
+    """
+    Raises:
+        ObjectDoesNotExist: If the category or the author of the feed does not exist.
+    """
+    return get_or_build(
+        feed.get_key(),
+        lambda: build_state(feed),
+        tags=[feed.tag],
+        timeout=FEED_TIMEOUT,
+    )
+
+
+def get_document(feed, feed_format):
+    """
+    Returns:
+        dict: The `body` of `feed` rendered in `feed_format`, along with its `etag` and
+        `last_modified` validators.
+
+    Raises:
+        ObjectDoesNotExist: If the category or the author of the feed does not exist.
+    """
+
+    def build_document():
+        state = get_state(feed)
+        return render_document(feed, state, feed_format), get_dependencies(feed, state)
+
+    return get_or_build(
+        feed.get_key(feed_format), build_document, tags=[feed.tag], timeout=FEED_TIMEOUT
+    )
+
+
+def update_feeds(blog_ids, feeds):
+    """
+    Patch the entries of the blogs `blog_ids` into `feeds` once the current transaction commits.
+    """
+    blog_ids, feeds = list(blog_ids), set(feeds)
+    transaction.on_commit(lambda: patch_feeds(blog_ids, feeds))
+
+
+def patch_feeds(blog_ids, feeds):
+    for feed in feeds:
+        # Shared with the rebuild of `get_state`, so that neither overwrites the other
+        lock_key = f"lock_{feed.get_key()}"
+        if not cache.add(lock_key, True, 10):
+            invalidate(feed.tag)
+            continue
+        try:
+            patch_feed(feed, blog_ids)
+        finally:
+            cache.delete(lock_key)
+
+
+def patch_feed(feed, blog_ids):
+    entry = cache.get(feed.get_key())
+    if entry is None:
+        # Built on the next read
+        return
+    # Read before the entries, so that an invalidation while patching is not missed
+    versions = get_versions(entry["versions"])
+    if not is_up_to_date(entry, versions):
+        return
+    state = entry["value"]
+    entries = get_entries(feed.get_queryset().filter(pk__in=blog_ids))
+    state = patch_state(state, blog_ids, entries)
+    if state is None:
+        invalidate(feed.tag)
+        return
+
+    dependencies = get_dependencies(feed, state)
+    fragments = {feed.get_key(): (state, dependencies)}
+    for feed_format in FEED_FORMATS:
+        fragments[feed.get_key(feed_format)] = (
+            render_document(feed, state, feed_format),
+            dependencies,
+        )
+    set_fragments(fragments, versions, timeout=FEED_TIMEOUT)
+
+
+def get_blog_url(blog_id):
+    return f"{settings.HOST_URL}{reverse('blogs-detail', args=[blog_id])}"
+
+
+def to_datetime(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    return timezone.make_aware(datetime.combine(value, time.min))
+
+
+def render_document(feed, state, feed_format):
+    entries = state["entries"][:FEED_ENTRIES]
+    feed_url = f"{settings.HOST_URL}{feed.get_path()}?format={feed_format}"
+    if feed_format == "json":
+        body = render_json_feed(state, entries, feed_url)
+    else:
+        body = render_xml_feed(state, entries, feed_url, feed_format)
+    return {
+        "body": body,
+        "etag": quote_etag(hashlib.md5(body).hexdigest()),
+        "last_modified": max((entry["updated"] for entry in entries), default=None),
+    }
+
+
+def render_xml_feed(state, entries, feed_url, feed_format):
+    feed_class = Atom1Feed if feed_format == "atom" else Rss201rev2Feed
+    document = feed_class(
+        title=state["title"],
+        link=f"{settings.HOST_URL}{reverse('blogs-list')}",
+        description=state["description"],
+        language=settings.LANGUAGE_CODE,
+        feed_url=feed_url,
+    )
+    for entry in entries:
+        url = get_blog_url(entry["id"])
+        categories = [name for _, name in entry["tags"]]
+        if entry["category"] is not None:
+            categories.insert(0, entry["category"][1])
+        document.add_item(
+            title=entry["title"],
+            link=url,
+            description=entry["summary"],
+            unique_id=url,
+            unique_id_is_permalink=True,
+            pubdate=to_datetime(entry["published"]),
+            updateddate=entry["updated"],
+            author_name=entry["author"][1],
+            categories=categories,
+        )
+    return document.writeString("utf-8").encode()
+
+
+def render_json_feed(state, entries, feed_url):
+    document = {
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": state["title"],
+        "home_page_url": f"{settings.HOST_URL}{reverse('blogs-list')}",
+        "feed_url": feed_url,
+        "description": state["description"],
+        "language": settings.LANGUAGE_CODE,
+        "items": [
+            {
+                "id": get_blog_url(entry["id"]),
+                "url": get_blog_url(entry["id"]),
+                "title": entry["title"],
+                "summary": entry["summary"],
+                "date_published": to_datetime(entry["published"]),
+                "date_modified": entry["updated"],
+                "authors": [{"name": entry["author"][1]}],
+                "tags": [name for _, name in entry["tags"]],
+            }
+            for entry in entries
+        ],
+    }
+    return FastJSONRenderer().render(document)
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from base.cache import bump_generation, invalidate
+from core.blog.excerpts import get_reading_stats
+from core.blog.models import Blog
+
+
+class Command(BaseCommand):
+    help = "Compute the stored excerpt, word count and reading time of the blogs missing them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=500,
+            help="Number of primary keys backfilled per transaction.",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute every blog, not only those whose word count is still zero.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        queryset = Blog.objects.all()
+        if not options["all"]:
+            queryset = queryset.filter(word_count=0).exclude(content="")
+
+        last_pk = queryset.aggregate(last_pk=Max("pk"))["last_pk"] or 0
+        backfilled = 0
+        for start in range(0, last_pk + 1, chunk_size):
+            with transaction.atomic():
+                blogs = [
+                    Blog(pk=pk, updated_at=timezone.now(), **get_reading_stats(content))
+                    for pk, content in queryset.filter(
+                        pk__gte=start, pk__lt=start + chunk_size
+                    ).values_list("pk", "content")
+                ]
+                Blog.objects.bulk_update(
+                    blogs, ["excerpt", "word_count", "reading_time", "updated_at"]
+                )
+            if blogs:
+                invalidate(*[f"blog:{blog.pk}" for blog in blogs])
+                backfilled += len(blogs)
+
+        if backfilled:
+            bump_generation("blogs")
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {backfilled} blogs."))
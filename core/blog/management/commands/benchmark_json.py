@@ -0,0 +1,176 @@
+import io
+import random
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from base.renderers import FastJSONParser, FastJSONRenderer, orjson
+from core.blog.models import Blog, Comment
+from core.blog.v1.serializers import (
+    DETAIL_COMMENTS,
+    BlogContentSerializer,
+    BlogListSerializer,
+    CommentSerializer,
+    get_comments_url,
+)
+
+WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor café naïve".split()
+
+
+def fake_user(user_id):
+    return {
+        "id": user_id,
+        "first_name": f"First {user_id}",
+        "last_name": f"Last {user_id}",
+        "bio": " ".join(random.choices(WORDS, k=20)),
+        "profile_pic": f"http://localhost/media/profile_pics/{user_id}.jpg",
+    }
+
+
+def fake_blog(blog_id, content_words):
+    return {
+        "id": blog_id,
+        "title": " ".join(random.choices(WORDS, k=8)),
+        "publication_date": timezone.now().date().isoformat(),
+        "is_published": True,
+        "author": fake_user(blog_id),
+        "content": " ".join(random.choices(WORDS, k=content_words)),
+        "category": {"id": 1, "name": "Engineering"},
+        "tags": [{"id": tag_id, "name": f"tag {tag_id}"} for tag_id in range(5)],
+        "comments_count": 0,
+        "updated_at": timezone.now().isoformat(),
+    }
+
+
+def fake_blog_row(blog_id, content_words):
+    row = fake_blog(blog_id, content_words)
+    content = row.pop("content")
+    return {
+        **row,
+        "excerpt": " ".join(content.split()[:50]),
+        "word_count": content_words,
+        "reading_time": -(-content_words // 200),
+    }
+
+
+def fake_comment(comment_id, blog_id):
+    return {
+        "id": comment_id,
+        "blog": blog_id,
+        "user": comment_id,
+        "text": " ".join(random.choices(WORDS, k=60)),
+        "created_at": timezone.now().isoformat(),
+        "parent": None,
+        "upvote_count": random.randint(0, 100),
+        "downvote_count": 0,
+        "updated_at": timezone.now().isoformat(),
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare the stock JSON renderer and parser with the orjson backed ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--blog-id",
+            type=int,
+            help="Benchmark the detail of this blog and the first list page from the database "
+            "instead of generated payloads.",
+        )
+        parser.add_argument("--content-words", type=int, default=3000)
+        parser.add_argument("--page-size", type=int, default=50)
+        parser.add_argument(
+            "--seconds",
+            type=float,
+            default=1.0,
+            help="Approximate time spent measuring each case.",
+        )
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(
+                self.style.WARNING(
+                    "orjson is not installed, both sides use the standard library."
+                )
+            )
+
+        for name, payload in self.get_payloads(options).items():
+            rendered = JSONRenderer().render(payload)
+            self.stdout.write(f"{name} ({len(rendered) / 1024:.0f} KiB)")
+            self.compare(
+                "render",
+                lambda: JSONRenderer().render(payload),
+                lambda: FastJSONRenderer().render(payload),
+                len(rendered),
+                options["seconds"],
+            )
+            self.compare(
+                "parse",
+                lambda: JSONParser().parse(io.BytesIO(rendered)),
+                lambda: FastJSONParser().parse(io.BytesIO(rendered)),
+                len(rendered),
+                options["seconds"],
+            )
+
+    def get_payloads(self, options):
+        if options["blog_id"] is not None:
+            blog = Blog.objects.for_detail().filter(pk=options["blog_id"]).first()
+            if blog is None:
+                raise CommandError(f"Blog {options['blog_id']} does not exist.")
+            comments = Comment.objects.filter(blog=blog).top_level()[:DETAIL_COMMENTS]
+            detail = {
+                **BlogContentSerializer(blog).data,
+                "comments": CommentSerializer(comments, many=True).data,
+                "comments_url": get_comments_url(None, blog.id),
+            }
+            page = BlogListSerializer(
+                Blog.objects.for_list().order_by("id")[: options["page_size"]],
+                many=True,
+            ).data
+        else:
+            detail = {
+                **fake_blog(1, options["content_words"]),
+                "word_count": options["content_words"],
+                "reading_time": -(-options["content_words"] // 200),
+                "comments": [
+                    fake_comment(comment_id, 1) for comment_id in range(DETAIL_COMMENTS)
+                ],
+                "comments_url": get_comments_url(None, 1),
+            }
+            page = [
+                fake_blog_row(blog_id, options["content_words"])
+                for blog_id in range(options["page_size"])
+            ]
+        return {
+            "Blog detail": detail,
+            "Blog list page": {
+                "page": 1,
+                "page_size": len(page),
+                "total_page_count": 1,
+                "total_results_count": len(page),
+                "total_results_exact": True,
+                "results": page,
+            },
+        }
+
+    def compare(self, name, stock, fast, size, seconds):
+        stock_time = self.measure(stock, seconds)
+        fast_time = self.measure(fast, seconds)
+        self.stdout.write(
+            f"  {name:<7} stdlib {stock_time * 1000:8.3f} ms ({size / stock_time / 2**20:7.1f} MiB/s)"
+            f"  orjson {fast_time * 1000:8.3f} ms ({size / fast_time / 2**20:7.1f} MiB/s)"
+            f"  x{stock_time / fast_time:.1f}"
+        )
+
+    def measure(self, func, seconds):
+        """
+        Returns:
+            float: The best time of one call of `func` in seconds, over about `seconds` of runs.
+        """
+        timer = timeit.Timer(func)
+        number, elapsed = timer.autorange()
+        repeat = max(int(seconds / elapsed), 3)
+        return min(timer.repeat(repeat=repeat, number=number)) / number
@@ -0,0 +1,90 @@
+import contextlib
+import gzip
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from base.export import iter_ndjson, resume_queryset
+from core.blog.models import Blog, Comment
+from core.blog.v1.serializers import BlogExportValuesSerializer, CommentValuesSerializer
+
+EXPORTS = {
+    "blogs": (Blog, BlogExportValuesSerializer),
+    "comments": (Comment, CommentValuesSerializer),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Export the blogs or the comments as NDJSON, like the export endpoints, reading the "
+        "table in chunks so memory stays constant."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("resource", choices=sorted(EXPORTS))
+        parser.add_argument(
+            "--output", help="File written, the standard output by default."
+        )
+        parser.add_argument(
+            "--append",
+            action="store_true",
+            help="Append to the output file, to resume an interrupted export.",
+        )
+        parser.add_argument("--gzip", action="store_true")
+        parser.add_argument(
+            "--updated-since",
+            help="Only export the rows changed at or after this ISO 8601 datetime.",
+        )
+        parser.add_argument(
+            "--after-id", type=int, help="Resume after the row with this id."
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        model, values_serializer_class = EXPORTS[options["resource"]]
+        updated_since = options["updated_since"]
+        if updated_since is not None:
+            try:
+                updated_since = parse_datetime(updated_since)
+            except ValueError:
+                updated_since = None
+            if updated_since is None:
+                raise CommandError(
+                    "Invalid --updated-since, expected an ISO 8601 datetime."
+                )
+            if timezone.is_naive(updated_since):
+                updated_since = timezone.make_aware(updated_since)
+
+        queryset = resume_queryset(
+            model.objects.all(), updated_since, options["after_id"]
+        )
+        chunks = iter_ndjson(queryset, values_serializer_class(), options["chunk_size"])
+
+        exported, last_line = 0, None
+        with contextlib.ExitStack() as stack:
+            output = sys.stdout.buffer
+            if options["output"]:
+                mode = "ab" if options["append"] else "wb"
+                output = stack.enter_context(open(options["output"], mode))
+            if options["gzip"]:
+                # Appending adds a gzip member, which readers decompress as part of the stream
+                output = stack.enter_context(
+                    gzip.GzipFile(fileobj=output, mode="wb", mtime=0)
+                )
+            for chunk in chunks:
+                output.write(chunk)
+                exported += chunk.count(b"\n")
+                last_line = chunk.rsplit(b"\n", 2)[-2]
+            output.flush()
+
+        message = f"Exported {exported} {options['resource']}."
+        if last_line is not None:
+            last = json.loads(last_line)
+            resume = f"--after-id {last['id']}"
+            if updated_since is not None and "updated_at" in last:
+                resume = f"--updated-since {last['updated_at']} {resume}"
+            message += f" Resume with {resume}."
+        self.stderr.write(message)
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.blog.stats import flush_views
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the blog views counted in the cache to the database, once or every --interval "
+        "seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep flushing, waiting this many seconds between flushes.",
+        )
+        parser.add_argument(
+            "--max-blogs",
+            type=int,
+            default=10000,
+            help="Number of viewed blogs read per flush.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            written = flush_views(options["max_blogs"])
+            if written is None:
+                self.stderr.write("Another flush is running.")
+            elif written or options["interval"] is None:
+                self.stdout.write(f"Wrote {written} views.")
+            if options["interval"] is None:
+                break
+            time.sleep(options["interval"])
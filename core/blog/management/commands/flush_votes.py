@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.blog.votes import flush_votes
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the comment votes buffered in the cache (settings.BUFFERED_VOTES) to the database, "
+        "once or every --interval seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep flushing, waiting this many seconds between flushes.",
+        )
+        parser.add_argument(
+            "--max-slots",
+            type=int,
+            default=10000,
+            help="Number of logged votes read per flush.",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.BUFFERED_VOTES:
+            self.stderr.write(
+                self.style.WARNING("BUFFERED_VOTES is off, votes are not buffered.")
+            )
+
+        while True:
+            written = flush_votes(options["max_slots"])
+            if written is None:
+                self.stderr.write("Another flush is running.")
+            elif written or options["interval"] is None:
+                self.stdout.write(f"Wrote {written} votes.")
+            if options["interval"] is None:
+                break
+            time.sleep(options["interval"])
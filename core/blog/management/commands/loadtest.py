@@ -0,0 +1,172 @@
+"""
+Example, comparing the sync and the async deployments of the same code and database:
+
+    ASYNC_VIEWS=false gunicorn config.wsgi -w 4 --threads 16 -b 127.0.0.1:8000
+    gunicorn config.asgi -w 4 -k uvicorn.workers.UvicornWorker -b 127.0.0.1:8001
+    python manage.py loadtest --target wsgi=http://127.0.0.1:8000 \\
+        --target asgi=http://127.0.0.1:8001 --token <access token> --concurrency 512
+"""
+
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+async def read_response(reader):
+    """
+    Read one HTTP/1.1 response from `reader`.
+
+    Returns:
+        tuple: The status code, and whether the connection can be reused.
+    """
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status_code = int(lines[0].split(" ", 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif status_code not in (204, 304):
+        await reader.read()
+        return status_code, False
+    return status_code, headers.get("connection", "").lower() != "close"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the throughput and latency of GET endpoints under high concurrency, to compare "
+        "the sync (WSGI) and async (ASGI) deployments."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            required=True,
+            help="Server to load as name=base_url, compared in the order given.",
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            help="Path requested, in turns with the other ones. Defaults to the blog list.",
+        )
+        parser.add_argument("--concurrency", type=int, default=256)
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=10.0,
+            help="Seconds of load per target, after a one second warm up.",
+        )
+        parser.add_argument("--token", help="JWT access token of the requests.")
+        parser.add_argument("--api-key", default=settings.API_KEY)
+
+    def handle(self, *args, **options):
+        paths = options["path"] or ["/api/v1/blogs/"]
+        results = []
+        for target in options["target"]:
+            name, _, url = target.partition("=")
+            if not url:
+                raise CommandError(f"Expected name=base_url, got {target!r}.")
+            stats = asyncio.run(self.run(url, paths, options))
+            results.append((name, stats))
+            self.report(name, stats)
+
+        baseline_name, baseline = results[0]
+        for name, stats in results[1:]:
+            if baseline["throughput"]:
+                self.stdout.write(
+                    f"{name} / {baseline_name} throughput: "
+                    f"x{stats['throughput'] / baseline['throughput']:.2f}"
+                )
+
+    async def run(self, url, paths, options):
+        split = urlsplit(url)
+        host, port = split.hostname, split.port or 80
+        headers = [f"Host: {split.netloc}", f"API-KEY: {options['api_key']}"]
+        if options["token"]:
+            headers.append(f"Authorization: Bearer {options['token']}")
+        requests = [
+            (
+                f"GET {split.path.rstrip('/')}{path} HTTP/1.1\r\n"
+                + "".join(f"{header}\r\n" for header in headers)
+                + "\r\n"
+            ).encode()
+            for path in paths
+        ]
+
+        latencies, statuses, errors = [], {}, 0
+        started_at = time.monotonic()
+        measured_from = started_at + 1
+        deadline = measured_from + options["duration"]
+
+        async def worker(offset):
+            nonlocal errors
+            connection = None
+            count = offset
+            while time.monotonic() < deadline:
+                try:
+                    if connection is None:
+                        connection = await asyncio.open_connection(host, port)
+                    reader, writer = connection
+                    request_started_at = time.monotonic()
+                    writer.write(requests[count % len(requests)])
+                    await writer.drain()
+                    status_code, keep_alive = await read_response(reader)
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    errors += request_started_at >= measured_from
+                    connection = None
+                    continue
+                count += 1
+                if request_started_at >= measured_from:
+                    latencies.append(time.monotonic() - request_started_at)
+                    statuses[status_code] = statuses.get(status_code, 0) + 1
+                if not keep_alive:
+                    writer.close()
+                    connection = None
+            if connection is not None:
+                connection[1].close()
+
+        await asyncio.gather(
+            *[worker(offset) for offset in range(options["concurrency"])]
+        )
+        latencies.sort()
+        return {
+            "requests": len(latencies),
+            "errors": errors,
+            "statuses": statuses,
+            "throughput": len(latencies) / options["duration"],
+            "latencies": latencies,
+        }
+
+    def report(self, name, stats):
+        latencies = stats["latencies"]
+        if not latencies:
+            self.stdout.write(self.style.ERROR(f"{name}: no request completed."))
+            return
+
+        def percentile(value):
+            return (
+                latencies[min(int(len(latencies) * value), len(latencies) - 1)] * 1000
+            )
+
+        self.stdout.write(
+            f"{name}: {stats['requests']} requests, {stats['errors']} errors, "
+            f"{stats['throughput']:.0f} req/s, latency mean "
+            f"{statistics.mean(latencies) * 1000:.1f} ms p50 {percentile(0.5):.1f} ms "
+            f"p95 {percentile(0.95):.1f} ms p99 {percentile(0.99):.1f} ms, "
+            f"statuses {stats['statuses']}"
+        )
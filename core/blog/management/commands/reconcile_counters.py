@@ -0,0 +1,89 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from core.blog.models import Blog, Comment, CommentVote
+
+
+def count_subquery(queryset, field):
+    """
+    Build a correlated `COUNT(*)` of `queryset` rows whose `field` points at the outer row.
+    """
+    counts = (
+        queryset.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized comment, reply and vote counters that drifted from their source rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Number of primary keys reconciled per statement.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+
+        blogs_fixed = self.reconcile(
+            Blog,
+            chunk_size,
+            comments_count=count_subquery(Comment.objects.all(), "blog"),
+        )
+        comments_fixed = self.reconcile(
+            Comment,
+            chunk_size,
+            upvote_count=count_subquery(
+                CommentVote.objects.filter(value=CommentVote.UPVOTE), "comment"
+            ),
+            downvote_count=count_subquery(
+                CommentVote.objects.filter(value=CommentVote.DOWNVOTE), "comment"
+            ),
+            reply_count=count_subquery(Comment.objects.all(), "parent"),
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reconciled {blogs_fixed} blogs and {comments_fixed} comments."
+            )
+        )
+
+    def reconcile(self, model, chunk_size, **counters):
+        """
+        Walk `model` in primary key ranges and rewrite the `counters` of the rows where any of them
+        differs from its recomputed value, one UPDATE per range.
+
+        Returns:
+            int: The number of rows that were corrected.
+        """
+        last_pk = model.objects.aggregate(last_pk=Max("pk"))["last_pk"] or 0
+        drifted = Q()
+        for field in counters:
+            drifted |= ~Q(**{field: F(f"actual_{field}")})
+
+        fixed = 0
+        for start in range(0, last_pk + 1, chunk_size):
+            with transaction.atomic():
+                ids = list(
+                    model.objects.filter(pk__gte=start, pk__lt=start + chunk_size)
+                    .annotate(
+                        **{
+                            f"actual_{field}": expression
+                            for field, expression in counters.items()
+                        }
+                    )
+                    .filter(drifted)
+                    .values_list("pk", flat=True)
+                )
+                if ids:
+                    fixed += model.objects.filter(pk__in=ids).update(**counters)
+        return fixed
@@ -0,0 +1,71 @@
+from django.db import models
+
+
+class BlogQuerySet(models.QuerySet):
+    def for_list(self, fields=None):
+        """
+        Plan the queryset rendered by `BlogListSerializer`: author and category are joined and
+        tags are prefetched, so a page costs a constant number of queries whatever its size. The
+        content is deferred, lists render its stored excerpt.
+
+        Args:
+            fields: The fields rendered, all those of `BlogListSerializer` by default. The
+                relations left out are neither joined nor prefetched.
+        """
+        if fields is None:
+            fields = {"author", "category", "tags"}
+        queryset = self
+        related = [name for name in ["author", "category"] if name in fields]
+        if related:
+            queryset = queryset.select_related(*related)
+        if "tags" in fields:
+            queryset = queryset.prefetch_related(self.get_tags_prefetch())
+        # The search snippet is highlighted from the content outside of Postgres
+        if "search_snippet" not in fields:
+            queryset = queryset.defer("content")
+        # Only read when flushing the views, see `core.blog.stats`
+        return queryset.defer("readers_sketch")
+
+    def for_detail(self):
+        """
+        Plan the queryset rendered by `BlogContentSerializer`, the blog part of the detail, the
+        comments being cached and fetched on their own.
+        """
+        return (
+            self.select_related("author", "category")
+            .prefetch_related(self.get_tags_prefetch())
+            .defer("readers_sketch")
+        )
+
+    def get_tags_prefetch(self):
+        from .models import Tag
+
+        # Ordered like the many relations of `base.serializers.ValuesSerializer`
+        return models.Prefetch("tags", queryset=Tag.objects.order_by("id"))
+
+    def with_comments_updated_at(self, top_level_limit=None):
+        """
+        Annotate `comments_updated_at`, the latest change among the comments of each blog, read
+        from the `(blog, updated_at)` index, or only among its `top_level_limit` first top-level
+        comments, those embedded in its detail.
+        """
+        from .models import Comment
+
+        comments = Comment.objects.filter(blog=models.OuterRef("pk"))
+        if top_level_limit is not None:
+            first_comments = (
+                Comment.objects.filter(blog=models.OuterRef(models.OuterRef("pk")))
+                .top_level()
+                .values("id")[:top_level_limit]
+            )
+            comments = Comment.objects.filter(pk__in=first_comments)
+        latest_comment = comments.order_by("-updated_at").values("updated_at")[:1]
+        return self.annotate(comments_updated_at=models.Subquery(latest_comment))
+
+
+class CommentQuerySet(models.QuerySet):
+    def top_level(self):
+        """
+        Keep the comments which are not replies, in the order the detail of a blog embeds them.
+        """
+        return self.filter(parent=None).order_by("id")
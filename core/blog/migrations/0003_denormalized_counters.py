@@ -0,0 +1,52 @@
+# Generated by Django 5.1.6 on 2026-10-17 05:55
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count_subquery(model, field):
+    counts = (
+        model.objects.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+def backfill_counters(apps, schema_editor):
+    Blog = apps.get_model("blog", "Blog")
+    Comment = apps.get_model("blog", "Comment")
+    Blog.objects.update(comments_count=_count_subquery(Comment, "blog"))
+    Comment.objects.update(
+        upvote_count=_count_subquery(Comment.upvoted_by.through, "comment"),
+        downvote_count=_count_subquery(Comment.downvoted_by.through, "comment"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_alter_category_options_comment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='downvote_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='upvote_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+from django.db import migrations
+from django.db.models import Max
+
+UPVOTE = 1
+DOWNVOTE = -1
+CHUNK_SIZE = 5000
+
+
+def copy_votes(apps, schema_editor):
+    Comment = apps.get_model("blog", "Comment")
+    CommentVote = apps.get_model("blog", "CommentVote")
+
+    # Upvotes go first so they win over a stale downvote of the same user
+    for voters, value in ((Comment.upvoted_by, UPVOTE), (Comment.downvoted_by, DOWNVOTE)):
+        through = voters.through
+        last_pk = through.objects.aggregate(last_pk=Max("pk"))["last_pk"] or 0
+        for start in range(0, last_pk + 1, CHUNK_SIZE):
+            rows = through.objects.filter(
+                pk__gte=start, pk__lt=start + CHUNK_SIZE
+            ).values_list("comment_id", "user_id")
+            CommentVote.objects.bulk_create(
+                [
+                    CommentVote(comment_id=comment_id, user_id=user_id, value=value)
+                    for comment_id, user_id in rows
+                ],
+                ignore_conflicts=True,
+            )
+
+
+def restore_votes(apps, schema_editor):
+    Comment = apps.get_model("blog", "Comment")
+    CommentVote = apps.get_model("blog", "CommentVote")
+
+    for voters, value in ((Comment.upvoted_by, UPVOTE), (Comment.downvoted_by, DOWNVOTE)):
+        through = voters.through
+        last_pk = CommentVote.objects.aggregate(last_pk=Max("pk"))["last_pk"] or 0
+        for start in range(0, last_pk + 1, CHUNK_SIZE):
+            rows = CommentVote.objects.filter(
+                pk__gte=start, pk__lt=start + CHUNK_SIZE, value=value
+            ).values_list("comment_id", "user_id")
+            through.objects.bulk_create(
+                [
+                    through(comment_id=comment_id, user_id=user_id)
+                    for comment_id, user_id in rows
+                ],
+                ignore_conflicts=True,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_commentvote'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_votes, restore_votes),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.6 on 2026-10-17 05:57
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_copy_comment_votes'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='comment',
+            name='downvoted_by',
+        ),
+        migrations.RemoveField(
+            model_name='comment',
+            name='upvoted_by',
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-17 05:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_remove_comment_upvoted_by_downvoted_by'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['publication_date', 'id'], name='blog_publication_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.6 on 2026-10-17 06:01
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# The GIN index and the backfill only apply to Postgres, SQLite keeps an in-process index instead
+CREATE_INDEX = "CREATE INDEX blog_search_vector_gin ON blog_blog USING gin (search_vector)"
+DROP_INDEX = "DROP INDEX IF EXISTS blog_search_vector_gin"
+BACKFILL = """
+    UPDATE blog_blog SET search_vector =
+        setweight(to_tsvector('english', coalesce(blog_blog.title, '')), 'A')
+        || setweight(to_tsvector('english', concat_ws(' ', category.name, tags.names)), 'B')
+        || setweight(to_tsvector('english', coalesce(blog_blog.content, '')), 'C')
+    FROM blog_blog AS blog
+    LEFT JOIN blog_category AS category ON category.id = blog.category_id
+    LEFT JOIN (
+        SELECT blog_tags.blog_id, string_agg(tag.name, ' ') AS names
+        FROM blog_blog_tags AS blog_tags
+        JOIN blog_tag AS tag ON tag.id = blog_tags.tag_id
+        GROUP BY blog_tags.blog_id
+    ) AS tags ON tags.blog_id = blog.id
+    WHERE blog.id = blog_blog.id
+"""
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CREATE_INDEX)
+        schema_editor.execute(BACKFILL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_blog_publication_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
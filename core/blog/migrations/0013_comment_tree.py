@@ -0,0 +1,62 @@
+# Generated by Django 5.1.6 on 2026-10-17 06:49
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, Concat, LPad
+
+PATH_STEP = 10
+MAX_DEPTH = 25
+
+
+def backfill_tree(apps, schema_editor):
+    Comment = apps.get_model("blog", "Comment")
+    replies = (
+        Comment.objects.filter(parent=OuterRef("pk"))
+        .order_by()
+        .values("parent")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Comment.objects.update(reply_count=Coalesce(Subquery(replies), 0))
+
+    segment = LPad(Cast("id", models.CharField()), PATH_STEP, Value("0"))
+    Comment.objects.filter(parent=None).update(path=segment)
+    # One level of replies per update, below the paths of the level above
+    parent_path = Subquery(
+        Comment.objects.filter(pk=OuterRef("parent_id")).values("path")[:1]
+    )
+    for _ in range(MAX_DEPTH - 1):
+        updated = (
+            Comment.objects.filter(path="", parent__isnull=False)
+            .exclude(parent__path="")
+            .update(path=Concat(parent_path, segment))
+        )
+        if not updated:
+            break
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_comment_top_level_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=250),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['blog', 'path'], name='comment_blog_path_idx'),
+        ),
+        migrations.RunPython(backfill_tree, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+from django.db.models import Max
+
+from core.blog.search import postgres_backend
+
+CHUNK_SIZE = 1000
+
+
+def reindex_blogs(apps, schema_editor):
+    # The backfill of 0008 indexed the markup of the content and no author, only Postgres
+    # stores the vectors
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Blog = apps.get_model("blog", "Blog")
+    last_pk = Blog.objects.aggregate(last_pk=Max("pk"))["last_pk"] or 0
+    for start in range(0, last_pk + 1, CHUNK_SIZE):
+        blog_ids = Blog.objects.filter(
+            pk__gte=start, pk__lt=start + CHUNK_SIZE
+        ).values_list("id", flat=True)
+        postgres_backend.update(list(blog_ids), model=Blog)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_blog_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(reindex_blogs, migrations.RunPython.noop),
+    ]
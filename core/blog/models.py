@@ -1,7 +1,14 @@
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
+from django.utils import timezone
 
+from base.tree import PATH_STEP, build_path, get_parent_pk, get_subtree_filter
 from core.custom_auth.models import User
 
+from .managers import BlogQuerySet, CommentQuerySet
+
 
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -31,12 +38,47 @@ class Blog(models.Model):
     )
     tags = models.ManyToManyField(Tag, related_name="blogs")
     is_published = models.BooleanField(default=False)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+    # Computed from the content by `core.blog.excerpts.get_reading_stats`
+    excerpt = models.CharField(max_length=500, blank=True, default="", editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveIntegerField(default=0, editable=False)
+    # Flushed from the cache by `core.blog.stats`, `reader_count` estimated from the sketch
+    view_count = models.PositiveIntegerField(default=0, editable=False)
+    reader_count = models.PositiveIntegerField(default=0, editable=False)
+    readers_sketch = models.BinaryField(default=b"", editable=False)
+    # Maintained by `core.blog.search`, only used on Postgres
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Also bumped when its comments are added or deleted, or an embedded object is renamed
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BlogQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination seeks on (publication_date, id)
+            models.Index(
+                fields=["publication_date", "id"], name="blog_publication_date_id_idx"
+            ),
+            # Incremental exports seek on (updated_at, id)
+            models.Index(fields=["updated_at", "id"], name="blog_updated_at_id_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Tells the feeds a blog was in before being changed, see `core.blog.feeds`
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
 
     def __str__(self):
         return self.title
 
 
 class Comment(models.Model):
+    # Levels of replies, bounded by the length of `path`
+    MAX_DEPTH = 25
+
     blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name="comments")
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="comments")
     text = models.TextField()
@@ -44,34 +86,210 @@ class Comment(models.Model):
     parent = models.ForeignKey(
         "self", null=True, on_delete=models.CASCADE, related_name="replies"
     )
-    upvoted_by = models.ManyToManyField(User, related_name="upvoted_comments")
-    downvoted_by = models.ManyToManyField(User, related_name="downvoted_comments")
+    upvote_count = models.PositiveIntegerField(default=0, editable=False)
+    downvote_count = models.PositiveIntegerField(default=0, editable=False)
+    # Materialized path of the reply tree, see `base.tree`
+    path = models.CharField(
+        max_length=PATH_STEP * MAX_DEPTH, default="", editable=False
+    )
+    reply_count = models.PositiveIntegerField(default=0, editable=False)
+    # Also bumped by votes
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = CommentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Latest change among the comments of a blog, for its validators
+            models.Index(
+                fields=["blog", "updated_at"], name="comment_blog_updated_at_idx"
+            ),
+            # Incremental exports seek on (updated_at, id)
+            models.Index(fields=["updated_at", "id"], name="comment_updated_at_id_idx"),
+            # First top-level comments of a blog, embedded in its detail
+            models.Index(
+                fields=["blog", "id"],
+                condition=models.Q(parent__isnull=True),
+                name="comment_top_level_idx",
+            ),
+            # Threads of a blog are read with a range scan on their paths
+            models.Index(fields=["blog", "path"], name="comment_blog_path_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Tells the blog a comment was moved from, see `save`
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        previous_path = self.path
+        previous_blog_id = getattr(self, "_loaded_values", {}).get(
+            "blog_id", self.blog_id
+        )
+        with transaction.atomic():
+            if not adding and self.parent_id != get_parent_pk(previous_path):
+                # Replied to another comment, or made top-level
+                self.path = self.get_path()
+                if kwargs.get("update_fields") is not None:
+                    kwargs["update_fields"] = {*kwargs["update_fields"], "path"}
+            super().save(*args, **kwargs)
+
+            if adding:
+                # The path ends with the primary key, only known once inserted
+                self.path = self.get_path()
+                Comment.objects.filter(pk=self.pk).update(path=self.path)
+                Blog.objects.filter(pk=self.blog_id).update(
+                    comments_count=F("comments_count") + 1, updated_at=timezone.now()
+                )
+                Comment.shift_reply_counts({self.parent_id: 1})
+            else:
+                if self.blog_id != previous_blog_id:
+                    # Moved to another blog, which only comments without replies can be
+                    Blog.objects.filter(pk=previous_blog_id).update(
+                        comments_count=F("comments_count") - 1,
+                        updated_at=timezone.now(),
+                    )
+                    Blog.objects.filter(pk=self.blog_id).update(
+                        comments_count=F("comments_count") + 1,
+                        updated_at=timezone.now(),
+                    )
+                if self.path != previous_path:
+                    Comment.move_replies(self.blog_id, previous_path, self.path)
+                    Comment.shift_reply_counts(
+                        {get_parent_pk(previous_path): -1, self.parent_id: 1}
+                    )
+        self._loaded_values = {
+            **getattr(self, "_loaded_values", {}),
+            "blog_id": self.blog_id,
+        }
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            deleted, deleted_per_model = super().delete(*args, **kwargs)
+            # Replies are cascaded along with the comment
+            comments_deleted = deleted_per_model.get(self._meta.label, 0)
+            Blog.objects.filter(pk=self.blog_id).update(
+                comments_count=F("comments_count") - comments_deleted,
+                updated_at=timezone.now(),
+            )
+            # The other deleted comments are replies below this one
+            Comment.shift_reply_counts({self.parent_id: -1})
+        return deleted, deleted_per_model
 
-    @property
-    def upvote_count(self):
-        return self.upvoted_by.count()
+    def get_path(self):
+        """
+        Returns:
+            str: The path of the comment below its current parent.
+        """
+        parent_path = self.parent.path if self.parent_id is not None else ""
+        return build_path(parent_path, self.pk)
 
-    @property
-    def downvote_count(self):
-        return self.downvoted_by.count()
+    @classmethod
+    def move_replies(cls, blog_id, previous_path, path):
+        """
+        Rewrite the paths of the replies below `previous_path` after the comment they reply to
+        moved to `path`, with one update of the whole subtree.
+        """
+        if not previous_path or previous_path == path:
+            return
+        cls.objects.filter(get_subtree_filter(previous_path), blog_id=blog_id).update(
+            path=Concat(Value(path), Substr("path", len(previous_path) + 1))
+        )
+
+    @classmethod
+    def shift_reply_counts(cls, shifts):
+        """
+        Shift the `reply_count` of each comment of `shifts` by its value, with one update per
+        distinct shift.
+        """
+        comment_ids_per_shift = {}
+        for comment_id, shift in shifts.items():
+            if comment_id is not None and shift:
+                comment_ids_per_shift.setdefault(shift, []).append(comment_id)
+        for shift, comment_ids in comment_ids_per_shift.items():
+            cls.objects.filter(pk__in=comment_ids).update(
+                reply_count=F("reply_count") + shift
+            )
 
     def upvote(self, user):
-        if user in self.downvoted_by.all():
-            self.downvoted_by.remove(user)
-        self.upvoted_by.add(user)
+        self._change_vote(user, CommentVote.UPVOTE)
 
     def downvote(self, user):
-        if user in self.upvoted_by.all():
-            self.upvoted_by.remove(user)
-        self.downvoted_by.add(user)
+        self._change_vote(user, CommentVote.DOWNVOTE)
 
     def remove_upvote(self, user):
-        if user in self.upvoted_by.all():
-            self.upvoted_by.remove(user)
+        self._change_vote(user, None, only_from=CommentVote.UPVOTE)
 
     def remove_downvote(self, user):
-        if user in self.downvoted_by.all():
-            self.downvoted_by.remove(user)
+        self._change_vote(user, None, only_from=CommentVote.DOWNVOTE)
+
+    def _change_vote(self, user, value, only_from=None):
+        """
+        Replace the vote of `user` with `value` (None removes it) and shift the counters by the
+        difference, looking up and writing the single (comment, user) vote row.
+
+        Args:
+            only_from: If given, the vote is only changed when it currently has this value.
+        """
+        with transaction.atomic():
+            # Serializes the votes on the comment with the buffered ones, see
+            # `core.blog.votes.write_votes`
+            list(Comment.objects.select_for_update().filter(pk=self.pk).values("pk"))
+            votes = CommentVote.objects.filter(comment=self, user=user)
+            previous = votes.select_for_update().values_list("value", flat=True).first()
+            if previous == value or (only_from is not None and previous != only_from):
+                return
+            if value is None:
+                votes.delete()
+            elif previous is None:
+                try:
+                    with transaction.atomic():
+                        CommentVote.objects.create(comment=self, user=user, value=value)
+                except IntegrityError:
+                    # A concurrent request of the same user recorded its vote first
+                    return
+            else:
+                votes.update(value=value)
+            self._shift_vote_counts(
+                (value == CommentVote.UPVOTE) - (previous == CommentVote.UPVOTE),
+                (value == CommentVote.DOWNVOTE) - (previous == CommentVote.DOWNVOTE),
+            )
+
+    def _shift_vote_counts(self, upvotes, downvotes):
+        Comment.objects.filter(pk=self.pk).update(
+            upvote_count=F("upvote_count") + upvotes,
+            downvote_count=F("downvote_count") + downvotes,
+            updated_at=timezone.now(),
+        )
+        self.refresh_from_db(fields=["upvote_count", "downvote_count", "updated_at"])
 
     def __str__(self):
         return f"Comment by {self.user.email} on {self.blog.title}"
+
+
+class CommentVote(models.Model):
+    UPVOTE = 1
+    DOWNVOTE = -1
+    VOTE_TYPE = (
+        (UPVOTE, "Upvote"),
+        (DOWNVOTE, "Downvote"),
+    )
+
+    comment = models.ForeignKey(Comment, on_delete=models.CASCADE, related_name="votes")
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="comment_votes"
+    )
+    value = models.SmallIntegerField(choices=VOTE_TYPE)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["comment", "user"], name="unique_comment_vote"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.get_value_display()} by {self.user_id} on {self.comment_id}"
@@ -0,0 +1,269 @@
+"""
+Full-text search over blogs.
+
+On Postgres every blog keeps a weighted `search_vector` (title > tags, category and author >
+content) behind a GIN index, ranked with `ts_rank` and highlighted with `ts_headline`. Other
+databases (the SQLite settings) fall back to an in-process inverted index with the same weights.
+Both are kept up to date by the signal handlers in `core.blog.signals`.
+
+Both index and highlight the plain text of the content, and return snippets as escaped text where
+only the `<mark>` around the matching words is markup.
+"""
+
+import html
+import math
+import re
+import threading
+from collections import defaultdict
+
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db import connection
+from django.db.models import Case, F, FloatField, Func, Value, When
+from django.utils.html import escape
+
+from .excerpts import get_plain_text
+from .models import Blog
+
+SEARCH_CONFIG = "english"
+SNIPPET_WORDS = 30
+# Blogs reindexed per statement, each one binds 13 of the 65535 parameters of Postgres
+UPDATE_BATCH_SIZE = 1000
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+# Selectors of `ts_headline`, replaced by the highlight tags once the snippet is escaped
+HEADLINE_START = "\ue000"
+HEADLINE_STOP = "\ue001"
+
+# Same defaults as Postgres' ts_rank for the A, B and C weights
+WEIGHTS = {"A": 1.0, "B": 0.4, "C": 0.2}
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    return [token.lower() for token in TOKEN_RE.findall(text or "")]
+
+
+def get_documents(blog_ids, model=Blog):
+    """
+    Returns:
+        dict: The weighted text ({"A": title, "B": tags, category and author, "C": plain text
+        of the content}) of each blog in `blog_ids`, fetched with two queries.
+
+    Args:
+        model: The blog model, the historical one in migrations.
+    """
+    documents = {
+        blog["id"]: {
+            "A": blog["title"],
+            "B": " ".join(
+                filter(
+                    None,
+                    [
+                        blog["category__name"],
+                        blog["author__first_name"],
+                        blog["author__last_name"],
+                        blog["author__email"],
+                    ],
+                )
+            ),
+            "C": get_plain_text(blog["content"]),
+        }
+        for blog in model.objects.filter(pk__in=blog_ids).values(
+            "id",
+            "title",
+            "category__name",
+            "author__first_name",
+            "author__last_name",
+            "author__email",
+            "content",
+        )
+    }
+    tags = model.tags.through.objects.filter(blog_id__in=documents).values_list(
+        "blog_id", "tag__name"
+    )
+    for blog_id, tag_name in tags:
+        documents[blog_id]["B"] += f" {tag_name}"
+    return documents
+
+
+def highlight(content, query, words=SNIPPET_WORDS):
+    """
+    Return an HTML-escaped excerpt of the plain text of `content` around the first term of
+    `query` it contains, with the matching words wrapped like `ts_headline` does.
+    """
+    terms = set(tokenize(query))
+    words_of_text = get_plain_text(content).split()
+    start = 0
+    for index, word in enumerate(words_of_text):
+        if terms.intersection(tokenize(word)):
+            start = max(index - words // 4, 0)
+            break
+    end = start + words
+    excerpt = []
+    for word in words_of_text[start:end]:
+        if terms.intersection(tokenize(word)):
+            excerpt.append(f"{HIGHLIGHT_START}{escape(word)}{HIGHLIGHT_STOP}")
+        else:
+            excerpt.append(escape(word))
+    return " ".join(excerpt)
+
+
+def format_headline(headline):
+    """
+    Escape the `ts_headline` of the content annotated by `PostgresSearchBackend.search`, and wrap
+    its matching words with the highlight tags, like `highlight` does.
+    """
+    text = " ".join(html.unescape(headline or "").split())
+    return (
+        escape(text)
+        .replace(HEADLINE_START, HIGHLIGHT_START)
+        .replace(HEADLINE_STOP, HIGHLIGHT_STOP)
+    )
+
+
+def get_search_vector(document):
+    """
+    Returns:
+        SearchVector: The weighted vector of a document of `get_documents`.
+    """
+    return (
+        SearchVector(Value(document["A"]), weight="A", config=SEARCH_CONFIG)
+        + SearchVector(Value(document["B"]), weight="B", config=SEARCH_CONFIG)
+        + SearchVector(Value(document["C"]), weight="C", config=SEARCH_CONFIG)
+    )
+
+
+class StripTags(Func):
+    """
+    The text of an HTML column without its tags, its entities being kept.
+    """
+
+    function = "REGEXP_REPLACE"
+    template = "%(function)s(%(expressions)s, '<[^>]*>', ' ', 'g')"
+
+
+class PostgresSearchBackend:
+    def update(self, blog_ids, model=Blog):
+        # One statement per batch, as renaming a tag reindexes every blog having it
+        model.objects.bulk_update(
+            [
+                model(pk=blog_id, search_vector=get_search_vector(document))
+                for blog_id, document in get_documents(blog_ids, model).items()
+            ],
+            ["search_vector"],
+            batch_size=UPDATE_BATCH_SIZE,
+        )
+
+    def remove(self, blog_id):
+        # The vector is stored on the deleted row
+        pass
+
+    def search(self, queryset, text):
+        query = SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(
+                search_rank=SearchRank(F("search_vector"), query),
+                # Escaped by `format_headline`, the selectors are not markup yet
+                search_snippet=SearchHeadline(
+                    StripTags("content"),
+                    query,
+                    config=SEARCH_CONFIG,
+                    start_sel=HEADLINE_START,
+                    stop_sel=HEADLINE_STOP,
+                    max_words=SNIPPET_WORDS,
+                ),
+            )
+            .order_by("-search_rank", "id")
+        )
+
+
+class InvertedIndexSearchBackend:
+    """
+    In-process inverted index mapping every token to the weighted frequency it has in each blog.
+
+    It is built from the database on the first search and updated incrementally afterwards. Being
+    per process, it is only meant for single process development servers.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.postings = None
+        self.tokens = {}
+
+    def build(self):
+        self.postings = defaultdict(dict)
+        self.tokens = {}
+        blog_ids = list(Blog.objects.values_list("id", flat=True))
+        for blog_id, document in get_documents(blog_ids).items():
+            self.add(blog_id, document)
+
+    def add(self, blog_id, document):
+        scores = defaultdict(float)
+        for weight, text in document.items():
+            for token in tokenize(text):
+                scores[token] += WEIGHTS[weight]
+        for token, score in scores.items():
+            self.postings[token][blog_id] = score
+        self.tokens[blog_id] = set(scores)
+
+    def update(self, blog_ids):
+        with self.lock:
+            if self.postings is None:
+                # Built with the fresh rows on the first search
+                return
+            for blog_id in blog_ids:
+                self.remove(blog_id)
+            for blog_id, document in get_documents(blog_ids).items():
+                self.add(blog_id, document)
+
+    def remove(self, blog_id):
+        with self.lock:
+            if self.postings is None:
+                return
+            for token in self.tokens.pop(blog_id, ()):
+                self.postings[token].pop(blog_id, None)
+
+    def search(self, queryset, text):
+        with self.lock:
+            if self.postings is None:
+                self.build()
+            terms = set(tokenize(text))
+            # Every term must match, like a websearch query without operators
+            matches = [self.postings.get(term, {}) for term in terms]
+            blog_ids = (
+                set.intersection(*[set(m) for m in matches]) if matches else set()
+            )
+            ranks = {
+                blog_id: sum(math.log1p(match[blog_id]) for match in matches)
+                for blog_id in blog_ids
+            }
+
+        if not ranks:
+            return queryset.none()
+        return (
+            queryset.filter(pk__in=ranks)
+            .annotate(
+                search_rank=Case(
+                    *[When(pk=pk, then=Value(rank)) for pk, rank in ranks.items()],
+                    output_field=FloatField(),
+                )
+            )
+            .order_by("-search_rank", "id")
+        )
+
+
+def get_search_backend():
+    if connection.vendor == "postgresql":
+        return postgres_backend
+    return inverted_index_backend
+
+
+postgres_backend = PostgresSearchBackend()
+inverted_index_backend = InvertedIndexSearchBackend()
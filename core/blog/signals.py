@@ -0,0 +1,98 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from base.cache import bump_generation, invalidate
+from core.custom_auth.models import User
+
+from .feeds import get_blog_feeds, update_feeds
+from .models import Blog, Category, Tag
+from .search import get_search_backend
+
+# Searched in the blogs of their author, see `core.blog.search.get_documents`
+AUTHOR_SEARCH_FIELDS = {"first_name", "last_name", "email"}
+
+
+@receiver(post_save, sender=Blog)
+def index_blog(sender, instance, **kwargs):
+    get_search_backend().update([instance.id])
+
+
+@receiver(post_delete, sender=Blog)
+def unindex_blog(sender, instance, **kwargs):
+    get_search_backend().remove(instance.id)
+
+
+@receiver(m2m_changed, sender=Blog.tags.through)
+def index_blog_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ["post_add", "post_remove", "post_clear"]:
+            get_search_backend().update([instance.id])
+    elif action == "pre_clear":
+        # The blogs of a cleared tag are not known anymore once cleared
+        instance._cleared_blog_ids = list(instance.blogs.values_list("id", flat=True))
+    elif action == "post_clear":
+        get_search_backend().update(instance.__dict__.pop("_cleared_blog_ids", []))
+    elif action in ["post_add", "post_remove"]:
+        get_search_backend().update(list(pk_set))
+
+
+@receiver(post_save, sender=Blog)
+@receiver(post_delete, sender=Blog)
+def update_blog_feeds(sender, instance, **kwargs):
+    update_feeds([instance.id], get_blog_feeds(instance))
+
+
+@receiver(m2m_changed, sender=Blog.tags.through)
+def update_blog_tags_feeds(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ["post_add", "post_remove", "post_clear"]:
+            update_feeds([instance.id], get_blog_feeds(instance))
+        return
+    if action == "pre_clear":
+        instance._cleared_blogs = list(instance.blogs.only("category", "author"))
+        return
+    if action == "post_clear":
+        blogs = instance.__dict__.pop("_cleared_blogs", [])
+    elif action in ["post_add", "post_remove"]:
+        blogs = Blog.objects.filter(pk__in=pk_set).only("category", "author")
+    else:
+        return
+    feeds = set()
+    for blog in blogs:
+        feeds.update(get_blog_feeds(blog))
+    update_feeds([blog.id for blog in blogs], feeds)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Tag)
+def index_renamed_blogs(sender, instance, created, **kwargs):
+    if created:
+        return
+    get_search_backend().update(list(instance.blogs.values_list("id", flat=True)))
+
+
+@receiver(post_save, sender=User)
+def index_renamed_author_blogs(sender, instance, created, update_fields, **kwargs):
+    # Logins only save `last_login`
+    if created or (
+        update_fields is not None and not AUTHOR_SEARCH_FIELDS & set(update_fields)
+    ):
+        return
+    get_search_backend().update(list(instance.blogs.values_list("id", flat=True)))
+
+
+@receiver(post_save, sender=Category)
+def invalidate_category(sender, instance, created, **kwargs):
+    if not created:
+        instance.blogs.update(updated_at=timezone.now())
+        invalidate(f"category:{instance.id}")
+        bump_generation("blogs")
+
+
+@receiver(post_save, sender=Tag)
+def invalidate_tag(sender, instance, created, **kwargs):
+    if not created:
+        instance.blogs.update(updated_at=timezone.now())
+        invalidate(f"tag:{instance.id}")
+        bump_generation("blogs")
@@ -0,0 +1,138 @@
+"""
+View counts and unique readers of the blogs, counted in the cache and flushed to the database in
+bulk, so that reading a blog, even from the caches, never writes to the database.
+
+Each view increments `views_<blog>` and adds its reader to `readers_<blog>`, a HyperLogLog sketch
+of a constant size whatever the number of readers (see `base.hyperloglog`). The first view of a
+blog since it was last flushed appends it to a log (see `base.cache.append_to_log`).
+`flush_views`, run by the `flush_views` command, reads the log, adds the views counted since to
+`Blog.view_count` and merges the sketches into `Blog.readers_sketch`, estimating
+`Blog.reader_count` from it, with one update for all the blogs.
+
+Sketches stay in the cache once merged, merging the same readers again does not count them twice.
+Concurrent views of a blog may lose an update of its sketch, their readers are added again on
+their next view. The counts are refreshed in the responses once flushed.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+
+from base import hyperloglog
+from base.cache import append_to_log, bump_generation, invalidate, read_log, trim_log
+
+from .models import Blog
+
+VIEW_BUFFER_TIMEOUT = 60 * 60 * 24
+
+
+def get_views_key(blog_id):
+    return f"views_{blog_id}"
+
+
+def get_readers_key(blog_id):
+    return f"readers_{blog_id}"
+
+
+def get_reader(request):
+    """
+    Returns:
+        str: The reader of `request`, its user when authenticated, its address otherwise.
+    """
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    return f"address:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def record_view(blog_id, reader):
+    """
+    Count a view of the blog `blog_id` by `reader`, in two round-trips to the cache when neither
+    the blog has to be logged nor the reader is new to its sketch.
+    """
+    if increment_views(blog_id) == 1:
+        append_to_log("view_log", blog_id, VIEW_BUFFER_TIMEOUT)
+
+    key = get_readers_key(blog_id)
+    sketch = hyperloglog.add(cache.get(key), reader)
+    if sketch is not None:
+        cache.set(key, sketch, VIEW_BUFFER_TIMEOUT)
+
+
+def increment_views(blog_id):
+    # Kept until flushed, `incr` does not extend the timeout of a key
+    key = get_views_key(blog_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        return cache.incr(key)
+
+
+def flush_views(max_blogs=10000):
+    """
+    Write the views of the blogs logged since the last flush, at most `max_blogs` of them, to the
+    database.
+
+    Returns:
+        int: The number of views written, None if another flush is running.
+    """
+    if not cache.add("lock_view_flush", True, 60):
+        return None
+    try:
+        blog_ids, position = read_log("view_log", max_blogs, VIEW_BUFFER_TIMEOUT)
+        blog_ids = set(blog_ids)
+        counts = cache.get_many([get_views_key(blog_id) for blog_id in blog_ids])
+        views = {blog_id: counts.get(get_views_key(blog_id), 0) for blog_id in blog_ids}
+        sketches = cache.get_many([get_readers_key(blog_id) for blog_id in blog_ids])
+        written = write_views(
+            views,
+            {blog_id: sketches.get(get_readers_key(blog_id)) for blog_id in blog_ids},
+        )
+
+        for blog_id, count in views.items():
+            if not count:
+                continue
+            try:
+                remaining = cache.decr(get_views_key(blog_id), count)
+            except ValueError:
+                continue
+            # Viewed since the count was read, without being logged again
+            if remaining > 0:
+                append_to_log("view_log", blog_id, VIEW_BUFFER_TIMEOUT)
+        trim_log("view_log", position)
+        return written
+    finally:
+        cache.delete("lock_view_flush")
+
+
+def write_views(views, sketches):
+    """
+    Add the `views` of each blog to its view count and merge its sketch of `sketches` into its
+    readers, with two queries for all the blogs.
+
+    Returns:
+        int: The number of views written, those of deleted blogs being dropped.
+    """
+    with transaction.atomic():
+        blogs = list(
+            Blog.objects.select_for_update()
+            .filter(pk__in=views)
+            .only("id", "view_count", "readers_sketch")
+        )
+        for blog in blogs:
+            blog.view_count += views[blog.id]
+            blog.readers_sketch = hyperloglog.merge(
+                blog.readers_sketch, sketches[blog.id]
+            )
+            # The estimate may exceed the views of a blog with few readers
+            blog.reader_count = min(
+                hyperloglog.estimate(blog.readers_sketch), blog.view_count
+            )
+        Blog.objects.bulk_update(
+            blogs, ["view_count", "reader_count", "readers_sketch"]
+        )
+
+    if blogs:
+        invalidate(*[f"blog:{blog.id}" for blog in blogs])
+        # The lists show the view counts too
+        bump_generation("blogs")
+    return sum(views[blog.id] for blog in blogs)
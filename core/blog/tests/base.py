@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from core.blog.models import Blog, Category, Comment, Tag
+from core.custom_auth.models import User
+
+
+class BlogAPITestCase(APITestCase):
+    """
+    Test case calling the API as an admin, with a category, tags and readers to build blogs and
+    comments from, and an empty cache.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.admin = self.create_user("admin", role="Admin", is_staff=True)
+        self.readers = [self.create_user(f"reader{index}") for index in range(3)]
+        self.category = Category.objects.create(name="Python")
+        self.tags = [Tag.objects.create(name=f"tag{index}") for index in range(3)]
+        self.authenticate(self.admin)
+
+    def create_user(self, name, **fields):
+        return User.objects.create_user(
+            f"{name}@example.com",
+            "password",
+            first_name=name.title(),
+            last_name="Doe",
+            phone_number="+919999999999",
+            **fields,
+        )
+
+    def authenticate(self, user):
+        self.client.force_authenticate(user)
+        self.client.credentials(HTTP_API_KEY=settings.API_KEY)
+
+    def create_blogs(self, count, comments=0, **fields):
+        """
+        Create `count` published blogs, each with `comments` top-level comments having one reply.
+        """
+        blogs = []
+        for index in range(count):
+            blog = Blog.objects.create(
+                **{
+                    "title": f"Blog {index}",
+                    "content": "<p>Some content about python.</p>",
+                    "author": self.admin,
+                    "category": self.category,
+                    "is_published": True,
+                    **fields,
+                }
+            )
+            blog.tags.set(self.tags)
+            for comment_index in range(comments):
+                comment = Comment.objects.create(
+                    blog=blog,
+                    user=self.readers[comment_index % len(self.readers)],
+                    text=f"Comment {comment_index}",
+                )
+                Comment.objects.create(
+                    blog=blog, user=self.readers[0], text="Reply", parent=comment
+                )
+            blogs.append(blog)
+        return blogs
@@ -0,0 +1,49 @@
+from core.blog.models import Blog, Comment
+
+from .base import BlogAPITestCase
+
+
+class CommentMoveTests(BlogAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.source, self.target = self.create_blogs(2)
+        self.comment = Comment.objects.create(
+            blog=self.source, user=self.readers[0], text="Comment"
+        )
+
+    def assertCommentsCounted(self):
+        for blog in Blog.objects.all():
+            self.assertEqual(blog.comments_count, blog.comments.count(), blog.title)
+
+    def test_moved_comments_shift_the_counters_of_both_blogs(self):
+        for method in ["patch", "put"]:
+            blog = self.target if method == "patch" else self.source
+            response = getattr(self.client, method)(
+                f"/api/v1/blogs/comments/{self.comment.id}/",
+                {"blog": blog.id, "text": "Moved"},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 200, response.content)
+            self.assertCommentsCounted()
+
+    def test_moved_comments_can_be_deleted(self):
+        response = self.client.patch(
+            f"/api/v1/blogs/comments/{self.comment.id}/",
+            {"blog": self.target.id},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+
+        response = self.client.delete(f"/api/v1/blogs/comments/{self.comment.id}/")
+        self.assertLess(response.status_code, 300, response.content)
+        self.assertCommentsCounted()
+        self.assertEqual(Blog.objects.get(pk=self.target.pk).comments_count, 0)
+
+    def test_saving_a_moved_comment_again_shifts_the_counters_once(self):
+        comment = Comment.objects.create(
+            blog=self.source, user=self.readers[1], text="Created"
+        )
+        comment.blog = self.target
+        comment.save()
+        comment.save()
+        self.assertCommentsCounted()
@@ -0,0 +1,66 @@
+import base64
+import json
+
+from .base import BlogAPITestCase
+
+
+def encode_cursor(position, reverse=False):
+    payload = json.dumps({"p": position, "r": reverse})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+class CursorTests(BlogAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.blog = self.create_blogs(3, comments=2)[0]
+
+    def assertInvalidCursor(self, url, cursor):
+        response = self.client.get(url, {"cursor": cursor})
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertEqual(response.json(), {"error": "Invalid cursor."})
+
+    def test_blog_cursors_walk_both_ways(self):
+        response = self.client.get("/api/v1/blogs/", {"cursor": "", "page_size": 2})
+        first_page = [item["id"] for item in response.json()["results"]]
+        next_cursor = response.json()["next_cursor"]
+
+        response = self.client.get(
+            "/api/v1/blogs/", {"cursor": next_cursor, "page_size": 2}
+        )
+        self.assertEqual(len(response.json()["results"]), 1)
+        previous_cursor = response.json()["previous_cursor"]
+
+        response = self.client.get(
+            "/api/v1/blogs/", {"cursor": previous_cursor, "page_size": 2}
+        )
+        self.assertEqual(
+            [item["id"] for item in response.json()["results"]], first_page
+        )
+
+    def test_invalid_blog_cursors(self):
+        for cursor in [
+            "not base64!",
+            base64.urlsafe_b64encode(b"not json").decode(),
+            encode_cursor("abc"),
+            encode_cursor([1]),
+            encode_cursor(["2026-01-01", 1, 2]),
+            encode_cursor(["abc", "x"]),
+            encode_cursor([{"a": 1}, 1]),
+            encode_cursor(["2026-13-45", 1]),
+            encode_cursor(["2026-01-01", None]),
+            encode_cursor([[1], 1]),
+        ]:
+            with self.subTest(cursor=cursor):
+                self.assertInvalidCursor("/api/v1/blogs/", cursor)
+
+    def test_invalid_comment_cursors(self):
+        url = "/api/v1/blogs/comments/"
+        for cursor in [encode_cursor(["abc"]), encode_cursor([{"a": 1}])]:
+            with self.subTest(cursor=cursor):
+                self.assertInvalidCursor(url, cursor)
+
+    def test_invalid_tree_cursors(self):
+        url = f"/api/v1/blogs/comments/?blog={self.blog.id}&tree=1"
+        for cursor in [encode_cursor([None]), encode_cursor([["1"]])]:
+            with self.subTest(cursor=cursor):
+                self.assertInvalidCursor(url, cursor)
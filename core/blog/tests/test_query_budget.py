@@ -0,0 +1,57 @@
+from django.core.cache import cache
+
+from .base import BlogAPITestCase
+
+
+class QueryBudgetTests(BlogAPITestCase):
+    """
+    Reads cost a constant number of queries whatever the size of the page and the number of
+    comments, counted with a cold cache.
+    """
+
+    sizes = [(3, 2), (12, 6)]
+
+    def assertNumQueriesCold(self, num, url):
+        cache.clear()
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_blog_list(self):
+        for blogs, comments in self.sizes:
+            with self.subTest(blogs=blogs):
+                self.create_blogs(blogs, comments)
+                response = self.assertNumQueriesCold(
+                    4, f"/api/v1/blogs/?page_size={blogs}"
+                )
+                self.assertEqual(len(response.json()["results"]), blogs)
+
+    def test_blog_detail(self):
+        for blogs, comments in self.sizes:
+            with self.subTest(comments=comments):
+                blog = self.create_blogs(1, comments)[0]
+                response = self.assertNumQueriesCold(5, f"/api/v1/blogs/{blog.id}/")
+                self.assertEqual(len(response.json()["comments"]), comments)
+
+    def test_comment_list(self):
+        for blogs, comments in self.sizes:
+            with self.subTest(comments=comments):
+                blog = self.create_blogs(1, comments)[0]
+                response = self.assertNumQueriesCold(
+                    4,
+                    f"/api/v1/blogs/comments/?blog={blog.id}&page_size={comments * 2}",
+                )
+                self.assertEqual(len(response.json()["results"]), comments * 2)
+
+    def test_comment_tree(self):
+        for blogs, comments in self.sizes:
+            with self.subTest(comments=comments):
+                blog = self.create_blogs(1, comments)[0]
+                response = self.assertNumQueriesCold(
+                    2,
+                    f"/api/v1/blogs/comments/?blog={blog.id}&tree=1&page_size={comments * 2}",
+                )
+                results = response.json()["results"]
+                self.assertEqual(len(results), comments)
+                self.assertTrue(all(len(item["replies"]) == 1 for item in results))
@@ -0,0 +1,79 @@
+from unittest import skipUnless
+
+from django.db import connection
+
+from core.blog.search import (
+    HEADLINE_START,
+    HEADLINE_STOP,
+    format_headline,
+    inverted_index_backend,
+    postgres_backend,
+)
+
+from .base import BlogAPITestCase
+
+
+class SearchTests(BlogAPITestCase):
+    def setUp(self):
+        super().setUp()
+        # The index of the SQLite settings outlives the rows rolled back between tests
+        inverted_index_backend.postings = None
+
+    def search(self, text):
+        response = self.client.get("/api/v1/blogs/", {"search": text})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def test_snippets_are_plain_escaped_text(self):
+        self.create_blogs(
+            1,
+            content="<p>Use &lt;script&gt; tags with <b>python</b> &amp; more.</p>",
+        )
+        [result] = self.search("python")
+        self.assertEqual(
+            result["search_snippet"],
+            "Use &lt;script&gt; tags with <mark>python</mark> &amp; more.",
+        )
+
+    def test_markup_is_not_indexed(self):
+        self.create_blogs(1, content='<p class="strong">Plain words</p>')
+        self.assertEqual(self.search("strong"), [])
+        self.assertEqual(len(self.search("plain")), 1)
+
+    def test_search_by_author(self):
+        blog = self.create_blogs(1)[0]
+        for text in ["admin", "doe", "admin@example.com"]:
+            with self.subTest(text=text):
+                self.assertEqual([item["id"] for item in self.search(text)], [blog.id])
+
+    def test_renamed_author_is_reindexed(self):
+        blog = self.create_blogs(1)[0]
+        self.assertEqual(self.search("grace"), [])
+        response = self.client.patch(
+            f"/api/v1/auth/user/{self.admin.id}/", {"first_name": "Grace"}
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual([item["id"] for item in self.search("grace")], [blog.id])
+
+    def test_format_headline(self):
+        headline = f"&lt;b&gt;  about {HEADLINE_START}python{HEADLINE_STOP} <i"
+        self.assertEqual(
+            format_headline(headline),
+            "&lt;b&gt; about <mark>python</mark> &lt;i",
+        )
+
+
+@skipUnless(
+    connection.vendor == "postgresql", "The vectors are only stored on Postgres"
+)
+class PostgresSearchTests(BlogAPITestCase):
+    def test_reindexing_costs_a_constant_number_of_queries(self):
+        blogs = self.create_blogs(5)
+        # The documents, their tags and one update
+        with self.assertNumQueries(3):
+            postgres_backend.update([blog.id for blog in blogs])
+        response = self.client.get("/api/v1/blogs/", {"search": "tag1"})
+        self.assertEqual(
+            [item["id"] for item in response.json()["results"]],
+            [blog.id for blog in blogs],
+        )
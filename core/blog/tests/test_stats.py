@@ -0,0 +1,30 @@
+from core.blog.stats import flush_views
+
+from .base import BlogAPITestCase
+
+
+class ViewStatsTests(BlogAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.blog = self.create_blogs(1, is_published=True)[0]
+
+    def test_flushed_views_refresh_the_cached_lists(self):
+        response = self.client.get("/api/v1/blogs/")
+        etag = response.headers["ETag"]
+        self.assertEqual(response.json()["results"][0]["view_count"], 0)
+
+        for reader in self.readers:
+            self.authenticate(reader)
+            self.client.get(f"/api/v1/blogs/{self.blog.id}/")
+        self.assertEqual(flush_views(), len(self.readers))
+
+        self.authenticate(self.admin)
+
+        response = self.client.get("/api/v1/blogs/")
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual(response.json()["results"][0]["view_count"], len(self.readers))
+        self.assertEqual(
+            response.json()["results"][0]["reader_count"], len(self.readers)
+        )
+        response = self.client.get(f"/api/v1/blogs/{self.blog.id}/")
+        self.assertEqual(response.json()["view_count"], len(self.readers))
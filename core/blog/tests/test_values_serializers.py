@@ -0,0 +1,98 @@
+from datetime import date
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from base.renderers import FastJSONRenderer
+from base.serializers import select_fields
+from core.blog.models import Blog, Comment, CommentVote
+from core.blog.v1.serializers import (
+    BlogContentSerializer,
+    BlogContentValuesSerializer,
+    BlogListSerializer,
+    BlogListValuesSerializer,
+    CommentSerializer,
+    CommentValuesSerializer,
+    CommentVoteSerializer,
+    CommentVoteValuesSerializer,
+)
+
+from .base import BlogAPITestCase
+
+
+class ValuesSerializerParityTests(BlogAPITestCase):
+    """
+    Values serializers render the same bytes as the serializers they replace, on the same rows.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.context = {"request": APIRequestFactory().get("/api/v1/blogs/")}
+        self.admin.profile_pic = "profile/admin.png"
+        self.admin.bio = "Writes about python."
+        self.admin.save()
+
+        self.blogs = self.create_blogs(2, comments=2)
+        # Nulls, no tags and an unpublished blog
+        self.blogs.append(
+            Blog.objects.create(
+                title="Draft",
+                content="",
+                author=self.readers[0],
+                category=None,
+                publication_date=None,
+            )
+        )
+        Blog.objects.filter(pk=self.blogs[0].pk).update(
+            publication_date=date(2024, 2, 29)
+        )
+        for comment in Comment.objects.all()[:3]:
+            CommentVote.objects.create(
+                comment=comment, user=self.readers[1], value=CommentVote.UPVOTE
+            )
+        CommentVote.objects.create(
+            comment=comment, user=self.readers[2], value=CommentVote.DOWNVOTE
+        )
+
+    def assertSameRendering(self, values_serializer_class, serializer_class, queryset):
+        for fields in [None, {"id", "author", "tags"}, {"id", "updated_at"}]:
+            with self.subTest(serializer=serializer_class.__name__, fields=fields):
+                serializer = serializer_class(queryset, many=True, context=self.context)
+                if fields is not None:
+                    fields = fields & set(serializer.child.fields)
+                    select_fields(serializer, fields)
+                values_serializer = values_serializer_class(
+                    context=self.context, fields=fields
+                )
+                expected = serializer.data
+                data = values_serializer.serialize(queryset)
+                for renderer in [JSONRenderer(), FastJSONRenderer()]:
+                    self.assertEqual(renderer.render(data), renderer.render(expected))
+
+    def test_blog_list(self):
+        self.assertSameRendering(
+            BlogListValuesSerializer,
+            BlogListSerializer,
+            Blog.objects.for_list().order_by("id"),
+        )
+
+    def test_blog_content(self):
+        self.assertSameRendering(
+            BlogContentValuesSerializer,
+            BlogContentSerializer,
+            Blog.objects.for_detail().order_by("id"),
+        )
+
+    def test_comments(self):
+        self.assertSameRendering(
+            CommentValuesSerializer,
+            CommentSerializer,
+            Comment.objects.order_by("id"),
+        )
+
+    def test_comment_votes(self):
+        self.assertSameRendering(
+            CommentVoteValuesSerializer,
+            CommentVoteSerializer,
+            CommentVote.objects.select_related("user").order_by("id"),
+        )
@@ -0,0 +1,67 @@
+from django.test import override_settings
+
+from core.blog.models import Comment, CommentVote
+from core.blog.votes import buffer_vote, flush_votes
+
+from .base import BlogAPITestCase
+
+
+@override_settings(BUFFERED_VOTES=True)
+class BufferedVoteTests(BlogAPITestCase):
+    def setUp(self):
+        super().setUp()
+        blog = self.create_blogs(1, comments=1)[0]
+        self.comment = blog.comments.get(parent=None)
+
+    def assertCountersMatchVotes(self):
+        self.comment.refresh_from_db()
+        votes = CommentVote.objects.filter(comment=self.comment)
+        self.assertEqual(
+            self.comment.upvote_count, votes.filter(value=CommentVote.UPVOTE).count()
+        )
+        self.assertEqual(
+            self.comment.downvote_count,
+            votes.filter(value=CommentVote.DOWNVOTE).count(),
+        )
+
+    def test_votes_are_written_once_flushed(self):
+        for reader in self.readers:
+            self.authenticate(reader)
+            response = self.client.post(
+                f"/api/v1/blogs/comments/{self.comment.id}/upvote/"
+            )
+            self.assertLess(response.status_code, 300, response.content)
+        self.assertFalse(CommentVote.objects.filter(comment=self.comment).exists())
+
+        self.assertEqual(flush_votes(), len(self.readers))
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.upvote_count, len(self.readers))
+        self.assertCountersMatchVotes()
+
+    def test_removed_votes_are_deleted_once_flushed(self):
+        reader = self.readers[0]
+        self.comment.downvote(reader)
+        buffer_vote(self.comment.id, reader.id, None, CommentVote.DOWNVOTE)
+
+        self.assertEqual(flush_votes(), 1)
+        self.assertFalse(CommentVote.objects.filter(comment=self.comment).exists())
+        self.assertCountersMatchVotes()
+
+    def test_votes_written_unbuffered_before_the_flush_keep_counters_exact(self):
+        first, second = self.readers[:2]
+        buffer_vote(self.comment.id, first.id, CommentVote.UPVOTE)
+        buffer_vote(self.comment.id, second.id, CommentVote.DOWNVOTE)
+        # Written directly meanwhile, e.g. by a process with buffering off
+        Comment.objects.get(pk=self.comment.pk).upvote(first)
+        Comment.objects.get(pk=self.comment.pk).upvote(second)
+
+        flush_votes()
+        self.assertEqual(
+            CommentVote.objects.get(comment=self.comment, user=second).value,
+            CommentVote.DOWNVOTE,
+        )
+        self.comment.refresh_from_db()
+        self.assertEqual(
+            (self.comment.upvote_count, self.comment.downvote_count), (1, 1)
+        )
+        self.assertCountersMatchVotes()
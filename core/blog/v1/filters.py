@@ -0,0 +1,26 @@
+from django_filters import rest_framework as filters
+from rest_framework.filters import SearchFilter
+
+from core.blog.models import Comment
+from core.blog.search import get_search_backend
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    Search blogs with the full-text search backend, ordering the matches by relevance.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, "").strip()
+        if not text:
+            return queryset
+        return get_search_backend().search(queryset, text)
+
+
+class CommentFilter(filters.FilterSet):
+    # `?top_level=true` keeps the comments which are not replies
+    top_level = filters.BooleanFilter(field_name="parent", lookup_expr="isnull")
+
+    class Meta:
+        model = Comment
+        fields = ["blog", "parent", "user"]
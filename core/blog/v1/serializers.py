@@ -1,9 +1,86 @@
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.urls import reverse
 from django.utils import timezone
 from rest_framework import serializers
 
-from core.blog.models import Blog, Category, Comment, Tag
+from base.serializers import PreloadedPrimaryKeyRelatedField, ValuesSerializer
+from base.tree import get_depth
+from core.blog.excerpts import get_reading_stats
+from core.blog.models import Blog, Category, Comment, CommentVote, Tag
+from core.blog.search import format_headline, highlight
+from core.blog.votes import get_intents
 from core.custom_auth.models import User
 
+# Number of top-level comments embedded in the detail of a blog
+DETAIL_COMMENTS = 10
+
+
+def get_comments_url(request, blog_id):
+    """
+    Returns:
+        str: The URL of the top-level comments of the blog `blog_id`, absolute when given the
+        `request`.
+    """
+    url = reverse("comments-list")
+    if request is not None:
+        url = request.build_absolute_uri(url)
+    return f"{url}?{urlencode({'blog': blog_id, 'top_level': 'true'})}"
+
+
+def add_my_votes(user, comments):
+    """
+    Returns:
+        list: Copies of the serialized `comments`, and of their nested `replies`, with the value
+        of the vote of `user` on each as `my_vote` (None when not voted), read with one query.
+        Votes buffered but not flushed yet (see `core.blog.votes`) are read from the cache, and
+        shift the counters of their comments.
+    """
+    comment_ids = []
+    pending = list(comments)
+    while pending:
+        comment = pending.pop()
+        comment_ids.append(comment["id"])
+        pending.extend(comment.get("replies", []))
+
+    votes, buffered = {}, {}
+    if user.is_authenticated and comment_ids:
+        votes = dict(
+            CommentVote.objects.filter(
+                user=user, comment_id__in=comment_ids
+            ).values_list("comment_id", "value")
+        )
+        if settings.BUFFERED_VOTES:
+            intents = get_intents([(comment_id, user.id) for comment_id in comment_ids])
+            buffered = {comment_id: value for (comment_id, _), value in intents.items()}
+
+    def copy(comments):
+        copies = []
+        for comment in comments:
+            comment = {**comment, "my_vote": votes.get(comment["id"])}
+            if comment["id"] in buffered:
+                shift_vote_counts(comment, buffered[comment["id"]])
+            if "replies" in comment:
+                comment["replies"] = copy(comment["replies"])
+            copies.append(comment)
+        return copies
+
+    return copy(comments)
+
+
+def shift_vote_counts(comment, value):
+    """
+    Replace the vote of the serialized `comment` with `value`, shifting its counters.
+    """
+    previous, comment["my_vote"] = comment["my_vote"], value
+    for field, counted in [
+        ("upvote_count", CommentVote.UPVOTE),
+        ("downvote_count", CommentVote.DOWNVOTE),
+    ]:
+        if field in comment:
+            comment[field] += (value == counted) - (previous == counted)
+
 
 class UserSerializer(serializers.ModelSerializer):
 
@@ -58,25 +135,62 @@ class BlogCreateUpdateSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         user = request.user
         validated_data.update({"author": user})
-        is_published = validated_data.get("is_published", False)
-        if is_published:
-            validated_data.update({"publication_date": timezone.now().date()})
-        blog_instance = super().create(validated_data)
+        blog_instance = super().create(self.prepare(validated_data))
         return blog_instance
 
     def update(self, instance, validated_data):
+        blog_instance = super().update(instance, self.prepare(validated_data))
+        return blog_instance
+
+    def prepare(self, validated_data):
+        """
+        Complete `validated_data` with the fields derived from it on write.
+        """
         is_published = validated_data.get("is_published", False)
         if is_published:
             validated_data.update({"publication_date": timezone.now().date()})
-        blog_instance = super().update(instance, validated_data)
-        return blog_instance
+        if "content" in validated_data:
+            validated_data.update(get_reading_stats(validated_data["content"]))
+        return validated_data
+
+
+class TagIdOrNameField(PreloadedPrimaryKeyRelatedField):
+    """
+    A tag given by id, or by name as a string, the named tags being created by
+    `core.blog.bulk.preload_blog_relations` beforehand.
+    """
+
+    default_error_messages = {"invalid_name": 'Invalid tag name "{name}".'}
+
+    def to_internal_value(self, data):
+        if isinstance(data, str):
+            tag = self.context["preloaded"][Tag].get(data.strip())
+            if tag is None:
+                self.fail("invalid_name", name=data)
+            return tag
+        return super().to_internal_value(data)
+
+
+class BlogBulkSerializer(BlogCreateUpdateSerializer):
+    """
+    `BlogCreateUpdateSerializer` of the bulk endpoint, validating the category and the tags
+    against those preloaded for the whole batch instead of with queries.
+    """
+
+    category = PreloadedPrimaryKeyRelatedField(
+        queryset=Category.objects.all(), allow_null=True, required=False
+    )
+    tags = TagIdOrNameField(many=True, queryset=Tag.objects.all(), allow_empty=False)
+
+    class Meta(BlogCreateUpdateSerializer.Meta):
+        read_only_fields = ["author"]
+        extra_kwargs = {}
 
 
 class BlogListSerializer(serializers.ModelSerializer):
     author = UserSerializer()
     category = CategorySerializer()
     tags = TagSerializer(many=True)
-    comments_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Blog
@@ -86,19 +200,40 @@ class BlogListSerializer(serializers.ModelSerializer):
             "publication_date",
             "is_published",
             "author",
-            "content",
+            "excerpt",
+            "word_count",
+            "reading_time",
             "category",
             "tags",
             "comments_count",
+            "view_count",
+            "reader_count",
+            "updated_at",
         ]
 
-    def get_comments_count(self, obj):
-        return obj.comments.count()
+
+class BlogSearchSerializer(BlogListSerializer):
+    search_rank = serializers.FloatField(read_only=True)
+    search_snippet = serializers.SerializerMethodField()
+
+    class Meta(BlogListSerializer.Meta):
+        fields = BlogListSerializer.Meta.fields + ["search_rank", "search_snippet"]
+
+    def get_search_snippet(self, obj):
+        # Annotated by the Postgres backend, built in Python otherwise
+        if hasattr(obj, "search_snippet"):
+            return format_headline(obj.search_snippet)
+        request = self.context.get("request")
+        return highlight(obj.content, request.query_params.get("search", ""))
+
+
+class BlogExportSerializer(BlogListSerializer):
+
+    class Meta(BlogListSerializer.Meta):
+        fields = BlogListSerializer.Meta.fields + ["content"]
 
 
 class CommentSerializer(serializers.ModelSerializer):
-    upvoted_by = UserSerializer(many=True)
-    downvoted_by = UserSerializer(many=True)
 
     class Meta:
         model = Comment
@@ -109,10 +244,21 @@ class CommentSerializer(serializers.ModelSerializer):
             "text",
             "created_at",
             "parent",
-            "upvoted_by",
-            "downvoted_by",
             "upvote_count",
             "downvote_count",
+            "updated_at",
+        ]
+
+
+class CommentVoteSerializer(serializers.ModelSerializer):
+    user = UserSerializer()
+
+    class Meta:
+        model = CommentVote
+        fields = [
+            "id",
+            "user",
+            "value",
         ]
 
 
@@ -127,6 +273,42 @@ class CommentCreateUpdateSerializer(serializers.ModelSerializer):
             "parent",
         ]
 
+    def validate(self, attrs):
+        instance = self.instance
+        blog = attrs.get("blog")
+        blog_id = blog.id if blog is not None else instance.blog_id
+        moved = instance is not None and blog_id != instance.blog_id
+
+        if attrs.get("parent") is not None:
+            self.validate_reply(attrs["parent"], blog_id)
+        elif moved and "parent" not in attrs and instance.parent_id is not None:
+            raise serializers.ValidationError(
+                {"parent": "The parent must be a comment of the same blog."}
+            )
+        # Replies are indexed per blog, see `Comment.path`
+        if moved and instance.reply_count:
+            raise serializers.ValidationError(
+                {"blog": "Comments with replies cannot be moved to another blog."}
+            )
+        return attrs
+
+    def validate_reply(self, parent, blog_id):
+        if parent.blog_id != blog_id:
+            raise serializers.ValidationError(
+                {"parent": "The parent must be a comment of the same blog."}
+            )
+        if self.instance is not None and parent.path.startswith(self.instance.path):
+            raise serializers.ValidationError(
+                {"parent": "A comment cannot reply to itself or to its replies."}
+            )
+        if get_depth(parent.path) >= Comment.MAX_DEPTH:
+            raise serializers.ValidationError(
+                {
+                    "parent": f"Replies cannot be nested more than {Comment.MAX_DEPTH} "
+                    "levels deep."
+                }
+            )
+
     def create(self, validated_data):
         request = self.context.get("request")
         user = request.user
@@ -135,11 +317,39 @@ class CommentCreateUpdateSerializer(serializers.ModelSerializer):
         return comment_instance
 
 
-class BlogDetailSerializer(serializers.ModelSerializer):
+class CommentBulkSerializer(CommentCreateUpdateSerializer):
+    """
+    `CommentCreateUpdateSerializer` of the bulk endpoint, validating the blog and the parent
+    against those preloaded for the whole batch instead of with queries.
+    """
+
+    blog = PreloadedPrimaryKeyRelatedField(queryset=Blog.objects.all())
+    parent = PreloadedPrimaryKeyRelatedField(
+        queryset=Comment.objects.all(), allow_null=True, required=False
+    )
+
+    def validate_blog(self, blog):
+        # Moving comments would shift the counters of both blogs
+        if self.instance is not None and blog.id != self.instance.blog_id:
+            raise serializers.ValidationError(
+                "Comments cannot be moved to another blog in bulk."
+            )
+        return blog
+
+
+class TagBulkSerializer(serializers.Serializer):
+    """
+    Tag of the bulk endpoint, whose name is checked for uniqueness for the whole batch by the
+    view rather than with one query per tag.
+    """
+
+    name = serializers.CharField(max_length=Tag._meta.get_field("name").max_length)
+
+
+class BlogContentSerializer(serializers.ModelSerializer):
     author = UserSerializer()
     category = CategorySerializer()
     tags = TagSerializer(many=True)
-    comments = CommentSerializer(many=True)
 
     class Meta:
         model = Blog
@@ -150,7 +360,48 @@ class BlogDetailSerializer(serializers.ModelSerializer):
             "is_published",
             "author",
             "content",
+            "word_count",
+            "reading_time",
             "category",
             "tags",
-            "comments",
+            "comments_count",
+            "view_count",
+            "reader_count",
+            "updated_at",
         ]
+
+
+class BlogDetailSerializer(BlogContentSerializer):
+    # Only the first top-level comments, the others are paginated at `comments_url`
+    comments = serializers.SerializerMethodField()
+    comments_url = serializers.SerializerMethodField()
+
+    class Meta(BlogContentSerializer.Meta):
+        fields = BlogContentSerializer.Meta.fields + ["comments", "comments_url"]
+
+    def get_comments(self, obj):
+        comments = obj.comments.top_level()[:DETAIL_COMMENTS]
+        return CommentSerializer(comments, many=True, context=self.context).data
+
+    def get_comments_url(self, obj):
+        return get_comments_url(self.context.get("request"), obj.id)
+
+
+class BlogListValuesSerializer(ValuesSerializer):
+    serializer_class = BlogListSerializer
+
+
+class BlogExportValuesSerializer(ValuesSerializer):
+    serializer_class = BlogExportSerializer
+
+
+class BlogContentValuesSerializer(ValuesSerializer):
+    serializer_class = BlogContentSerializer
+
+
+class CommentValuesSerializer(ValuesSerializer):
+    serializer_class = CommentSerializer
+
+
+class CommentVoteValuesSerializer(ValuesSerializer):
+    serializer_class = CommentVoteSerializer
@@ -1,12 +1,25 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import BlogViewSet, CommentViewSet
+from .views import BlogViewSet, CommentViewSet, FeedView, TagViewSet
 
 router = DefaultRouter()
 router.register(r"comments", CommentViewSet, basename="comments")
+router.register(r"tags", TagViewSet, basename="tags")
 router.register(r"", BlogViewSet, basename="blogs")
 
 urlpatterns = [
+    # Before the router, whose blog detail route would match `feed/`
+    path("feed/", FeedView.as_view(), name="feed"),
+    path(
+        "feed/categories/<int:pk>/",
+        FeedView.as_view(feed_kind="category"),
+        name="category-feed",
+    ),
+    path(
+        "feed/authors/<int:pk>/",
+        FeedView.as_view(feed_kind="author"),
+        name="author-feed",
+    ),
     path("", include(router.urls)),
 ]
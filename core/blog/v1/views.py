@@ -1,56 +1,128 @@
-from django.core.cache import cache
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import ParseError
 
 # from rest_framework.decorators import action
-from rest_framework.filters import OrderingFilter, SearchFilter
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.filters import OrderingFilter
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from base.permissions import IsAPIKeyAuthenticated, IsOwnerOrAdmin, IsRoleAuthorOrAdmin
-from core.blog.models import Blog, Comment
+from base.cache import (
+    aget_current,
+    aget_fragments,
+    bump_generation,
+    get_fragments,
+    get_or_build,
+    get_versions,
+    invalidate,
+    set_fragments,
+)
+from base.mixins import (
+    AsyncReadMixin,
+    BulkMixin,
+    CachedListMixin,
+    ConditionalGetMixin,
+    ExportMixin,
+    PersonalFieldsMixin,
+    RowFragmentListMixin,
+    SparseFieldsetMixin,
+    TreeListMixin,
+    ValuesSerializerMixin,
+)
+from base.paginator import EstimatedCountPagination
+from base.permissions import (
+    IsAPIKeyAuthenticated,
+    IsOwnerOrAdmin,
+    IsRoleAdmin,
+    IsRoleAuthorOrAdmin,
+)
+from base.renderers import (
+    AtomRenderer,
+    FallbackContentNegotiation,
+    FastJSONRenderer,
+    JSONFeedRenderer,
+    RSSRenderer,
+)
+from base.tree import get_parent_pk
+from core.blog.bulk import (
+    create_blogs,
+    create_comments,
+    get_or_create_tags,
+    preload_blog_relations,
+    preload_comment_relations,
+    rename_tags,
+    to_pk,
+    update_blogs,
+    update_comments,
+)
+from core.blog.cache import blog_dependencies, comment_dependencies
+from core.blog.feeds import Feed, get_document
+from core.blog.models import Blog, Comment, CommentVote, Tag
+from core.blog.stats import get_reader, record_view
+from core.blog.votes import buffer_vote
 
+from .filters import CommentFilter, FullTextSearchFilter
 from .serializers import (
+    DETAIL_COMMENTS,
+    BlogBulkSerializer,
+    BlogContentValuesSerializer,
     BlogCreateUpdateSerializer,
     BlogDetailSerializer,
+    BlogExportSerializer,
+    BlogExportValuesSerializer,
     BlogListSerializer,
+    BlogListValuesSerializer,
+    BlogSearchSerializer,
+    CommentBulkSerializer,
     CommentCreateUpdateSerializer,
     CommentSerializer,
+    CommentValuesSerializer,
+    CommentVoteValuesSerializer,
+    TagBulkSerializer,
+    TagSerializer,
+    add_my_votes,
+    get_comments_url,
 )
 
 
-class BlogViewSet(viewsets.ModelViewSet):
+class BlogViewSet(
+    PersonalFieldsMixin,
+    AsyncReadMixin,
+    BulkMixin,
+    ExportMixin,
+    SparseFieldsetMixin,
+    CachedListMixin,
+    RowFragmentListMixin,
+    ValuesSerializerMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Blog.objects.all()
     serializer_class = BlogDetailSerializer
-    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
+    pagination_class = EstimatedCountPagination
+    # Search comes before ordering so that an explicit `?ordering=` wins over relevance
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, OrderingFilter]
     filterset_fields = ["author", "category", "is_published"]
     ordering_fields = ["id", "title"]
-    search_fields = [
-        "title",
-        "content",
-        "author__first_name",
-        "author__email",
-        "category__name",
-        "tags__name",
-    ]
+    # Newest first when paginating with `?cursor=`
+    cursor_ordering = ("-publication_date", "-id")
+    list_cache_resource = "blogs"
+    row_fragment_prefix = "blog_row"
+    sparse_fieldset_actions = ["list", "retrieve", "export"]
+    # `my_vote` of the embedded comments
+    personal_fields_actions = ["retrieve"]
 
     def get_queryset(self):
         queryset = self.queryset
 
-        # Skip caching if request contains filters or search parameters
-        if self.request.query_params:
-            cache_key = None
-        else:
-            cache_key = "blog_list"
-
-        # Return cached data if any
-        if cache_key:
-            cached_data = cache.get(cache_key)
-            if cached_data:
-                return cached_data
-
         # Restrict access for non-admin users when modifying data
         if self.action in ["partial_update", "update", "destroy"]:
             user = self.request.user
@@ -66,15 +138,26 @@ class BlogViewSet(viewsets.ModelViewSet):
             except ValueError:
                 raise ParseError({"error": "Invalid tag value. Tags must be integers."})
 
-        # Cache the queryset only if no request parameters are present
-        if cache_key:
-            cache.set(cache_key, queryset)
-
+        queryset = self.plan_queryset(queryset)
         return queryset.order_by("id")
 
+    def plan_queryset(self, queryset):
+        """
+        Attach the joins, prefetches and annotations needed by the serializer of the current
+        action, so list and retrieve cost a constant number of queries.
+        """
+        if self.action == "list":
+            fields = self.get_sparse_fields()
+            if fields is None:
+                fields = set(self.get_serializer_class().Meta.fields)
+            return queryset.for_list(fields)
+        if self.action == "retrieve":
+            return queryset.for_detail()
+        return queryset
+
     def get_permissions(self):
         # Only Author/Admins allowed to create/update/delete blogs
-        if self.action in ["create", "update", "partial_update", "delete"]:
+        if self.action in ["create", "update", "partial_update", "delete", "bulk"]:
             self.permission_classes = [
                 IsAPIKeyAuthenticated,
                 IsAuthenticated,
@@ -82,6 +165,34 @@ class BlogViewSet(viewsets.ModelViewSet):
             ]
         return super().get_permissions()
 
+    def use_row_fragments(self, request):
+        # Search results carry a rank and a snippet specific to the query
+        return super().use_row_fragments(request) and not request.query_params.get(
+            "search"
+        )
+
+    def get_row_fragment_key(self, pk):
+        # Rows of a sparse fieldset are cached apart from the full ones
+        return super().get_row_fragment_key(pk) + self.get_sparse_fields_key()
+
+    def serialize_rows(self, ids):
+        return self.get_values_serializer().serialize(Blog.objects.filter(pk__in=ids))
+
+    def get_row_known_dependencies(self, pk):
+        return [f"blog:{pk}", f"blog:{pk}:comments"]
+
+    def get_row_dependencies(self, data):
+        return blog_dependencies(data)
+
+    def get_values_serializer_class(self):
+        if self.action == "list" and not self.request.query_params.get("search"):
+            return BlogListValuesSerializer
+        if self.action == "retrieve":
+            return BlogContentValuesSerializer
+        if self.action == "export":
+            return BlogExportValuesSerializer
+        return None
+
     def get_serializer_class(self):
         actions = {
             "list": BlogListSerializer,
@@ -89,27 +200,302 @@ class BlogViewSet(viewsets.ModelViewSet):
             "update": BlogCreateUpdateSerializer,
             "partial_update": BlogCreateUpdateSerializer,
             "retrieve": BlogDetailSerializer,
+            "export": BlogExportSerializer,
         }
         if self.action in actions:
             self.serializer_class = actions.get(self.action)
+        if self.action == "list" and self.request.query_params.get("search"):
+            self.serializer_class = BlogSearchSerializer
         return super().get_serializer_class()
 
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """
+        Stream the blogs, with their content, as NDJSON. Accepts the filters and the sparse
+        fieldsets of the list, `?updated_since=` and `?after_id=` resume an export.
+        """
+        return self.get_export_response(request, self.get_values_serializer())
+
+    @action(detail=False, methods=["post", "patch"], url_path="bulk")
+    def bulk(self, request):
+        """
+        Create blogs from a list (POST), or update them partially (PATCH, every item naming the
+        `id` of its blog). Tags may be given by id or by name, missing names are created.
+        """
+        items = self.get_bulk_items(request)
+        context = {
+            **self.get_serializer_context(),
+            "preloaded": preload_blog_relations(items),
+        }
+        if request.method == "POST":
+            return self.bulk_create(items, context)
+        return self.bulk_update(items, context)
+
+    def bulk_create(self, items, context):
+        results, blogs_data = [], {}
+        for index, item in enumerate(items):
+            serializer = BlogBulkSerializer(data=item, context=context)
+            if not serializer.is_valid():
+                results.append(self.get_bulk_error(index, serializer.errors))
+                continue
+            blogs_data[index] = serializer.prepare(
+                {**serializer.validated_data, "author": self.request.user}
+            )
+
+        blogs = create_blogs(list(blogs_data.values()))
+        results.extend(
+            {"index": index, "status": "created", "id": blog.id}
+            for index, blog in zip(blogs_data, blogs)
+        )
+
+        # Clear cache once for the whole batch
+        if blogs:
+            bump_generation("blogs")
+
+        return self.get_bulk_response(results, status.HTTP_201_CREATED)
+
+    def bulk_update(self, items, context):
+        user = self.request.user
+        queryset = Blog.objects.filter(
+            pk__in=[to_pk(item.get("id")) for item in items if isinstance(item, dict)]
+        )
+        # Restrict access for non-admin users like `update` does
+        if user.role != "Admin" or not user.is_staff:
+            queryset = queryset.filter(author=user)
+        blogs = {blog.id: blog for blog in queryset}
+
+        results, updates = [], {}
+        for index, item in enumerate(items):
+            blog_id = to_pk(item.get("id")) if isinstance(item, dict) else None
+            if blog_id not in blogs:
+                results.append(self.get_bulk_error(index, {"id": ["Not found."]}))
+                continue
+            if any(blog.id == blog_id for blog, _ in updates.values()):
+                results.append(
+                    self.get_bulk_error(
+                        index, {"id": ["Duplicate of a previous item."]}
+                    )
+                )
+                continue
+            serializer = BlogBulkSerializer(
+                blogs[blog_id], data=item, partial=True, context=context
+            )
+            if not serializer.is_valid():
+                results.append(self.get_bulk_error(index, serializer.errors))
+                continue
+            updates[index] = (
+                blogs[blog_id],
+                serializer.prepare(dict(serializer.validated_data)),
+            )
+
+        update_blogs(list(updates.values()))
+        results.extend(
+            {"index": index, "status": "updated", "id": blog.id}
+            for index, (blog, _) in updates.items()
+        )
+
+        # Clear cache once for the whole batch
+        if updates:
+            invalidate(*[f"blog:{blog.id}" for blog, _ in updates.values()])
+            bump_generation("blogs")
+
+        return self.get_bulk_response(results)
+
     def retrieve(self, request, *args, **kwargs):
         blog_id = kwargs.get("pk")
-        cache_key = f"blog_{blog_id}"
-        cached_data = cache.get(cache_key)
 
-        # Return cached data if any
-        if cached_data:
-            return Response(cached_data, status=status.HTTP_200_OK)
+        # Conditional requests are answered from the latest changes of the blog and of its
+        # comments, before anything is fetched from the cache or serialized
+        if self.is_conditional(request):
+            try:
+                latest_changes = self.get_latest_changes(blog_id).first()
+            except (TypeError, ValueError):
+                latest_changes = None
+            not_modified = self.get_detail_not_modified_response(
+                request, blog_id, latest_changes
+            )
+            if not_modified is not None:
+                record_view(int(blog_id), get_reader(request))
+                return not_modified
 
-        instance = self.get_object()
-        serializer = self.get_serializer(instance)
+        cached_data = self.get_blog_data(blog_id)
+        record_view(cached_data["blog"]["id"], get_reader(request))
+        comments = []
+        if self.includes_comments():
+            comments = self.get_comments_data(cached_data["comment_ids"])
+        return self.get_detail_response(request, blog_id, cached_data, comments)
 
-        # set cache data
-        cache.set(cache_key, serializer.data)
+    async def aretrieve(self, request, *args, **kwargs):
+        """
+        Counterpart of `retrieve` serving the detail from the event loop when its fragments are
+        cached and current, the misses being rebuilt in a thread.
+        """
+        blog_id = kwargs.get("pk")
+
+        if self.is_conditional(request):
+            try:
+                latest_changes = await self.get_latest_changes(blog_id).afirst()
+            except (TypeError, ValueError):
+                latest_changes = None
+            not_modified = self.get_detail_not_modified_response(
+                request, blog_id, latest_changes
+            )
+            if not_modified is not None:
+                await sync_to_async(record_view)(int(blog_id), get_reader(request))
+                return not_modified
+
+        cached_data = await aget_current(
+            f"blog_{blog_id}", self.get_blog_data_tags(blog_id)
+        )
+        if cached_data is None:
+            cached_data = await sync_to_async(self.get_blog_data)(blog_id)
+        # Cache writes go through the sync client anyway, see `base.redis_cache`
+        await sync_to_async(record_view)(cached_data["blog"]["id"], get_reader(request))
+        comments = []
+        if self.includes_comments():
+            keys = self.get_comment_keys(cached_data["comment_ids"])
+            cached_comments = await aget_fragments(list(keys.values()))
+            if len(cached_comments) == len(keys):
+                comments = [cached_comments[key] for key in keys.values()]
+            else:
+                comments = await sync_to_async(self.get_comments_data)(
+                    cached_data["comment_ids"]
+                )
+        return self.get_detail_response(request, blog_id, cached_data, comments)
+
+    def get_latest_changes(self, blog_id):
+        return (
+            Blog.objects.filter(pk=blog_id)
+            .with_comments_updated_at(DETAIL_COMMENTS)
+            .values_list(
+                "updated_at", "comments_updated_at", "view_count", "reader_count"
+            )
+        )
+
+    def get_detail_not_modified_response(self, request, blog_id, latest_changes):
+        if latest_changes is None:
+            return None
+        return self.get_not_modified_response(
+            request, *self.get_detail_validators(request, blog_id, *latest_changes)
+        )
 
-        return Response(serializer.data)
+    def get_blog_data_tags(self, blog_id):
+        return [f"blog:{blog_id}", f"blog:{blog_id}:comments"]
+
+    def get_blog_data(self, blog_id):
+        def build_blog_data():
+            # Cached whole for every sparse fieldset, which are trimmed from it
+            data = self.get_object_data(
+                BlogContentValuesSerializer(context=self.get_serializer_context())
+            )
+            blog_data = {
+                "blog": data,
+                # Only the first top-level comments are embedded, read from a partial index
+                "comment_ids": list(
+                    Comment.objects.filter(blog_id=data["id"])
+                    .top_level()
+                    .values_list("id", flat=True)[:DETAIL_COMMENTS]
+                ),
+            }
+            return blog_data, blog_dependencies(data)
+
+        # The blog and the ids of its comments are cached apart from the comments themselves,
+        # so that a vote only invalidates the fragment of the voted comment. Concurrent misses
+        # are served the stale fragment while a single request rebuilds it.
+        return get_or_build(
+            f"blog_{blog_id}", build_blog_data, tags=self.get_blog_data_tags(blog_id)
+        )
+
+    def add_personal_fields(self, request, data):
+        if "comments" not in data:
+            return data
+        return {**data, "comments": add_my_votes(request.user, data["comments"])}
+
+    def includes_comments(self):
+        fields = self.get_sparse_fields()
+        return fields is None or "comments" in fields
+
+    def get_detail_response(self, request, blog_id, cached_data, comments):
+        response = Response(
+            self.trim_sparse_fields(
+                {
+                    **cached_data["blog"],
+                    "comments": comments,
+                    "comments_url": get_comments_url(request, blog_id),
+                }
+            )
+        )
+        comments_updated_at = max(
+            (parse_datetime(comment["updated_at"]) for comment in comments),
+            default=None,
+        )
+
+        # The validators sent are those of the fragments served, which may be stale
+        return self.set_validators(
+            response,
+            *self.get_detail_validators(
+                request,
+                blog_id,
+                parse_datetime(cached_data["blog"]["updated_at"]),
+                comments_updated_at,
+                cached_data["blog"]["view_count"],
+                cached_data["blog"]["reader_count"],
+            ),
+        )
+
+    def get_detail_validators(
+        self,
+        request,
+        blog_id,
+        updated_at,
+        comments_updated_at,
+        view_count,
+        reader_count,
+    ):
+        """
+        Returns:
+            tuple: The ETag and the Last-Modified date of the detail of a blog, given the latest
+            change of the blog and of its comments, and its flushed view counts, which change the
+            ETag but are not modifications.
+        """
+        etag = self.get_etag(
+            request,
+            blog_id,
+            updated_at,
+            comments_updated_at,
+            view_count,
+            reader_count,
+        )
+        return etag, max(filter(None, [updated_at, comments_updated_at]))
+
+    def get_comment_keys(self, comment_ids):
+        return {comment_id: f"comment_{comment_id}" for comment_id in comment_ids}
+
+    def get_comments_data(self, comment_ids):
+        """
+        Return the serialized comments of `comment_ids`, from their cached fragments when valid,
+        serializing the others with one planned query.
+        """
+        keys = self.get_comment_keys(comment_ids)
+        versions = get_versions([f"comment:{comment_id}" for comment_id in comment_ids])
+        cached_data = get_fragments(list(keys.values()))
+
+        missing_ids = [
+            comment_id for comment_id, key in keys.items() if key not in cached_data
+        ]
+        if missing_ids:
+            comments = CommentValuesSerializer(
+                context=self.get_serializer_context()
+            ).serialize(Comment.objects.filter(pk__in=missing_ids))
+            fragments = {
+                keys[data["id"]]: (data, comment_dependencies(data))
+                for data in comments
+            }
+            set_fragments(fragments, versions)
+            cached_data.update({key: data for key, (data, _) in fragments.items()})
+
+        # Comments deleted since the ids were cached are skipped
+        return [cached_data[key] for key in keys.values() if key in cached_data]
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -117,7 +503,7 @@ class BlogViewSet(viewsets.ModelViewSet):
         serializer.save()
 
         # Clear cache as a new blog is added
-        cache.delete("blog_list")
+        bump_generation("blogs")
 
         response_data = {
             "message": "Blog created successfully.",
@@ -133,8 +519,8 @@ class BlogViewSet(viewsets.ModelViewSet):
         serializer.save()
 
         # Clear cache
-        cache.delete(f"blog_{instance.id}")
-        cache.delete("blog_list")
+        invalidate(f"blog:{instance.id}")
+        bump_generation("blogs")
 
         response_data = {
             "message": "Blog updated successfully.",
@@ -147,22 +533,137 @@ class BlogViewSet(viewsets.ModelViewSet):
         response = super().destroy(request, *args, **kwargs)
 
         # Clear cache
-        cache.delete(f"blog_{blog_id}")
-        cache.delete("blog_list")
+        invalidate(f"blog:{blog_id}")
+        bump_generation("blogs")
+        bump_generation("comments")
 
         return response
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    PersonalFieldsMixin,
+    AsyncReadMixin,
+    BulkMixin,
+    ExportMixin,
+    SparseFieldsetMixin,
+    CachedListMixin,
+    TreeListMixin,
+    ValuesSerializerMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    pagination_class = EstimatedCountPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = CommentFilter
+    # `?blog=<id>&tree=1` lists the threads of a blog, see `get_tree_queryset`
+    tree_count_field = "reply_count"
+    list_cache_resource = "comments"
+    values_serializer_class = CommentValuesSerializer
+    sparse_fieldset_actions = ["list", "retrieve", "export"]
+    personal_fields = ["my_vote"]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ["list", "retrieve"]:
+            queryset = queryset.order_by("id")
+        return queryset
+
+    def add_personal_fields(self, request, data):
+        fields = self.get_sparse_fields()
+        if fields is not None and "my_vote" not in fields:
+            return data
+        if self.action == "retrieve":
+            return add_my_votes(request.user, [data])[0]
+        return {**data, "results": add_my_votes(request.user, data["results"])}
+
+    def get_tree_queryset(self, request):
+        """
+        Returns:
+            tuple: The comments of the blog `?blog=`, and the path of the comment `?parent=` whose
+            replies are listed, "" for every thread of the blog.
+        """
+        try:
+            blog_id = int(request.query_params["blog"])
+        except KeyError:
+            raise ParseError({"error": "Threads are listed per blog, give a blog."})
+        except ValueError:
+            raise ParseError({"error": "Invalid blog value. It must be an integer."})
+        queryset = self.get_queryset().filter(blog_id=blog_id)
+
+        parent_id = request.query_params.get("parent")
+        if parent_id is None:
+            return queryset, ""
+        try:
+            root_path = (
+                queryset.filter(pk=int(parent_id))
+                .values_list("path", flat=True)
+                .first()
+            )
+        except ValueError:
+            raise ParseError({"error": "Invalid parent value. It must be an integer."})
+        if root_path is None:
+            raise Http404
+        return queryset, root_path
+
+    def retrieve(self, request, *args, **kwargs):
+        if self.is_conditional(request):
+            try:
+                updated_at = self.get_updated_at(kwargs.get("pk")).first()
+            except (TypeError, ValueError):
+                updated_at = None
+            not_modified = self.get_comment_not_modified_response(
+                request, kwargs.get("pk"), updated_at
+            )
+            if not_modified is not None:
+                return not_modified
+        return self.get_comment_response(request, kwargs.get("pk"))
+
+    async def aretrieve(self, request, *args, **kwargs):
+        """
+        Counterpart of `retrieve` answering conditional requests from the event loop, the
+        comment being serialized in a thread.
+        """
+        if self.is_conditional(request):
+            try:
+                updated_at = await self.get_updated_at(kwargs.get("pk")).afirst()
+            except (TypeError, ValueError):
+                updated_at = None
+            not_modified = self.get_comment_not_modified_response(
+                request, kwargs.get("pk"), updated_at
+            )
+            if not_modified is not None:
+                return not_modified
+        return await sync_to_async(self.get_comment_response)(request, kwargs.get("pk"))
+
+    def get_updated_at(self, comment_id):
+        return Comment.objects.filter(pk=comment_id).values_list(
+            "updated_at", flat=True
+        )
+
+    def get_comment_not_modified_response(self, request, comment_id, updated_at):
+        if updated_at is None:
+            return None
+        return self.get_not_modified_response(
+            request, self.get_etag(request, comment_id, updated_at), updated_at
+        )
+
+    def get_comment_response(self, request, comment_id):
+        data = self.get_object_data()
+        if "updated_at" not in data:
+            # Left out by a sparse fieldset
+            return Response(data)
+        updated_at = parse_datetime(data["updated_at"])
+        return self.set_validators(
+            Response(data), self.get_etag(request, comment_id, updated_at), updated_at
+        )
 
     def get_serializer_class(self):
         actions = {
             "list": CommentSerializer,
             "create": CommentCreateUpdateSerializer,
             "update": CommentCreateUpdateSerializer,
-            "partial_update": CommentSerializer,
+            "partial_update": CommentCreateUpdateSerializer,
             "retrieve": CommentSerializer,
         }
         if self.action in actions:
@@ -186,8 +687,9 @@ class CommentViewSet(viewsets.ModelViewSet):
 
         # Clear cache as a new comment is added
         blog_id = serializer.data.get("blog")
-        cache.delete("blog_list")
-        cache.delete(f"blog_{blog_id}")
+        bump_generation("blogs")
+        bump_generation("comments")
+        invalidate(f"blog:{blog_id}:comments")
 
         response_data = {
             "message": "Comment created successfully.",
@@ -198,14 +700,20 @@ class CommentViewSet(viewsets.ModelViewSet):
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop("partial", False)
         instance = self.get_object()
+        previous_blog_id = instance.blog_id
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         serializer.save()
 
         # Clear cache
-        blog_id = serializer.data.get("blog")
-        cache.delete("blog_list")
-        cache.delete(f"blog_{blog_id}")
+        bump_generation("comments")
+        invalidate(f"comment:{instance.id}")
+        if instance.blog_id != previous_blog_id:
+            # The comment left the previous blog, whose detail and counter changed too
+            invalidate(
+                f"blog:{previous_blog_id}:comments", f"blog:{instance.blog_id}:comments"
+            )
+            bump_generation("blogs")
 
         response_data = {
             "message": "Comment updated successfully.",
@@ -213,25 +721,195 @@ class CommentViewSet(viewsets.ModelViewSet):
         }
         return Response(response_data, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=["get"], url_path="export")
+    def export(self, request):
+        """
+        Stream the comments as NDJSON. Accepts the sparse fieldsets of the
+        list, `?updated_since=` and `?after_id=` resume an export.
+        """
+        return self.get_export_response(request, self.get_values_serializer())
+
+    @action(detail=True, methods=["get"], url_path="voters")
+    def voters(self, request, pk=None):
+        """
+        Paginate the votes of a comment with their voters, oldest first. `?value=up` or
+        `?value=down` keeps the upvotes or the downvotes.
+        """
+        comment = self.get_object()
+        votes = CommentVote.objects.filter(comment=comment).order_by("id")
+        value = request.query_params.get("value")
+        if value is not None:
+            values = {"up": CommentVote.UPVOTE, "down": CommentVote.DOWNVOTE}
+            if value not in values:
+                raise ParseError({"error": "Invalid value. Expected up or down."})
+            votes = votes.filter(value=values[value])
+
+        values_serializer = CommentVoteValuesSerializer(
+            context=self.get_serializer_context()
+        )
+        queryset = values_serializer.values(votes)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(values_serializer.build(page))
+        return Response(values_serializer.build(queryset))
+
+    @action(detail=False, methods=["post", "patch"], url_path="bulk")
+    def bulk(self, request):
+        """
+        Create comments from a list (POST), or update their text and parent (PATCH, every item
+        naming the `id` of its comment).
+        """
+        items = self.get_bulk_items(request)
+        context = {
+            **self.get_serializer_context(),
+            "preloaded": preload_comment_relations(items),
+        }
+        if request.method == "POST":
+            return self.bulk_create(items, context)
+        return self.bulk_update(items, context)
+
+    def bulk_create(self, items, context):
+        results, comments_data = [], {}
+        for index, item in enumerate(items):
+            serializer = CommentBulkSerializer(data=item, context=context)
+            if not serializer.is_valid():
+                results.append(self.get_bulk_error(index, serializer.errors))
+                continue
+            comments_data[index] = {
+                **serializer.validated_data,
+                "user": self.request.user,
+            }
+
+        comments = create_comments(list(comments_data.values()))
+        results.extend(
+            {"index": index, "status": "created", "id": comment.id}
+            for index, comment in zip(comments_data, comments)
+        )
+
+        # Clear cache once for the whole batch
+        if comments:
+            bump_generation("blogs")
+            bump_generation("comments")
+            invalidate(*{f"blog:{comment.blog_id}:comments" for comment in comments})
+
+        return self.get_bulk_response(results, status.HTTP_201_CREATED)
+
+    def bulk_update(self, items, context):
+        user = self.request.user
+        comments = Comment.objects.in_bulk(
+            [to_pk(item.get("id")) for item in items if isinstance(item, dict)]
+        )
+
+        results, updates = [], {}
+        for index, item in enumerate(items):
+            comment = comments.get(
+                to_pk(item.get("id")) if isinstance(item, dict) else None
+            )
+            if comment is None:
+                results.append(self.get_bulk_error(index, {"id": ["Not found."]}))
+                continue
+            # Checked like `IsOwnerOrAdmin` does for `update`
+            if user.role != "Admin" and comment.user_id != user.id:
+                results.append(
+                    self.get_bulk_error(
+                        index, {"id": [IsOwnerOrAdmin.message["error"]]}
+                    )
+                )
+                continue
+            if any(other is comment for other, _ in updates.values()):
+                results.append(
+                    self.get_bulk_error(
+                        index, {"id": ["Duplicate of a previous item."]}
+                    )
+                )
+                continue
+            serializer = CommentBulkSerializer(
+                comment, data=item, partial=True, context=context
+            )
+            if not serializer.is_valid():
+                results.append(self.get_bulk_error(index, serializer.errors))
+                continue
+            if self.overlaps_moves(comment, serializer.validated_data, updates):
+                results.append(
+                    self.get_bulk_error(
+                        index,
+                        {"parent": ["Moved within a thread moved by a previous item."]},
+                    )
+                )
+                continue
+            updates[index] = (comment, serializer.validated_data)
+
+        update_comments(list(updates.values()))
+        results.extend(
+            {"index": index, "status": "updated", "id": comment.id}
+            for index, (comment, _) in updates.items()
+        )
+
+        # Clear cache once for the whole batch
+        if updates:
+            bump_generation("comments")
+            invalidate(*[f"comment:{comment.id}" for comment, _ in updates.values()])
+
+        return self.get_bulk_response(results)
+
+    def get_moved_paths(self, comment, data):
+        """
+        Returns:
+            list: The paths of `comment` and of its new parent when `data` makes it reply to
+            another comment, or makes it top-level, None otherwise.
+        """
+        if "parent" not in data:
+            return None
+        parent = data["parent"]
+        if (parent.id if parent is not None else None) == get_parent_pk(comment.path):
+            return None
+        return [comment.path] + ([parent.path] if parent is not None else [])
+
+    def overlaps_moves(self, comment, data, updates):
+        """
+        Returns:
+            bool: Whether `data` moves `comment` in, out of or into one of the threads moved by
+            `updates`, which `update_comments` could not apply independently.
+        """
+        paths = self.get_moved_paths(comment, data)
+        if paths is None:
+            return False
+        for other, other_data in updates.values():
+            other_paths = self.get_moved_paths(other, other_data)
+            if other_paths is not None and (
+                any(path.startswith(other.path) for path in paths)
+                or any(path.startswith(comment.path) for path in other_paths)
+            ):
+                return True
+        return False
+
+    def invalidate_votes(self, comment):
+        """
+        Clear the caches after a vote on `comment` was written: only its fragment, and the lists
+        of comments, depend on its votes. Buffered votes are cleared by `flush_votes` once written.
+        """
+        bump_generation("comments")
+        invalidate(f"comment:{comment.id}")
+
     @action(detail=True, methods=["post"], url_path="upvote")
     def upvote(self, request, pk=None):
         comment = self.get_object()
-        comment.upvote(request.user)
-
-        # Clear cache
-        cache.delete("blog_list")
-        cache.delete(f"blog_{comment.blog.id}")
+        if settings.BUFFERED_VOTES:
+            buffer_vote(comment.id, request.user.id, CommentVote.UPVOTE)
+        else:
+            comment.upvote(request.user)
+            self.invalidate_votes(comment)
 
         return Response({"message": "Comment upvoted."}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=["post"], url_path="remove-upvote")
     def remove_upvote(self, request, pk=None):
         comment = self.get_object()
-        comment.remove_upvote(request.user)
-
-        # Clear cache
-        cache.delete("blog_list")
-        cache.delete(f"blog_{comment.blog.id}")
+        if settings.BUFFERED_VOTES:
+            buffer_vote(comment.id, request.user.id, None, CommentVote.UPVOTE)
+        else:
+            comment.remove_upvote(request.user)
+            self.invalidate_votes(comment)
 
         return Response(
             {"message": "Comment upvote removed."}, status=status.HTTP_200_OK
@@ -240,22 +918,22 @@ class CommentViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["post"], url_path="downvote")
     def downvote(self, request, pk=None):
         comment = self.get_object()
-        comment.downvote(request.user)
-
-        # Clear cache
-        cache.delete("blog_list")
-        cache.delete(f"blog_{comment.blog.id}")
+        if settings.BUFFERED_VOTES:
+            buffer_vote(comment.id, request.user.id, CommentVote.DOWNVOTE)
+        else:
+            comment.downvote(request.user)
+            self.invalidate_votes(comment)
 
         return Response({"message": "Comment downvoted."}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=["post"], url_path="remove-downvote")
     def remove_downvote(self, request, pk=None):
         comment = self.get_object()
-        comment.remove_downvote(request.user)
-
-        # Clear cache
-        cache.delete("blog_list")
-        cache.delete(f"blog_{comment.blog.id}")
+        if settings.BUFFERED_VOTES:
+            buffer_vote(comment.id, request.user.id, None, CommentVote.DOWNVOTE)
+        else:
+            comment.remove_downvote(request.user)
+            self.invalidate_votes(comment)
 
         return Response(
             {"message": "Comment downvote removed."}, status=status.HTTP_200_OK
@@ -274,11 +952,148 @@ class CommentViewSet(viewsets.ModelViewSet):
             }
 
             # Clear cache
-            cache.delete(f"blog_{comment_instance.blog.id}")
-            cache.delete("blog_list")
+            invalidate(
+                f"blog:{comment_instance.blog_id}:comments",
+                f"comment:{comment_instance.id}",
+            )
+            bump_generation("blogs")
+            bump_generation("comments")
 
             return Response(response_data, status=status.HTTP_204_NO_CONTENT)
         return Response(
             {"error": "You do not have permission to delete this comment"},
             status=status.HTTP_403_FORBIDDEN,
         )
+
+
+class TagViewSet(BulkMixin, viewsets.GenericViewSet):
+    queryset = Tag.objects.all()
+    serializer_class = TagSerializer
+
+    def get_permissions(self):
+        # Authors may create tags, only Admins rename them as every blog of a tag changes
+        self.permission_classes = [
+            IsAPIKeyAuthenticated,
+            IsAuthenticated,
+            IsRoleAdmin if self.request.method == "PATCH" else IsRoleAuthorOrAdmin,
+        ]
+        return super().get_permissions()
+
+    @action(detail=False, methods=["post", "patch"], url_path="bulk")
+    def bulk(self, request):
+        """
+        Create tags from a list of names (POST), or rename them (PATCH, every item naming the
+        `id` of its tag). Names are made unique for the whole batch with one query.
+        """
+        items = self.get_bulk_items(request)
+        if request.method == "POST":
+            return self.bulk_create(items)
+        return self.bulk_update(items)
+
+    def bulk_create(self, items):
+        results, names = [], {}
+        for index, item in enumerate(items):
+            if isinstance(item, str):
+                item = {"name": item}
+            serializer = TagBulkSerializer(data=item)
+            if not serializer.is_valid():
+                results.append(self.get_bulk_error(index, serializer.errors))
+                continue
+            names[index] = serializer.validated_data["name"]
+
+        existing = set(
+            Tag.objects.filter(name__in=names.values()).values_list("name", flat=True)
+        )
+        tags = get_or_create_tags(names.values())
+        results.extend(
+            {
+                "index": index,
+                "status": "exists" if name in existing else "created",
+                "id": tags[name].id,
+            }
+            for index, name in names.items()
+        )
+        return self.get_bulk_response(results, status.HTTP_201_CREATED)
+
+    def bulk_update(self, items):
+        tags = Tag.objects.in_bulk(
+            [to_pk(item.get("id")) for item in items if isinstance(item, dict)]
+        )
+
+        results, renames = [], {}
+        for index, item in enumerate(items):
+            tag = tags.get(to_pk(item.get("id")) if isinstance(item, dict) else None)
+            if tag is None:
+                results.append(self.get_bulk_error(index, {"id": ["Not found."]}))
+                continue
+            serializer = TagBulkSerializer(data=item)
+            if not serializer.is_valid():
+                results.append(self.get_bulk_error(index, serializer.errors))
+                continue
+            renames[index] = (tag, serializer.validated_data["name"])
+
+        # A name must not be taken by another tag, nor by two items of the batch
+        names = Counter(name for _, name in renames.values())
+        taken = set(
+            Tag.objects.filter(name__in=names).values_list("name", flat=True)
+        ) | {name for name, count in names.items() if count > 1}
+        tag_ids = Counter(tag.id for tag, _ in renames.values())
+        for index, (tag, name) in list(renames.items()):
+            if tag_ids[tag.id] > 1:
+                error = {"id": ["Renamed by several items."]}
+            elif name in taken and name != tag.name:
+                error = {"name": ["Tag with this name already exists."]}
+            else:
+                continue
+            del renames[index]
+            results.append(self.get_bulk_error(index, error))
+
+        rename_tags(list(renames.values()))
+        results.extend(
+            {"index": index, "status": "updated", "id": tag.id}
+            for index, (tag, _) in renames.items()
+        )
+
+        # Clear cache once for the whole batch
+        if renames:
+            invalidate(*[f"tag:{tag.id}" for tag, _ in renames.values()])
+            bump_generation("blogs")
+
+        return self.get_bulk_response(results)
+
+
+class FeedView(ConditionalGetMixin, APIView):
+    """
+    Public RSS (by default), Atom and JSON feed of the latest published blogs, of the whole site or
+    of the category or author `pk`, chosen with `?format=rss|atom|json` or the `Accept` header.
+    Documents are rendered ahead of the requests by `core.blog.feeds`, so that polling costs a
+    cache read.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    renderer_classes = [RSSRenderer, AtomRenderer, JSONFeedRenderer]
+    content_negotiation_class = FallbackContentNegotiation
+    feed_kind = "site"
+
+    def get(self, request, pk=None):
+        try:
+            document = get_document(
+                Feed(self.feed_kind, pk), request.accepted_renderer.format
+            )
+        except ObjectDoesNotExist:
+            raise Http404
+        not_modified = self.get_not_modified_response(
+            request, document["etag"], document["last_modified"]
+        )
+        if not_modified is not None:
+            return not_modified
+        return self.set_validators(
+            Response(document["body"]), document["etag"], document["last_modified"]
+        )
+
+    def handle_exception(self, exc):
+        # Errors are rendered as JSON, whatever the format of the feed
+        self.request.accepted_renderer = FastJSONRenderer()
+        self.request.accepted_media_type = FastJSONRenderer.media_type
+        return super().handle_exception(exc)
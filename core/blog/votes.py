@@ -0,0 +1,177 @@
+"""
+Write-behind buffering of comment votes, enabled by `settings.BUFFERED_VOTES`.
+
+Votes are recorded as intents in the cache instead of being written to the database: the latest
+vote of each user on each comment (`vote_intent_<comment>_<user>`), and a log of the (comment,
+user) pairs voted on (see `base.cache.append_to_log`). `flush_votes`, run by the `flush_votes`
+command, reads the log since its last run, keeps the latest intent of each pair and writes them
+all with a constant number of queries, shifting the counters of each comment once.
+
+The voting user reads their own votes, and the counters shifted by them, from the intents until
+they are flushed (see `core.blog.v1.serializers.add_my_votes`). The other users see them once
+flushed. A flush locks the comments it writes, like `Comment._change_vote` does, so that the
+counters always match the votes written directly meanwhile.
+
+The cache must be shared by the processes serving the votes and the one flushing them, and not
+evict the keys of the log: intents evicted before being flushed are lost.
+"""
+
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from base.cache import (
+    append_to_log,
+    bump_generation,
+    invalidate,
+    read_log,
+    trim_log,
+)
+from core.custom_auth.models import User
+
+from .models import Comment, CommentVote
+
+VOTE_BUFFER_TIMEOUT = 60 * 60 * 24
+# Stored for removed votes, as None cannot be told apart from a missing key
+NO_VOTE = 0
+
+
+def get_intent_key(comment_id, user_id):
+    return f"vote_intent_{comment_id}_{user_id}"
+
+
+def get_intents(pairs):
+    """
+    Returns:
+        dict: The vote buffered for each of the (comment, user) `pairs` which have one, None for
+        the removed votes, read in one round-trip.
+    """
+    keys = {get_intent_key(*pair): pair for pair in pairs}
+    return {
+        keys[key]: value or None for key, value in cache.get_many(list(keys)).items()
+    }
+
+
+def buffer_vote(comment_id, user_id, value, only_from=None):
+    """
+    Record that the user `user_id` replaced their vote on `comment_id` with `value` (None
+    removes it), like `Comment._change_vote` does in the database.
+
+    Args:
+        only_from: If given, the vote is only changed when it currently has this value.
+    """
+    key = get_intent_key(comment_id, user_id)
+    previous = cache.get(key)
+    if previous is None:
+        previous = (
+            CommentVote.objects.filter(comment_id=comment_id, user_id=user_id)
+            .values_list("value", flat=True)
+            .first()
+        )
+    previous = previous or None
+    if previous == value or (only_from is not None and previous != only_from):
+        return
+
+    cache.set(key, value or NO_VOTE, VOTE_BUFFER_TIMEOUT)
+    append_to_log("vote_log", (comment_id, user_id), VOTE_BUFFER_TIMEOUT)
+
+
+def flush_votes(max_slots=10000):
+    """
+    Write the votes logged since the last flush, at most `max_slots` of them, to the database.
+
+    Returns:
+        int: The number of votes written, None if another flush is running.
+    """
+    if not cache.add("lock_vote_flush", True, 60):
+        return None
+    try:
+        pairs, position = read_log("vote_log", max_slots, VOTE_BUFFER_TIMEOUT)
+        written = write_votes(get_intents(set(pairs)))
+        trim_log("vote_log", position)
+        return written
+    finally:
+        cache.delete("lock_vote_flush")
+
+
+def write_votes(votes):
+    """
+    Write the `votes` of each (comment, user) pair, None removing it, with one query per kind of
+    change, and shift the counters of the comments voted on with one update per distinct shift.
+
+    Returns:
+        int: The number of votes changed.
+    """
+    user_ids = {user_id for _, user_id in votes}
+    user_ids = set(User.objects.filter(pk__in=user_ids).values_list("id", flat=True))
+
+    shifts = defaultdict(Counter)
+    with transaction.atomic():
+        # Locked in order like `Comment._change_vote` locks its comment, so that no vote on them
+        # is written unbuffered between the read of their votes and the writes below
+        comment_ids = set(
+            Comment.objects.select_for_update()
+            .filter(pk__in={comment_id for comment_id, _ in votes})
+            .order_by("pk")
+            .values_list("id", flat=True)
+        )
+        # Votes on comments, or of users, deleted since are dropped
+        votes = {
+            pair: value
+            for pair, value in votes.items()
+            if pair[0] in comment_ids and pair[1] in user_ids
+        }
+        if not votes:
+            return 0
+
+        current = {
+            (vote.comment_id, vote.user_id): vote
+            for vote in CommentVote.objects.select_for_update().filter(
+                comment_id__in=comment_ids, user_id__in=user_ids
+            )
+            if (vote.comment_id, vote.user_id) in votes
+        }
+        created, updated, deleted = [], [], []
+        for (comment_id, user_id), value in votes.items():
+            vote = current.get((comment_id, user_id))
+            previous = vote.value if vote is not None else None
+            if previous == value:
+                continue
+            if value is None:
+                deleted.append(vote.id)
+            elif vote is None:
+                created.append(
+                    CommentVote(comment_id=comment_id, user_id=user_id, value=value)
+                )
+            else:
+                vote.value = value
+                updated.append(vote)
+            shifts[comment_id][value] += 1
+            shifts[comment_id][previous] -= 1
+
+        CommentVote.objects.filter(pk__in=deleted).delete()
+        # No conflict is expected, one rolls the flush back and the log is read again
+        CommentVote.objects.bulk_create(created)
+        CommentVote.objects.bulk_update(updated, ["value"])
+
+        comment_ids_per_shift = defaultdict(list)
+        for comment_id, shift in shifts.items():
+            comment_ids_per_shift[
+                (shift[CommentVote.UPVOTE], shift[CommentVote.DOWNVOTE])
+            ].append(comment_id)
+        now = timezone.now()
+        for (upvotes, downvotes), shifted_ids in comment_ids_per_shift.items():
+            Comment.objects.filter(pk__in=shifted_ids).update(
+                upvote_count=F("upvote_count") + upvotes,
+                downvote_count=F("downvote_count") + downvotes,
+                updated_at=now,
+            )
+
+    if shifts:
+        # Only the fragments of the voted comments depend on their votes
+        bump_generation("comments")
+        invalidate(*[f"comment:{comment_id}" for comment_id in shifts])
+    return len(created) + len(updated) + len(deleted)
@@ -1,6 +1,12 @@
 from django.contrib import admin
 
+from base.paginator import EstimatedCountPaginator
+
 from .models import User
 
+
 # Register your models here.
-admin.site.register(User)
+@admin.register(User)
+class UserAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -1,4 +1,5 @@
 from django.contrib.auth import authenticate, login, logout
+from django.utils import timezone
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status, views, viewsets
@@ -6,6 +7,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from base.cache import bump_generation, invalidate
 from base.permissions import IsAPIKeyAuthenticated
 from core.custom_auth.models import User
 from core.custom_auth.throttles import FailedLoginThrottle
@@ -78,12 +80,19 @@ class AppUserViewset(viewsets.ModelViewSet):
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         instance = serializer.save()
+        self.invalidate_author(instance)
         response_data = {
             "message": "User profile updated successfully.",
             "data": UserDetailSerializer(instance).data,
         }
         return Response(response_data, status=status.HTTP_200_OK)
 
+    def invalidate_author(self, user):
+        """Mark the blogs embedding the profile of `user` as modified and clear their cached copies."""
+        user.blogs.update(updated_at=timezone.now())
+        invalidate(f"author:{user.id}")
+        bump_generation("blogs")
+
     @swagger_auto_schema(
         responses={
             200: openapi.Response(
@@ -128,6 +137,7 @@ class AppUserViewset(viewsets.ModelViewSet):
         serializer = self.get_serializer(user, data=request.data)
         if serializer.is_valid(raise_exception=True):
             instance = serializer.save()
+            self.invalidate_author(instance)
             response_data = {
                 "message": "Profile pic uploaded successfully.",
                 "data": UserDetailSerializer(instance).data,
@@ -140,6 +150,7 @@ class AppUserViewset(viewsets.ModelViewSet):
         user = request.user
         user.profile_pic.delete()
         user.save()
+        self.invalidate_author(user)
         response_data = {
             "message": "Profile pic deleted successfully.",
             "data": UserDetailSerializer(user).data,